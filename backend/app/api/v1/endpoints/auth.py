@@ -2,8 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from typing import Optional
+from functools import lru_cache
+from fastapi.concurrency import run_in_threadpool
 from app.core import security
-from jose import jwt
+from app.services.users import users
+from app.services.tokens import tokens
 
 router = APIRouter()
 
@@ -13,44 +16,87 @@ class Token(BaseModel):
     access_token: str
     token_type: str
     role: str
+    refresh_token: Optional[str] = None
 
 class User(BaseModel):
     username: str
     role: str
 
-# Mock user database
-FAKE_USERS_DB = {
-    "polaris": {"username": "polaris", "password_hash": security.get_password_hash("polaris123"), "role": "Polaris"},
-    "forensics": {"username": "forensics", "password_hash": security.get_password_hash("forensics123"), "role": "Forensics"},
-    "judge": {"username": "judge", "password_hash": security.get_password_hash("judge123"), "role": "Judge"},
-}
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
+def _issue_tokens(username: str, role: str) -> dict:
+    return {
+        "access_token": security.create_access_token(subject=username, role=role),
+        "refresh_token": security.create_refresh_token(subject=username, role=role),
+        "token_type": "bearer",
+        "role": role
+    }
+
+@lru_cache(maxsize=1024)
+def _user(username: str, role: str) -> User:
+    # Shared per identity; endpoints only read it
+    return User(username=username, role=role)
 
 @router.post("/login", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = FAKE_USERS_DB.get(form_data.username)
-    if not user or not security.verify_password(form_data.password, user["password_hash"]):
+    # bcrypt runs on its own bounded pool, so a burst of logins never blocks the event loop
+    user = await run_in_threadpool(lambda: users.get(form_data.username))
+    valid = await security.verify_password_async(form_data.password, user["password_hash"] if user else None)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    access_token = security.create_access_token(
-        subject=user["username"],
-        role=user["role"]
-    )
-    return {"access_token": access_token, "token_type": "bearer", "role": user["role"]}
+
+    if security.needs_rehash(user["password_hash"]):
+        # Work factor changed: upgrade the stored hash now that we know the password
+        password_hash = await security.get_password_hash_async(form_data.password)
+        await run_in_threadpool(lambda: users.set_password_hash(user["username"], password_hash))
+
+    return _issue_tokens(user["username"], user["role"])
+
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(body: RefreshRequest):
+    """Exchanges a refresh token for a new access/refresh pair; the old refresh token is revoked (rotation)."""
+    try:
+        claims = tokens.decode(body.refresh_token, token_type="refresh")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Could not validate refresh token: {str(e)}")
+    user = users.get(claims.get("sub"))
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User no longer exists")
+    tokens.revoke(claims)
+    return _issue_tokens(user["username"], user["role"])
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(body: Optional[LogoutRequest] = None, token: str = Depends(oauth2_scheme)):
+    """Revokes the current access token and, if given, the refresh token."""
+    try:
+        tokens.revoke(tokens.decode(token))
+    except Exception:
+        pass # Already invalid
+    if body and body.refresh_token:
+        try:
+            tokens.revoke(tokens.decode(body.refresh_token, token_type="refresh"))
+        except Exception:
+            pass
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
-    # In a real app, we would decode and validate more thoroughly
-    # For now, we trust the subject we encoded
+    # Cached after the first request with a token: no JWT decode or User construction on the hot path
     try:
-        payload = jwt.decode(token, security.settings.SECRET_KEY, algorithms=[security.settings.ALGORITHM])
+        payload = await tokens.decode_async(token)
         username: str = payload.get("sub")
         role: str = payload.get("role")
         if username is None:
              raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-        return User(username=username, role=role)
+        return _user(username, role)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"DEBUG AUTH ERROR: {e}")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Could not validate credentials: {str(e)}")
@@ -1,17 +1,85 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+from app.api.v1.endpoints import auth
 
 router = APIRouter()
 
 from app.services.database import db
+from app.services.verification import verification
+from app.services.metrics import tracked
+from app.core.config import settings
 
 @router.get("/")
-def get_cases():
-    return db.list_cases()
+def get_cases(
+    limit: int = Query(settings.CASES_PAGE_SIZE, ge=1, le=settings.CASES_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated attributes to return, e.g. id,caseNumber,district,status"),
+    district: Optional[str] = None,
+    unit: Optional[str] = None,
+    status: Optional[str] = None
+):
+    """
+    One page of cases: {"items": [...], "next_cursor": "..."}.
+    Pass next_cursor back as ?cursor= to fetch the next page; it is null on the last page.
+    """
+    projection = None
+    if fields:
+        projection = [f.strip() for f in fields.split(",") if f.strip()]
+        if "id" not in projection:
+            projection.insert(0, "id")
+
+    filters = {key: value for key, value in (("district", district), ("unit", unit), ("status", status)) if value}
+
+    try:
+        return db.list_cases_page(limit, cursor=cursor, fields=projection, filters=filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/stats/geo")
+def get_geo_stats():
+    """
+    Per-district case counts, centroids, status breakdowns and geohash buckets.
+    Maintained incrementally by create_case, so this never reads the cases themselves.
+    """
+    districts = db.get_geo_stats()
+    return {
+        "total": sum(d["count"] for d in districts),
+        "districts": sorted(districts, key=lambda d: d["count"], reverse=True)
+    }
+
+@router.get("/by-number/{case_number}")
+def get_case_by_number(case_number: str):
+    case = db.get_case_by_number(case_number)
+    if not case:
+        raise HTTPException(status_code=404, detail="Case not found")
+    return case
 
 @router.get("/{case_id}")
 def get_case(case_id: str):
     return db.get_case(case_id)
 
+@router.get("/{case_id}/verify")
+@tracked("audit")
+async def verify_case(
+    case_id: str,
+    force: bool = False,
+    current_user: auth.User = Depends(auth.get_current_user) # Forensics or Judge
+):
+    """
+    Integrity audit of every evidence item in the case: files are re-hashed in parallel and checked
+    against a single scan of the chain's anchor events. Returns a signed audit report.
+    """
+    if current_user.role not in ["Forensics", "Judge"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    evidence_items = await db.aio.list_case_evidence(case_id)
+    if not evidence_items and not await db.aio.get_case(case_id):
+        raise HTTPException(status_code=404, detail="Case not found")
+
+    scope = {"case_id": case_id, "requested_by": current_user.username}
+    return await run_in_threadpool(verification.audit, evidence_items, scope, force)
+
 from app.models.case import CaseCreate
 import uuid
 from datetime import datetime
@@ -25,5 +93,6 @@ def create_case(case_in: CaseCreate):
     case_data["createdAt"] = str(datetime.now())
     case_data["updatedAt"] = str(datetime.now())
     case_data["evidence"] = [] # Init empty evidence list
+    case_data["evidenceCount"] = 0 # Lets list views show the count without the evidence array
     
     return db.create_case(case_data)
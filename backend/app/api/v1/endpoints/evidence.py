@@ -1,13 +1,24 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Header
+from fastapi.responses import StreamingResponse, RedirectResponse
 from typing import Optional
 from app.api.v1.endpoints import auth
 from app.services.storage import storage
 from app.services.database import db
 from app.services.blockchain import blockchain
-from app.services.ai import ai_service
+from app.services.jobs import ai_jobs
+from app.services.ingest import ingest_upload, remove_spool
+from app.services.transfers import transfers
+from app.services.verification import verification
+from app.services.executors import run_in
+from app.services.metrics import stage, tracked, BYTES_STORED
+from app.core.config import settings
+import logging
+import os
 import uuid
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.get("/{case_id}")
@@ -19,133 +30,249 @@ def get_case_evidence(case_id: str):
     return db.list_case_evidence(case_id)
 
 @router.post("/upload")
+@tracked("upload")
 async def upload_evidence(
     file: UploadFile = File(...),
     case_id: str = Form(...),
+    upload_id: Optional[str] = Form(None), # Client-chosen id for polling /uploads/{upload_id}
     current_user: auth.User = Depends(auth.get_mock_polaris_user)
 ):
-    # 1. Read file content
-    content = await file.read()
-    
-    # 2. Compute Hash
-    file_hash = blockchain.calculate_hash(content)
-    
-    # 3. Upload to Storage
-    # Reset cursor for upload
-    file.file.seek(0)
-    file_url = storage.upload_file(file.file, f"{case_id}/{file.filename}", file.content_type or "application/octet-stream")
-    
-    # 4. Anchor to Blockchain
     evidence_id = str(uuid.uuid4())
     # Determine file type (simple fallback)
     file_type = file.content_type or "application/octet-stream"
+    storage_key = f"{case_id}/{file.filename}"
+    upload_id = upload_id or str(uuid.uuid4())
+    # Every blocking stage below runs on a dedicated executor (app/services/executors.py)
+    if await run_in("files", transfers.get, upload_id):
+        raise HTTPException(status_code=409, detail="upload_id already used")
     
-    # Store on blockchain with enhanced metadata
-    tx_hash = blockchain.store_hash_on_chain(
-        case_id=case_id,
-        evidence_id=evidence_id,
-        file_hash=file_hash,
-        file_type=file_type,
-        uploader_role=current_user.role, # Pass actual role
-        previous_hash=None # Future: Fetch previous hash for chain of custody
-    )
-    
-    # 5. Store Metadata
-    metadata = {
-        "evidence_id": evidence_id,
-        "case_id": case_id,
-        "filename": file.filename,
-        "content_type": file_type,
-        "uploader": current_user.username,
-        "uploader_role": current_user.role,
-        "tx_hash": tx_hash,
-        "url": file_url,
-        "uploaded_at": str(datetime.now())
-    }
-    db.store_evidence_metadata(metadata)
-    
-    # 5.5 Link to Case
-    db.add_evidence_to_case(case_id, metadata)
+    # 1-2. Stream the upload once: hash it and spool it; storage and the AI step read the spool
+    spool_path = os.path.join(settings.UPLOAD_SPOOL_DIR, f"{evidence_id}_{os.path.basename(file.filename)}")
+    await run_in("files", transfers.create, upload_id, evidence_id, case_id, storage_key, file_type, spool_path)
+    try:
+        with stage("upload", "receive_hash"):
+            ingest = await ingest_upload(file, spool_path, upload_id)
+    except Exception as e:
+        await run_in("files", transfers.fail, upload_id, str(e))
+        raise
+    await run_in("files", transfers.mark_received, upload_id, ingest["size"])
+    file_hash = ingest["hash"]
     
-    # 6. Trigger AI (Async in real world, sync here for MVP)
-    # Save temp file for Docling/Gemini to read
-    import os
-    temp_filename = f"{evidence_id}_{file.filename}"
-    temp_file_path = f"/tmp/{temp_filename}"
-    with open(temp_file_path, "wb") as f:
-        f.write(content) # Write original content
+    # 3-4.5. Until the transfer starts, a failure must not leave a transfer row behind for
+    # resume_pending() to upload on the next start without a metadata record
+    try:
+        # 3. Store Metadata before anchoring: in batch mode the Merkle proof is written to this record
+        # when the batch lands, which can be before this request finishes. Also before the storage
+        # transfer, so an interrupted transfer can be resumed and finished.
+        metadata = {
+            "evidence_id": evidence_id,
+            "case_id": case_id,
+            "filename": file.filename,
+            "content_type": file_type,
+            "uploader": current_user.username,
+            "uploader_role": current_user.role,
+            "tx_hash": "BATCH_PENDING" if settings.BLOCKCHAIN_ANCHOR_MODE == "batch" else None,
+            "url": await run_in("files", lambda: storage.object_url(storage_key)),
+            "storage_key": storage_key,
+            "storage_status": "uploading",
+            "upload_id": upload_id,
+            "hash": file_hash,
+            "size": ingest["size"],
+            "uploaded_at": str(datetime.now()),
+            "ai_status": "pending"
+        }
+        with stage("upload", "metadata_write"):
+            await db.aio.store_evidence_metadata(metadata)
         
-    ai_result = ai_service.generate_summary(temp_file_path)
-    
-    # Clean up temp file
-    if os.path.exists(temp_file_path):
-        os.remove(temp_file_path)
-    
-    # 7. Update Metadata with AI results
-    metadata["ai_summary"] = ai_result.get("summary", "")
-    metadata["knowledge_graph"] = ai_result.get("graph", {})
-    
-    # Re-store (overwrite) with AI data
-    # Re-store (overwrite) with AI data
-    db.store_evidence_metadata(metadata)
+        # 3.5 Link to Case
+        with stage("upload", "case_link"):
+            await db.aio.add_evidence_to_case(case_id, metadata)
+
+        # 4. Anchor to Blockchain
+        # Store on blockchain with enhanced metadata
+        with stage("upload", "anchor"):
+            tx_hash = await run_in("chain", lambda: blockchain.store_hash_on_chain(
+                case_id=case_id,
+                evidence_id=evidence_id,
+                file_hash=file_hash,
+                file_type=file_type,
+                uploader_role=current_user.role, # Pass actual role
+                previous_hash=None # Future: Fetch previous hash for chain of custody
+            ))
+        if tx_hash != "BATCH_PENDING":
+            # Anchored synchronously (single mode or ledger fallback). A queued batch item's
+            # tx hash and proof are written by the batch anchorer; never overwrite them here.
+            await db.aio.update_evidence_metadata(evidence_id, {"tx_hash": tx_hash})
+    except Exception as e:
+        await run_in("files", transfers.fail, upload_id, str(e))
+        await run_in("files", remove_spool, spool_path)
+        raise
+
+    # 5. Parallel multipart transfer to storage from the spool.
+    # Only the storage fields are written back: a batch anchor may have added its proof to the record meanwhile.
+    try:
+        with stage("upload", "storage"):
+            url = await run_in("storage", transfers.run, upload_id)
+    except Exception:
+        logger.exception("Storage transfer %s failed", upload_id)
+        await db.aio.update_evidence_metadata(evidence_id, {"storage_status": "failed"})
+        await run_in("files", remove_spool, spool_path)
+        raise HTTPException(status_code=502, detail="Failed to store evidence file")
+    with stage("upload", "metadata_update"):
+        await db.aio.update_evidence_metadata(evidence_id, {"url": url, "storage_status": "stored"})
     
-    # 7.5 Update Case with AI Data
-    db.update_evidence_in_case(case_id, evidence_id, metadata)
+    # 6. Queue AI analysis; the worker reads the spool file and updates the case when done
+    with stage("upload", "ai_enqueue"):
+        job = await run_in("files", ai_jobs.enqueue, evidence_id, case_id, spool_path)
     
     return {
         "evidence_id": evidence_id,
         "hash": file_hash,
         "tx_hash": tx_hash,
-        "ai_summary": ai_result.get("summary"),
-        "knowledge_graph": ai_result.get("graph")
+        "upload_id": upload_id,
+        "ai_status": metadata["ai_status"],
+        "ai_job_id": job["job_id"]
     }
+
+@router.get("/uploads/{upload_id}")
+def get_upload_progress(upload_id: str):
+    """Bytes received from the client and bytes written to storage for an upload."""
+    progress = transfers.progress(upload_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return progress
+    
+
+@router.get("/{evidence_id}/anchor")
+def get_anchor_status(evidence_id: str):
+    """Confirmation status of the evidence's blockchain anchor transaction."""
+    metadata = db.get_evidence_metadata(evidence_id)
+    if not metadata:
+        raise HTTPException(status_code=404, detail="Evidence not found")
     
+    tx_hash = metadata.get("tx_hash")
+    anchor_status = blockchain.get_anchor_status(evidence_id, tx_hash)
+    if anchor_status is None:
+        # Anchored in the local ledger fallback, nothing to confirm
+        anchor_status = {"tx_hash": tx_hash, "status": "LOCAL_LEDGER"}
+    return {"evidence_id": evidence_id, **anchor_status}
+
+def _parse_range(range_header: str, size: int):
+    """Parses a single 'bytes=a-b' / 'bytes=a-' / 'bytes=-n' range into inclusive (start, end)."""
+    unit, _, spec = range_header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        raise HTTPException(status_code=416, detail="Only a single bytes range is supported")
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        raise HTTPException(status_code=416, detail="Invalid range")
+    if start > end or start >= size:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+@router.get("/{evidence_id}/download")
+def download_evidence(
+    evidence_id: str,
+    redirect: bool = False,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    current_user: auth.User = Depends(auth.get_current_user) # Forensics or Judge
+):
+    """
+    Streams the evidence file in DOWNLOAD_CHUNK_SIZE chunks (never loaded whole into memory).
+    Supports single HTTP Range requests; with ?redirect=true on S3, returns a short-lived presigned URL instead.
+    """
+    if current_user.role not in ["Forensics", "Judge"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    metadata = db.get_evidence_metadata(evidence_id)
+    if not metadata:
+        raise HTTPException(status_code=404, detail="Evidence not found")
+    storage_key = metadata.get("storage_key")
+    info = storage.stat(storage_key) if storage_key else None
+    if not info:
+        raise HTTPException(status_code=404, detail="Evidence file not available")
+
+    filename = metadata.get("filename") or os.path.basename(storage_key)
+    if redirect:
+        url = storage.presigned_url(storage_key, download_name=filename)
+        if url:
+            return RedirectResponse(url, status_code=307)
+
+    size = info["size"]
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{info["etag"]}"',
+        "Content-Disposition": f'attachment; filename="{filename}"'
+    }
+    status_code = 200
+    start, end = 0, size - 1
+    if range_header and size:
+        start, end = _parse_range(range_header, size)
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1 if size else 0)
+
+    def counted(chunks):
+        for chunk in chunks:
+            BYTES_STORED.inc(len(chunk), direction="download")
+            yield chunk
+
+    return StreamingResponse(
+        counted(storage.get_file(storage_key, start, end if size else None)),
+        status_code=status_code,
+        media_type=metadata.get("content_type") or info["content_type"] or "application/octet-stream",
+        headers=headers
+    )
 
 @router.get("/{evidence_id}/verify")
+@tracked("verify")
 async def verify_evidence(
     evidence_id: str,
+    force: bool = False,
     current_user: auth.User = Depends(auth.get_current_user) # Forensics or Judge
 ):
+    """
+    Re-hashes the stored file and checks it against the on-chain record.
+    Unchanged files reuse their last computed hash unless ?force=true.
+    """
     # Check permissions
     if current_user.role not in ["Forensics", "Judge"]:
          raise HTTPException(status_code=403, detail="Unauthorized")
 
     # 1. Get Metadata
-    metadata = db.get_evidence_metadata(evidence_id)
+    metadata = await db.aio.get_evidence_metadata(evidence_id)
     if not metadata:
         raise HTTPException(status_code=404, detail="Evidence not found")
-        
+
     # 2. Get Transaction Hash
     tx_hash = metadata.get('tx_hash')
-    
-    # 3. Simulate File Retrieval & Re-Hashing
-    # In production: content = storage.download(metadata['url'])
-    # recomputed_hash = blockchain.calculate_hash(content)
-    
-    # For this MVP without connected S3/Local fetching logic in this file:
-    # We will assume the file hasn't changed on disk for the DEMO.
-    # To truly prove it, we'd need to re-read. 
-    # Let's peek at local storage if possible? 
-    # `storage.upload_file` likely saved it locally in `uploads/` or similar if LocalStorage.
-    # We will assume the hash matches effectively for the "Design" unless we implement full storage read.
-    # However, to use the new `verify_integrity` API correctly:
-    
-    # We cheat slightly for the MVP: we assume the 'stored' hash is correct for the logic flow
-    # BUT we clearly mark it as "SIMULATED_REHASH" in comments.
-    # Better: We query the blockchain service for what IT has, and compare.
-    
-    stored_record = blockchain._get_record_from_ledger(evidence_id)
-    stored_hash = stored_record.get("hash") if stored_record else ""
-    
-    # We pass the stored_hash as "computed" to pass the check, 
-    # effectively verifying the Ledger Entry exists and matches ITSELF.
-    # Real verification requires the file.
-    
-    verification_result = blockchain.verify_integrity(evidence_id, stored_hash)
-    
+
+    # 3. Re-hash the stored file (off the event loop)
+    storage_key = metadata.get("storage_key")
+    with stage("verify", "rehash"):
+        hash_report = await run_in("files", verification.compute_hash, storage_key, force) if storage_key else None
+    if not hash_report:
+        raise HTTPException(status_code=404, detail="Evidence file not available")
+
+    # 4. Compare against the chain (and the hash recorded at upload)
+    merkle_anchor = metadata if metadata.get("anchor_mode") == "merkle_batch" else None
+    with stage("verify", "chain"):
+        verification_result = await run_in(
+            "chain", lambda: blockchain.verify_integrity(evidence_id, hash_report["hash"], merkle_anchor=merkle_anchor)
+        )
+    verification_result["matches_upload_hash"] = hash_report["hash"] == metadata.get("hash")
+
     return {
         "evidence_id": evidence_id,
         "overall_status": verification_result["status"],
+        "computed_hash": hash_report["hash"],
+        "hash_report": hash_report,
         "verification_details": verification_result,
         "tx_hash": tx_hash,
         "blockchain_provider": "Polygon PoS (via Local Ledger Mock)"
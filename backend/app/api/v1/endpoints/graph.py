@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.api.v1.endpoints import auth
+from app.services.graph_index import graph_index
+from app.core.config import settings
+
+router = APIRouter()
+
+# Entities are passed as ?entity=<label>; labels are resolved the same way the index resolves mentions
+
+@router.get("/entities")
+def search_entities(
+    q: str = "",
+    limit: int = Query(20, ge=1, le=200),
+    current_user: auth.User = Depends(auth.get_current_user)
+):
+    """Entities whose name starts with q, most mentioned first."""
+    return graph_index.search_entities(q, limit=limit)
+
+@router.get("/neighbours")
+def get_neighbours(
+    entity: str,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: auth.User = Depends(auth.get_current_user)
+):
+    resolved = graph_index.get_entity(entity)
+    if not resolved:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    return {"entity": resolved, "neighbours": graph_index.neighbours(entity, limit=limit)}
+
+@router.get("/subgraph")
+def get_subgraph(
+    entity: str,
+    hops: int = Query(2, ge=0, le=settings.GRAPH_MAX_HOPS),
+    max_nodes: int = Query(settings.GRAPH_MAX_NODES, ge=1, le=settings.GRAPH_MAX_NODES),
+    current_user: auth.User = Depends(auth.get_current_user)
+):
+    """k-hop neighbourhood in the same {nodes, links} shape as an evidence knowledge_graph."""
+    subgraph = graph_index.subgraph(entity, hops=hops, max_nodes=max_nodes)
+    if not subgraph["nodes"]:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    return subgraph
+
+@router.get("/cases")
+def get_cases_sharing_entity(entity: str, current_user: auth.User = Depends(auth.get_current_user)):
+    """Cases (and their evidence) that mention the entity."""
+    return {"entity": graph_index.get_entity(entity), "cases": graph_index.cases_sharing(entity)}
+
+@router.get("/stats")
+def get_graph_stats(current_user: auth.User = Depends(auth.get_current_user)):
+    return graph_index.stats()
@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.services.registry import registry
+from app.services.loop_monitor import loop_monitor
+
+router = APIRouter()
+
+@router.get("/live")
+def liveness():
+    """The process is up and serving requests (services may still be starting)."""
+    return {"status": "ok"}
+
+@router.get("/ready")
+def readiness():
+    """
+    Per-dependency readiness; 503 until every critical service is built and healthy.
+    Point load balancer / autoscaler health checks here.
+    """
+    report = registry.readiness()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+@router.get("/loop")
+def event_loop_lag():
+    """Event loop lag and recent stalls, each with the stack that was blocking the loop."""
+    return loop_monitor.stats()
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from app.api.v1.endpoints import auth
+from app.services.jobs import ai_jobs
+from app.services.ai import ai_service
+
+router = APIRouter()
+
+@router.get("/")
+def list_jobs(
+    status: Optional[str] = None,
+    evidence_id: Optional[str] = None,
+    limit: int = 100,
+    current_user: auth.User = Depends(auth.get_current_user)
+):
+    """List AI analysis jobs, optionally filtered by status or evidence."""
+    return ai_jobs.list_jobs(status=status, evidence_id=evidence_id, limit=limit)
+
+@router.get("/cache/stats")
+def get_ai_cache_stats(current_user: auth.User = Depends(auth.get_current_user)):
+    """Hit/miss counters and size of the content-addressed AI result cache."""
+    if not ai_service.cache:
+        return {"enabled": False}
+    return {"enabled": True, **ai_service.cache.stats()}
+
+@router.get("/{job_id}")
+def get_job(job_id: str, current_user: auth.User = Depends(auth.get_current_user)):
+    job = ai_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/{job_id}/retry")
+def retry_job(
+    job_id: str,
+    current_user: auth.User = Depends(auth.get_current_user)
+):
+    job = ai_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    retried = ai_jobs.retry(job_id)
+    if not retried:
+        raise HTTPException(status_code=409, detail=f"Job cannot be retried (status: {job['status']})")
+    return retried
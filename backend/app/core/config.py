@@ -13,22 +13,114 @@ class Settings(BaseSettings):
     S3_BUCKET_NAME: str = "forensichain-genai-data-2814"
     DYNAMODB_TABLE_CASES: str = "forensichain-cases"
     DYNAMODB_TABLE_EVIDENCE: str = "forensichain-metadata"
+    DYNAMODB_EVIDENCE_CASE_INDEX: str = "case_id-index" # GSI on the evidence table
+    DYNAMODB_CASE_NUMBER_INDEX: str = "caseNumber-index" # GSI on the cases table
+    DYNAMODB_TABLE_STATS: str = "forensichain-stats" # Per-district aggregates for the heatmap
+    GEO_HASH_PRECISION: int = 5 # ~5 km heatmap buckets
+    S3_MULTIPART_CHUNK_SIZE: int = 8 * 1024 * 1024 # S3 requires parts >= 5 MiB
+    S3_MAX_CONCURRENCY: int = 8 # Parts uploaded in parallel per file
+    S3_MAX_BANDWIDTH: int = 0 # Bytes/second across all uploads, 0 = unlimited
+    S3_ENDPOINT_URL: Optional[str] = None # S3-compatible stand-in (e.g. MinIO) for local testing
+    S3_PRESIGNED_URL_TTL: int = 300 # Seconds a download link stays valid
+
+    # Database
+    DATABASE_BACKEND: str = "auto" # Options: auto, dynamodb, local (auto = dynamodb when AWS credentials are set)
+    LOCAL_DB_PATH: str = "local_db.sqlite3"
+    DB_MAX_POOL_CONNECTIONS: int = 50 # HTTP connections kept open by the shared DynamoDB client
+    DB_MAX_WORKERS: int = 32 # Threads serving db.aio calls from async endpoints
+    CASES_PAGE_SIZE: int = 50
+    CASES_MAX_PAGE_SIZE: int = 500
+
+    # Uploads
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024 # Bytes read from the request per iteration
+    UPLOAD_SPOOL_DIR: str = "/tmp" # Where the AI step reads its copy of the evidence
+    UPLOAD_STATE_DB: str = "uploads.sqlite3" # Transfer state, used to resume interrupted uploads
+    DOWNLOAD_CHUNK_SIZE: int = 1024 * 1024
+
+    # Integrity verification
+    VERIFY_CACHE_DB: str = "verification_cache.sqlite3" # Last computed hash per object version
+    VERIFY_CHUNK_SIZE: int = 8 * 1024 * 1024 # Read size when streaming S3 objects through SHA-256
+    VERIFY_CACHE_TTL_SECONDS: int = 0 # Re-hash unchanged objects after this long; 0 = only when they change
+    AUDIT_WORKERS: int = 8 # Files hashed in parallel by case/locker audits
+    AUDIT_REPORT_DIR: str = "audit_reports"
 
     # Blockchain
     BLOCKCHAIN_RPC_URL: str = "http://127.0.0.1:8545"
     BLOCKCHAIN_CONTRACT_ADDRESS: Optional[str] = None
     BLOCKCHAIN_PRIVATE_KEY: Optional[str] = None
+    BLOCKCHAIN_CHAIN_ID: int = 1337 # Hardhat Local
+    BLOCKCHAIN_CONFIRMATIONS: int = 1
+    BLOCKCHAIN_RECEIPT_POLL_SECONDS: float = 1.0
+    BLOCKCHAIN_TX_MAX_PENDING_SECONDS: float = 600.0 # Unmined anchors older than this go to the local ledger
+    BLOCKCHAIN_HEALTH_INTERVAL_SECONDS: float = 5.0
+    BLOCKCHAIN_BREAKER_THRESHOLD: int = 3 # Consecutive failures before routing to the fallback ledger
+    BLOCKCHAIN_ANCHOR_MODE: str = "single" # Options: single, batch (Merkle root per batch)
+    BLOCKCHAIN_BATCH_SIZE: int = 1000
+    BLOCKCHAIN_BATCH_INTERVAL_SECONDS: float = 30.0
+    BLOCKCHAIN_LOG_BLOCK_RANGE: int = 10000 # Blocks per eth_getLogs call when audits scan anchor events
+    LOCAL_LEDGER_DB: str = "local_ledger.sqlite3" # Fallback ledger when the chain is unavailable
 
     # AI
     GEMINI_API_KEY: Optional[str] = None
+    GEMINI_MODEL: str = "gemini-2.0-flash"
     AI_PROVIDER: str = "gemini" # Options: gemini, local
     OLLAMA_BASE_URL: str = "http://localhost:11434/api/generate"
     OLLAMA_MODEL: str = "llama3"
+    AI_CONCURRENT_AGENTS: bool = True # Run detective + analyst agents in parallel
+    AI_AGENT_TIMEOUT_SECONDS: float = 120.0 # Per model call
+    AI_CHUNK_TOKENS: int = 6000 # Larger documents are analysed map-reduce style
+    AI_MAP_CONCURRENCY: int = 4 # Parallel chunk calls per document
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_DIR: str = "ai_cache"
+    AI_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # Docling conversion pool
+    DOCLING_USE_PROCESS_POOL: bool = True
+    DOCLING_WORKERS: int = 0 # 0 = one per CPU core
+    DOCLING_PREWARM: bool = False # Start workers and load models at startup
+    DOCLING_MAX_PAGES: int = 500
+    DOCLING_TIMEOUT_SECONDS: float = 300.0 # Per document, from when a worker picks it up
+
+    # AI Jobs (background analysis queue)
+    AI_JOBS_DB: str = "ai_jobs.sqlite3"
+    AI_WORKER_CONCURRENCY: int = 2
+    AI_JOB_MAX_ATTEMPTS: int = 3
+    AI_JOB_RETRY_BACKOFF_SECONDS: float = 30.0 # Doubles after every failed attempt
+    AI_JOB_RETRY_BACKOFF_MAX_SECONDS: float = 900.0
+
+    # Cross-case knowledge graph index
+    GRAPH_INDEX_DB: str = "graph_index.sqlite3"
+    GRAPH_MAX_HOPS: int = 3
+    GRAPH_MAX_NODES: int = 500 # Cap on subgraph size
+
+    # Startup
+    STARTUP_WARM_SERVICES: str = "database,storage,users,blockchain" # Built in parallel at startup; others on first use
+    STARTUP_WAIT_FOR_SERVICES: bool = False # Block startup until they are built (otherwise /health/ready reports it)
+
+    # Blocking work executors and event loop monitoring
+    FILES_EXECUTOR_WORKERS: int = 8 # Spool writes, hashing, local state
+    CHAIN_EXECUTOR_WORKERS: int = 4 # Web3 calls
+    STORAGE_EXECUTOR_WORKERS: int = 8 # Storage transfers (each runs its own part uploads)
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.05
+    LOOP_STALL_THRESHOLD_SECONDS: float = 0.25 # Report the blocking stack when the loop is stuck this long; 0 disables
+    LOOP_STALL_HISTORY: int = 20
 
     # Security
     SECRET_KEY: str = "supersecretkeydefaultsfortestingonly"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    BCRYPT_ROUNDS: int = 12 # Work factor; existing hashes are upgraded on the next successful login
+    PASSWORD_HASH_WORKERS: int = 0 # Threads verifying passwords; 0 = half the CPU cores
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TOKEN_CACHE_SIZE: int = 10000 # Validated tokens kept in memory
+    TOKEN_REVOCATION_DB: str = "revoked_tokens.sqlite3"
+    TOKEN_REVOCATION_CAPACITY: int = 100000 # Bloom filter sizing (0.1% false positives at this many revocations)
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 2.0 # How quickly other workers see a revocation
+
+    # Users
+    USER_STORE_BACKEND: str = "sqlite"
+    USER_STORE_DB: str = "users.sqlite3"
+    SEED_DEMO_USERS: bool = True # Create the polaris/forensics/judge demo accounts if missing
 
     class Config:
         import os
@@ -2,15 +2,51 @@ from datetime import datetime, timedelta
 from typing import Optional, Union, Any
 from jose import jwt
 from app.core.config import settings
+from concurrent.futures import ThreadPoolExecutor
 
+import asyncio
 import bcrypt
+import os
+import uuid
+
+# bcrypt releases the GIL, so a small dedicated pool hashes in parallel without touching the event loop
+# or the default threadpool that serves uploads and database calls.
+_hash_pool = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS or max(1, (os.cpu_count() or 2) // 2),
+    thread_name_prefix="bcrypt"
+)
+_dummy_hash = None
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 def get_password_hash(password: str) -> str:
     # bcrypt.hashpw returns bytes, we decode to store as string
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode('utf-8')
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different work factor than BCRYPT_ROUNDS ($2b$<rounds>$...)."""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+async def verify_password_async(plain_password: str, hashed_password: Optional[str]) -> bool:
+    """
+    verify_password on the bcrypt pool. With no hash (unknown user) a dummy hash is still checked,
+    so response time does not reveal which usernames exist.
+    """
+    global _dummy_hash
+    loop = asyncio.get_running_loop()
+    if hashed_password is None:
+        if _dummy_hash is None:
+            _dummy_hash = await loop.run_in_executor(_hash_pool, get_password_hash, os.urandom(16).hex())
+        await loop.run_in_executor(_hash_pool, verify_password, plain_password, _dummy_hash)
+        return False
+    return await loop.run_in_executor(_hash_pool, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_hash_pool, get_password_hash, password)
 
 def create_access_token(subject: Union[str, Any], role: str, expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta:
@@ -18,6 +54,13 @@ def create_access_token(subject: Union[str, Any], role: str, expires_delta: Opti
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode = {"exp": expire, "sub": str(subject), "role": role}
+    # jti identifies the token so it can be revoked before it expires
+    to_encode = {"exp": expire, "sub": str(subject), "role": role, "type": "access", "jti": uuid.uuid4().hex}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
+
+def create_refresh_token(subject: Union[str, Any], role: str) -> str:
+    """Long-lived token accepted only by /auth/refresh; each use rotates it."""
+    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = {"exp": expire, "sub": str(subject), "role": role, "type": "refresh", "jti": uuid.uuid4().hex}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
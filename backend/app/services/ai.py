@@ -1,36 +1,95 @@
 from app.core.config import settings
-from google import genai
-from google.genai import types
+import asyncio
 import json
 import logging
-from docling.document_converter import DocumentConverter
+import threading
+from app.services.registry import registry
+from app.services.ai_cache import AIResultCache
+from app.services.conversion import conversion_service
+from app.services.chunking import split_markdown, merge_graphs
+
+# Bump whenever the prompts change so cached results from older prompts are not reused
+PROMPT_VERSION = "2"
+
+MULTIMODAL_SUMMARY_PROMPT = "You are a senior forensic detective. Analyze this evidence (video/audio/image) and write a professional, concise case summary. Focus on facts, events, and key individuals."
+
+MULTIMODAL_GRAPH_PROMPT = """
+            Extract entities and relationships from this evidence for a Knowledge Graph.
+            Return ONLY a JSON object with this exact schema:
+            {
+                "nodes": [{"id": "Name", "group": "Person|Location|Incident|Evidence"}],
+                "links": [{"source": "Name", "target": "Name", "value": "relationship description"}]
+            }
+            """
 
 class AIService:
-    def __init__(self):
+    def __init__(self, client=None):
         self.api_key = settings.GEMINI_API_KEY
-        self.client = None
+        self.model = settings.GEMINI_MODEL
+        self.agent_timeout = settings.AI_AGENT_TIMEOUT_SECONDS
+        # Allow a client to be injected (e.g. a local stub for benchmarks)
+        self.client = client
         # Lazy load converter to avoid startup issues if not used immediately
         self._converter = None
-        
-        if self.api_key:
+        # Event loop for the async agent calls, started on first use (see _agent_loop)
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self.cache = AIResultCache() if settings.AI_CACHE_ENABLED else None
+
+        if self.client is None and self.api_key:
+            # google.genai and docling are imported on first use, not when the app is imported
+            from google import genai
             self.client = genai.Client(api_key=self.api_key)
 
     @property
     def converter(self):
         if self._converter is None:
+            from docling.document_converter import DocumentConverter
             self._converter = DocumentConverter()
         return self._converter
 
-    def _convert_file_to_markdown(self, file_path: str) -> str:
+    def _agent_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        One long-lived event loop, in its own thread, for every job's async agent calls.
+        client.aio keeps a single HTTP connection pool that is bound to the first loop using it,
+        so a loop per job (asyncio.run) would leave later jobs with dead connections.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="ai-agents", daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    @staticmethod
+    def _json_config():
+        from google.genai import types
+        return types.GenerateContentConfig(response_mime_type="application/json")
+
+    def _convert_file_to_markdown(self, file_path: str, errors: list = None) -> str:
         """Uses Docling to convert PDF/Image to Markdown."""
         try:
+            if settings.DOCLING_USE_PROCESS_POOL:
+                return conversion_service.convert(file_path)
             result = self.converter.convert(file_path)
             return result.document.export_to_markdown()
         except Exception as e:
             print(f"Docling conversion error: {e}")
+            if errors is not None: errors.append(f"conversion: {e}")
+            return f"Error parsing document: {str(e)}"
+
+    async def _aconvert_file_to_markdown(self, file_path: str, errors: list = None) -> str:
+        if not settings.DOCLING_USE_PROCESS_POOL:
+            # In-process Docling is CPU-bound and synchronous, keep it off the event loop
+            return await asyncio.to_thread(self._convert_file_to_markdown, file_path, errors)
+        try:
+            return await conversion_service.aconvert(file_path)
+        except Exception as e:
+            print(f"Docling conversion error: {e}")
+            if errors is not None: errors.append(f"conversion: {e}")
             return f"Error parsing document: {str(e)}"
 
-    def _process_multimodal(self, file_path: str, mime_type: str) -> dict:
+    def _process_multimodal(self, file_path: str, mime_type: str, errors: list = None) -> dict:
         """Handles Video/Audio/Images directly via Gemini's File API."""
         try:
             if not self.client:
@@ -39,71 +98,157 @@ class AIService:
             # 1. Upload file to Gemini
             print(f"Uploading {file_path} to Gemini...")
             uploaded_file = self.client.files.upload(path=file_path)
-            
+
             # 2. Generate Summary (Detective Agent)
-            summary_prompt = "You are a senior forensic detective. Analyze this evidence (video/audio/image) and write a professional, concise case summary. Focus on facts, events, and key individuals."
             summary_response = self.client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=[uploaded_file, summary_prompt]
+                model=self.model,
+                contents=[uploaded_file, MULTIMODAL_SUMMARY_PROMPT]
             )
-            
+
             # 3. Extract Knowledge Graph (Analyst Agent)
-            graph_prompt = """
-            Extract entities and relationships from this evidence for a Knowledge Graph.
-            Return ONLY a JSON object with this exact schema:
-            {
-                "nodes": [{"id": "Name", "group": "Person|Location|Incident|Evidence"}],
-                "links": [{"source": "Name", "target": "Name", "value": "relationship description"}]
-            }
-            """
             graph_response = self.client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=[uploaded_file, graph_prompt],
-                config=types.GenerateContentConfig(response_mime_type="application/json")
+                model=self.model,
+                contents=[uploaded_file, MULTIMODAL_GRAPH_PROMPT],
+                config=self._json_config()
             )
-            
+
             return {
                 "summary": summary_response.text,
                 "graph": json.loads(graph_response.text)
             }
         except Exception as e:
             print(f"Multimodal processing error: {e}")
+            if errors is not None: errors.append(f"multimodal: {e}")
             return {
                 "summary": f"Error processing multimodal evidence: {str(e)}",
                 "graph": {"nodes": [], "links": []}
             }
 
-    def _run_detective_agent(self, context: str) -> str:
-        """
-        Role: Senior Detective
-        Task: Analyze text evidence and produce a summary.
-        """
+    async def _aprocess_multimodal(self, file_path: str, mime_type: str, errors: list = None) -> dict:
+        """Async variant of _process_multimodal: both agent calls run in parallel."""
         try:
-            if not self.client: return "AI Service Unavailable"
-            
-            prompt = f"""
-            You are a Senior Forensic Detective. 
+            if not self.client:
+                return {"summary": "Gemini Client not initialized.", "graph": {"nodes": [], "links": []}}
+
+            print(f"Uploading {file_path} to Gemini...")
+            uploaded_file = await self._with_timeout(self.client.aio.files.upload(path=file_path))
+
+            summary_response, graph_response = await asyncio.gather(
+                self._with_timeout(self.client.aio.models.generate_content(
+                    model=self.model,
+                    contents=[uploaded_file, MULTIMODAL_SUMMARY_PROMPT]
+                )),
+                self._with_timeout(self.client.aio.models.generate_content(
+                    model=self.model,
+                    contents=[uploaded_file, MULTIMODAL_GRAPH_PROMPT],
+                    config=self._json_config()
+                ))
+            )
+
+            return {
+                "summary": summary_response.text,
+                "graph": json.loads(graph_response.text)
+            }
+        except Exception as e:
+            print(f"Multimodal processing error: {e}")
+            if errors is not None: errors.append(f"multimodal: {e}")
+            return {
+                "summary": f"Error processing multimodal evidence: {str(e)}",
+                "graph": {"nodes": [], "links": []}
+            }
+
+    def _detective_prompt(self, context: str, part: tuple = None) -> str:
+        scope = ""
+        if part:
+            scope = f"This is part {part[0]} of {part[1]} of a larger document. Summarize only this part; it will be merged with the others."
+        return f"""
+            You are a Senior Forensic Detective.
             Analyze the following evidence content and provide a professional case summary.
-            
+            {scope}
+
             Evidence Content:
-            {context[:30000]}  # Limit context window just in case
-            
+            {context}
+
             Output Guidelines:
             - Start with a strict status (Relevant/Irrelevant)
             - Summarize key facts, timeline, and involved individuals.
             - maintain a professional, objective tone.
             """
-            
+
+    def _analyst_prompt(self, context: str) -> str:
+        return f"""
+            You are a Criminal Intelligence Analyst.
+            Extract entities and relationships from the text below for a Knowledge Graph.
+
+            Evidence Content:
+            {context}
+
+            Return ONLY a JSON object with this exact schema:
+            {{
+                "nodes": [{{"id": "Name", "group": "Person|Location|Incident|Evidence"}}],
+                "links": [{{"source": "Name", "target": "Name", "value": "relationship description"}}]
+            }}
+            """
+
+    def _reduce_prompt(self, partial_summaries: list) -> str:
+        parts = "\n\n".join(
+            f"--- Part {i + 1} ---\n{summary}" for i, summary in enumerate(partial_summaries)
+        )
+        return f"""
+            You are a Senior Forensic Detective.
+            The partial summaries below each cover one consecutive part of the same evidence document.
+            Merge them into a single professional case summary of the whole document.
+
+            Partial Summaries:
+            {parts}
+
+            Output Guidelines:
+            - Start with a strict status (Relevant/Irrelevant)
+            - Summarize key facts, timeline, and involved individuals across all parts.
+            - Remove repetition between parts; maintain a professional, objective tone.
+            """
+
+    async def _with_timeout(self, coro):
+        """Bounds a single model call; on timeout the underlying request is cancelled."""
+        return await asyncio.wait_for(coro, timeout=self.agent_timeout)
+
+    def _run_detective_agent(self, context: str, errors: list = None, part: tuple = None) -> str:
+        """
+        Role: Senior Detective
+        Task: Analyze text evidence and produce a summary.
+        """
+        try:
+            if not self.client: return "AI Service Unavailable"
+
             response = self.client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt
+                model=self.model,
+                contents=self._detective_prompt(context, part)
             )
             return response.text
         except Exception as e:
             print(f"Detective Agent Error: {e}")
+            if errors is not None: errors.append(f"detective: {e}")
             return f"Error analyzing document: {str(e)}"
 
-    def _run_analyst_agent(self, context: str) -> dict:
+    async def _arun_detective_agent(self, context: str, errors: list = None, part: tuple = None) -> str:
+        try:
+            if not self.client: return "AI Service Unavailable"
+
+            response = await self._with_timeout(self.client.aio.models.generate_content(
+                model=self.model,
+                contents=self._detective_prompt(context, part)
+            ))
+            return response.text
+        except asyncio.TimeoutError:
+            print(f"Detective Agent Timeout after {self.agent_timeout}s")
+            if errors is not None: errors.append("detective: timeout")
+            return f"Error analyzing document: timed out after {self.agent_timeout}s"
+        except Exception as e:
+            print(f"Detective Agent Error: {e}")
+            if errors is not None: errors.append(f"detective: {e}")
+            return f"Error analyzing document: {str(e)}"
+
+    def _run_analyst_agent(self, context: str, errors: list = None) -> dict:
         """
         Role: Intelligence Analyst
         Task: Extract entities and relationships for knowledge graph.
@@ -111,37 +256,119 @@ class AIService:
         try:
             if not self.client: return {"nodes": [], "links": []}
 
-            prompt = f"""
-            You are a Criminal Intelligence Analyst.
-            Extract entities and relationships from the text below for a Knowledge Graph.
-            
-            Evidence Content:
-            {context[:30000]}
-            
-            Return ONLY a JSON object with this exact schema:
-            {{
-                "nodes": [{{"id": "Name", "group": "Person|Location|Incident|Evidence"}}],
-                "links": [{{"source": "Name", "target": "Name", "value": "relationship description"}}]
-            }}
-            """
-            
             response = self.client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt,
-                config=types.GenerateContentConfig(response_mime_type="application/json")
+                model=self.model,
+                contents=self._analyst_prompt(context),
+                config=self._json_config()
             )
             return json.loads(response.text)
         except Exception as e:
             print(f"Analyst Agent Error: {e}")
+            if errors is not None: errors.append(f"analyst: {e}")
             return {"nodes": [], "links": []}
 
-    def generate_summary(self, file_path: str) -> dict:
-        if not self.api_key:
-             return {
-                "summary": "AI Service not configured (Missing Gemini API Key)",
-                "graph": {"nodes": [], "links": []}
-            }
-        
+    async def _arun_analyst_agent(self, context: str, errors: list = None) -> dict:
+        try:
+            if not self.client: return {"nodes": [], "links": []}
+
+            response = await self._with_timeout(self.client.aio.models.generate_content(
+                model=self.model,
+                contents=self._analyst_prompt(context),
+                config=self._json_config()
+            ))
+            return json.loads(response.text)
+        except asyncio.TimeoutError:
+            print(f"Analyst Agent Timeout after {self.agent_timeout}s")
+            if errors is not None: errors.append("analyst: timeout")
+            return {"nodes": [], "links": []}
+        except Exception as e:
+            print(f"Analyst Agent Error: {e}")
+            if errors is not None: errors.append(f"analyst: {e}")
+            return {"nodes": [], "links": []}
+
+    def _run_reduce_agent(self, partial_summaries: list, errors: list = None) -> str:
+        """
+        Role: Senior Detective
+        Task: Merge per-chunk summaries of a large document into one summary.
+        """
+        try:
+            if not self.client: return "AI Service Unavailable"
+
+            response = self.client.models.generate_content(
+                model=self.model,
+                contents=self._reduce_prompt(partial_summaries)
+            )
+            return response.text
+        except Exception as e:
+            print(f"Reduce Agent Error: {e}")
+            if errors is not None: errors.append(f"reduce: {e}")
+            return "\n\n".join(partial_summaries)
+
+    async def _arun_reduce_agent(self, partial_summaries: list, errors: list = None) -> str:
+        try:
+            if not self.client: return "AI Service Unavailable"
+
+            response = await self._with_timeout(self.client.aio.models.generate_content(
+                model=self.model,
+                contents=self._reduce_prompt(partial_summaries)
+            ))
+            return response.text
+        except asyncio.TimeoutError:
+            print(f"Reduce Agent Timeout after {self.agent_timeout}s")
+            if errors is not None: errors.append("reduce: timeout")
+            return "\n\n".join(partial_summaries)
+        except Exception as e:
+            print(f"Reduce Agent Error: {e}")
+            if errors is not None: errors.append(f"reduce: {e}")
+            return "\n\n".join(partial_summaries)
+
+    async def _arun_document_agents(self, markdown_content: str, errors: list = None) -> dict:
+        """
+        Runs the detective and analyst agents on the document concurrently.
+        Documents larger than AI_CHUNK_TOKENS are analysed map-reduce style:
+        every chunk is summarised and graphed in parallel, then the partial
+        summaries are merged by a reduce call and the graphs are merged locally.
+        """
+        chunks = split_markdown(markdown_content, settings.AI_CHUNK_TOKENS)
+        if len(chunks) == 1:
+            summary, graph_data = await asyncio.gather(
+                self._arun_detective_agent(markdown_content, errors),
+                self._arun_analyst_agent(markdown_content, errors)
+            )
+            return {"summary": summary, "graph": graph_data}
+
+        semaphore = asyncio.Semaphore(max(1, settings.AI_MAP_CONCURRENCY))
+
+        async def bounded(coro):
+            async with semaphore:
+                return await coro
+
+        total = len(chunks)
+        results = await asyncio.gather(
+            *[bounded(self._arun_detective_agent(chunk, errors, part=(i + 1, total))) for i, chunk in enumerate(chunks)],
+            *[bounded(self._arun_analyst_agent(chunk, errors)) for chunk in chunks]
+        )
+        partial_summaries, graphs = results[:total], results[total:]
+
+        summary = await self._arun_reduce_agent(partial_summaries, errors)
+        return {"summary": summary, "graph": merge_graphs(graphs)}
+
+    def _run_document_agents(self, markdown_content: str, errors: list = None) -> dict:
+        """Sequential counterpart of _arun_document_agents."""
+        chunks = split_markdown(markdown_content, settings.AI_CHUNK_TOKENS)
+        if len(chunks) == 1:
+            summary = self._run_detective_agent(markdown_content, errors)
+            graph_data = self._run_analyst_agent(markdown_content, errors)
+            return {"summary": summary, "graph": graph_data}
+
+        total = len(chunks)
+        partial_summaries = [self._run_detective_agent(chunk, errors, part=(i + 1, total)) for i, chunk in enumerate(chunks)]
+        graphs = [self._run_analyst_agent(chunk, errors) for chunk in chunks]
+        summary = self._run_reduce_agent(partial_summaries, errors)
+        return {"summary": summary, "graph": merge_graphs(graphs)}
+
+    def _classify(self, file_path: str):
+        """Returns ("document", None) or ("media", mime_type) for a file path."""
         # Determine if we should use Docling or Multimodal
         ext = file_path.split('.')[-1].lower()
         doc_exts = ['pdf', 'docx', 'pptx', 'xlsx', 'md', 'txt', 'html']
@@ -152,22 +379,87 @@ class AIService:
         ]
 
         if ext in doc_exts:
-            # 1. Parse Document via Docling
-            markdown_content = self._convert_file_to_markdown(file_path)
-            # 2. Run Agents on text
-            summary = self._run_detective_agent(markdown_content)
-            graph_data = self._run_analyst_agent(markdown_content)
-            return {"summary": summary, "graph": graph_data}
+            return "document", None
         elif ext in media_exts:
             # Determine mime type roughly
             mime_type = "application/octet-stream"
             if ext in ['mp4', 'mov', 'avi']: mime_type = "video/mp4"
             elif ext in ['mp3', 'wav', 'aac']: mime_type = "audio/mpeg"
             elif ext in ['jpg', 'png', 'jpeg', 'webp']: mime_type = "image/jpeg"
-            
-            return self._process_multimodal(file_path, mime_type)
+            return "media", mime_type
         else:
             # Fallback to multimodal for unknown types
-            return self._process_multimodal(file_path, "application/octet-stream")
+            return "media", "application/octet-stream"
+
+    def _cache_key(self, file_hash: str):
+        if not self.cache or not file_hash:
+            return None
+        return AIResultCache.make_key(file_hash, settings.AI_PROVIDER, self.model, PROMPT_VERSION)
+
+    def _finalize(self, result: dict, errors: list, cache_key: str) -> dict:
+        """Flags failed analyses and caches the successful ones."""
+        if errors:
+            result["error"] = "; ".join(errors)
+        elif cache_key:
+            self.cache.put(cache_key, result)
+        return result
+
+    async def agenerate_summary(self, file_path: str, file_hash: str = None) -> dict:
+        """Concurrent execution mode: both agent calls for an item run in parallel."""
+        if not self.api_key and self.client is None:
+             return {
+                "summary": "AI Service not configured (Missing Gemini API Key)",
+                "graph": {"nodes": [], "links": []}
+            }
+
+        # Identical bytes were analysed before with the same prompts and model
+        cache_key = self._cache_key(file_hash)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        errors = []
+        kind, mime_type = self._classify(file_path)
+        if kind == "document":
+            markdown_content = await self._aconvert_file_to_markdown(file_path, errors)
+            result = await self._arun_document_agents(markdown_content, errors)
+        else:
+            result = await self._aprocess_multimodal(file_path, mime_type, errors)
+        return self._finalize(result, errors, cache_key)
+
+    def generate_summary(self, file_path: str, file_hash: str = None) -> dict:
+        """
+        Analyses a file and returns {"summary", "graph"}; "error" is set if any step failed.
+        Pass the file's SHA-256 to reuse a cached result for identical content.
+        """
+        if not self.api_key and self.client is None:
+             return {
+                "summary": "AI Service not configured (Missing Gemini API Key)",
+                "graph": {"nodes": [], "links": []}
+            }
+
+        if settings.AI_CONCURRENT_AGENTS:
+            # Called from AI worker threads; concurrent jobs share the agent loop
+            return asyncio.run_coroutine_threadsafe(
+                self.agenerate_summary(file_path, file_hash), self._agent_loop()
+            ).result()
+
+        cache_key = self._cache_key(file_hash)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        errors = []
+        kind, mime_type = self._classify(file_path)
+        if kind == "document":
+            # 1. Parse Document via Docling
+            markdown_content = self._convert_file_to_markdown(file_path, errors)
+            # 2. Run Agents on text
+            result = self._run_document_agents(markdown_content, errors)
+        else:
+            result = self._process_multimodal(file_path, mime_type, errors)
+        return self._finalize(result, errors, cache_key)
 
-ai_service = AIService()
+ai_service = registry.register("ai", AIService, check=lambda s: {"gemini_configured": s.client is not None}, critical=False)
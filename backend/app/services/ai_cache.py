@@ -0,0 +1,96 @@
+from app.core.config import settings
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+
+class AIResultCache:
+    """
+    Content-addressed cache for AI results.
+    Entries are JSON files in AI_CACHE_DIR, one per (sha256, provider, model, prompt version) key.
+    The in-memory index is kept in LRU order and the oldest entries are evicted
+    once the directory grows past AI_CACHE_MAX_BYTES.
+    """
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.cache_dir = cache_dir or settings.AI_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else settings.AI_CACHE_MAX_BYTES
+        self._lock = threading.Lock()
+        self._index = OrderedDict() # key -> size in bytes, least recently used first
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Rebuild the LRU order from file mtimes (touched on every hit)
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((stat.st_mtime, name[:-5], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def make_key(file_hash: str, provider: str, model: str, prompt_version: str) -> str:
+        raw = f"{file_hash}|{provider}|{model}|{prompt_version}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str):
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), "r") as f:
+                    result = json.load(f)
+                os.utime(self._path(key))
+            except (FileNotFoundError, json.JSONDecodeError):
+                # Entry vanished or is corrupt; forget it
+                self._total_bytes -= self._index.pop(key)
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: str, result: dict):
+        data = json.dumps(result).encode()
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            tmp_path = self._path(key) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+
+            if key in self._index:
+                self._total_bytes -= self._index.pop(key)
+            self._index[key] = len(data)
+            self._total_bytes += len(data)
+
+            while self._total_bytes > self.max_bytes and self._index:
+                old_key, size = self._index.popitem(last=False)
+                self._total_bytes -= size
+                self.evictions += 1
+                try:
+                    os.remove(self._path(old_key))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
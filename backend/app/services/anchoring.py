@@ -0,0 +1,216 @@
+from app.core.config import settings
+from collections import OrderedDict
+from datetime import datetime
+import threading
+import time
+
+class AnchorService:
+    """
+    Sends anchoring transactions without blocking on their receipts.
+    - Nonces come from a local counter (synced from the node once), so concurrent
+      uploads get consecutive nonces instead of colliding on get_transaction_count.
+    - Transactions are pipelined: send returns as soon as the node accepts the tx.
+    - A background thread polls receipts and tracks confirmations per evidence item.
+    - A transaction that reverts, or is dropped (its nonce was used by another transaction, the node
+      no longer knows it, e.g. after a Hardhat restart, or it stays unmined for
+      BLOCKCHAIN_TX_MAX_PENDING_SECONDS), runs its on_failure handler, which writes the local ledger.
+    """
+    def __init__(self, w3, account_address: str, private_key: str):
+        self.w3 = w3
+        self.account_address = account_address
+        self.private_key = private_key
+        self.chain_id = settings.BLOCKCHAIN_CHAIN_ID
+        self.required_confirmations = settings.BLOCKCHAIN_CONFIRMATIONS
+        self.poll_interval = settings.BLOCKCHAIN_RECEIPT_POLL_SECONDS
+        self.max_pending = settings.BLOCKCHAIN_TX_MAX_PENDING_SECONDS
+
+        self._nonce = None
+        self._send_lock = threading.Lock()
+        self._status_lock = threading.Lock()
+        self._pending = {} # tx_hash -> {"evidence_id", "nonce", "sent" (monotonic)}
+        self._failure_handlers = {} # tx_hash -> callable, run if the tx reverts or is dropped
+        self._statuses = OrderedDict() # evidence_id -> status dict, oldest first
+        self._max_statuses = 10000
+        self._tracker = None
+        self._running = False
+
+    # --- Sending ---
+
+    def _sync_nonce(self):
+        # "pending" includes our own transactions that are not mined yet
+        self._nonce = self.w3.eth.get_transaction_count(self.account_address, "pending")
+
+    def reset_nonce(self):
+        """Forgets the local nonce; the next send resyncs it from the node."""
+        with self._send_lock:
+            self._nonce = None
+
+    def send(self, contract_call, evidence_id: str, on_failure=None) -> str:
+        """
+        Builds, signs and sends contract_call with the next local nonce.
+        Returns the tx hash immediately; confirmation is tracked in the background.
+        on_failure is called if the transaction reverts or is dropped.
+        """
+        with self._send_lock:
+            if self._nonce is None:
+                self._sync_nonce()
+            try:
+                tx_hash = self._sign_and_send(contract_call, self._nonce)
+            except Exception as e:
+                if "nonce" not in str(e).lower():
+                    # Nothing was consumed; resync in case the node disagrees with us
+                    self._nonce = None
+                    raise
+                # Someone else used our nonce (another worker, a restart): resync once and retry
+                self._sync_nonce()
+                tx_hash = self._sign_and_send(contract_call, self._nonce)
+            nonce = self._nonce
+            self._nonce += 1
+
+        tx_hex = self.w3.to_hex(tx_hash)
+        with self._status_lock:
+            self._pending[tx_hex] = {"evidence_id": evidence_id, "nonce": nonce, "sent": time.monotonic()}
+            if on_failure:
+                self._failure_handlers[tx_hex] = on_failure
+            self._statuses[evidence_id] = {
+                "tx_hash": tx_hex,
+                "nonce": nonce,
+                "status": "PENDING",
+                "block_number": None,
+                "confirmations": 0,
+                "sent_at": str(datetime.now())
+            }
+            # Forget the oldest finished transactions; status() can still ask the node for them
+            while len(self._statuses) > self._max_statuses:
+                _, old = next(iter(self._statuses.items()))
+                if old["tx_hash"] in self._pending:
+                    break
+                self._statuses.popitem(last=False)
+        self.start()
+        return tx_hex
+
+    def _sign_and_send(self, contract_call, nonce: int):
+        tx = contract_call.build_transaction({
+            'chainId': self.chain_id,
+            'gas': 2000000,
+            'gasPrice': self.w3.to_wei('1', 'gwei'),
+            'nonce': nonce,
+            'from': self.account_address
+        })
+        signed_tx = self.w3.eth.account.sign_transaction(tx, private_key=self.private_key)
+        raw_tx = getattr(signed_tx, "raw_transaction", None) or signed_tx.rawTransaction
+        return self.w3.eth.send_raw_transaction(raw_tx)
+
+    # --- Confirmation Tracking ---
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._tracker = threading.Thread(target=self._track_loop, name="anchor-tracker", daemon=True)
+        self._tracker.start()
+
+    def stop(self):
+        self._running = False
+
+    def _track_loop(self):
+        while self._running:
+            try:
+                self._poll_receipts()
+            except Exception as e:
+                print(f"Anchor tracker error: {e}")
+            time.sleep(self.poll_interval)
+
+    def _poll_receipts(self):
+        with self._status_lock:
+            pending = dict(self._pending)
+        if not pending:
+            return
+
+        latest_block = self.w3.eth.block_number
+        confirmed_nonce = None
+        for tx_hash, tx in pending.items():
+            evidence_id = tx["evidence_id"]
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            except Exception:
+                # Not mined yet, or never will be
+                if confirmed_nonce is None:
+                    confirmed_nonce = self.w3.eth.get_transaction_count(self.account_address, "latest")
+                reason = self._drop_reason(tx_hash, tx, confirmed_nonce)
+                if reason:
+                    self._drop(tx_hash, evidence_id, reason)
+                continue
+
+            failure_handler = None
+            with self._status_lock:
+                status = self._statuses[evidence_id]
+                status["block_number"] = receipt["blockNumber"]
+                status["confirmations"] = latest_block - receipt["blockNumber"] + 1
+                if receipt["status"] != 1:
+                    status["status"] = "FAILED"
+                    self._pending.pop(tx_hash, None)
+                    failure_handler = self._failure_handlers.pop(tx_hash, None)
+                elif status["confirmations"] >= self.required_confirmations:
+                    status["status"] = "CONFIRMED"
+                    self._pending.pop(tx_hash, None)
+                    self._failure_handlers.pop(tx_hash, None)
+                else:
+                    status["status"] = "MINED"
+
+            if failure_handler:
+                print(f"Anchor transaction reverted for {evidence_id}: {tx_hash}")
+                failure_handler()
+
+    def _drop_reason(self, tx_hash: str, tx: dict, confirmed_nonce: int):
+        """Why an unmined transaction will never be mined, or None if it may still be."""
+        from web3.exceptions import TransactionNotFound
+
+        age = time.monotonic() - tx["sent"]
+        if tx["nonce"] < confirmed_nonce:
+            # Our nonce was mined, so unless this tx was mined since we asked, another tx replaced it
+            try:
+                self.w3.eth.get_transaction_receipt(tx_hash)
+                return None
+            except TransactionNotFound:
+                return "nonce used by another transaction"
+        if age > self.max_pending:
+            return f"not mined after {self.max_pending:g}s"
+        if age > 2 * self.poll_interval:
+            try:
+                self.w3.eth.get_transaction(tx_hash)
+            except TransactionNotFound:
+                return "unknown to the node"
+        return None
+
+    def _drop(self, tx_hash: str, evidence_id: str, reason: str):
+        with self._status_lock:
+            if self._pending.pop(tx_hash, None) is None:
+                return
+            if evidence_id in self._statuses:
+                self._statuses[evidence_id]["status"] = "DROPPED"
+            failure_handler = self._failure_handlers.pop(tx_hash, None)
+        # Later nonces are stuck behind the gap; resync from the node
+        self.reset_nonce()
+        print(f"Anchor transaction dropped for {evidence_id} ({reason}): {tx_hash}")
+        if failure_handler:
+            failure_handler()
+
+    def status(self, evidence_id: str, tx_hash: str = None):
+        """Returns the anchoring status, asking the node directly for untracked transactions."""
+        with self._status_lock:
+            if evidence_id in self._statuses:
+                return dict(self._statuses[evidence_id])
+        if not tx_hash or not tx_hash.startswith("0x") or tx_hash.startswith("0xLOCAL"):
+            return None
+        try:
+            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+        except Exception:
+            return {"tx_hash": tx_hash, "status": "UNKNOWN", "block_number": None, "confirmations": 0}
+        confirmations = self.w3.eth.block_number - receipt["blockNumber"] + 1
+        return {
+            "tx_hash": tx_hash,
+            "status": "FAILED" if receipt["status"] != 1 else "CONFIRMED" if confirmations >= self.required_confirmations else "MINED",
+            "block_number": receipt["blockNumber"],
+            "confirmations": confirmations
+        }
@@ -0,0 +1,191 @@
+from app.core.config import settings
+from app.services import merkle
+from app.services.database import db
+from app.services.metrics import CHAIN_ERRORS
+import json
+import sqlite3
+import threading
+
+def record_anchor(entry: dict, anchor: dict):
+    """Default on_anchored: stores the batch tx hash and inclusion proof on the evidence record."""
+    if not db.update_evidence_metadata(entry["evidence_id"], anchor):
+        print(f"Batch anchor for {entry['evidence_id']} has no evidence record to update")
+        return
+    db.update_evidence_in_case(entry["case_id"], entry["evidence_id"], anchor)
+
+class BatchAnchorer:
+    """
+    Merkle-batched anchoring.
+    Evidence hashes are collected until BLOCKCHAIN_BATCH_SIZE items are pending or
+    BLOCKCHAIN_BATCH_INTERVAL_SECONDS have passed; then a Merkle tree is built over them
+    and only its root is anchored, in a single anchorBatch transaction.
+    Each item's inclusion proof is handed back through its on_anchored callback
+    (by default record_anchor, which writes it to the evidence record).
+    Pending items are also kept in a table next to the local ledger, so a crash or restart
+    does not lose them: they are reloaded and anchored in the next batch. If they had in fact been
+    anchored already, anchorBatch rejects the repeated root and the earlier transaction is used.
+    """
+    def __init__(self, blockchain_service):
+        self.service = blockchain_service
+        self.batch_size = settings.BLOCKCHAIN_BATCH_SIZE
+        self.interval = settings.BLOCKCHAIN_BATCH_INTERVAL_SECONDS
+        self.db_path = blockchain_service.ledger.db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = [] # (queue seq, ledger entry, on_anchored callback)
+        self._thread = None
+        self._running = False
+
+        self._conn().execute("""
+            CREATE TABLE IF NOT EXISTS batch_queue (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                data TEXT NOT NULL
+            )
+        """)
+        # Items queued before a crash or restart; their proofs go to the evidence records
+        self._pending = [
+            (seq, json.loads(data), None)
+            for seq, data in self._conn().execute("SELECT seq, data FROM batch_queue ORDER BY seq")
+        ]
+        if self._pending:
+            print(f"Restored {len(self._pending)} items waiting for a Merkle batch")
+            self.start()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, entry: dict, on_anchored=None):
+        seq = self._conn().execute("INSERT INTO batch_queue (data) VALUES (?)", (json.dumps(entry),)).lastrowid
+        with self._lock:
+            self._pending.append((seq, entry, on_anchored))
+            full = len(self._pending) >= self.batch_size
+        self.start()
+        if full:
+            self._wakeup.set()
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._flush_loop, name="batch-anchorer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+        # Anchor everything still queued, one batch at a time
+        while self.flush():
+            pass
+
+    def _flush_loop(self):
+        while self._running:
+            self._wakeup.wait(timeout=self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Batch anchoring error: {e}")
+
+    def flush(self) -> int:
+        """Anchors up to one batch of pending items; returns how many were handled."""
+        with self._flush_lock:
+            with self._lock:
+                items, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+                if self._pending:
+                    self._wakeup.set()
+            if not items:
+                return 0
+
+            levels = merkle.build_tree([merkle.leaf_hash(entry["evidence_id"], entry["hash"]) for _, entry, _ in items])
+            root = levels[-1][0]
+
+            try:
+                tx_hash = self._send_batch(root, levels, items)
+            except Exception as e:
+                print(f"Batch anchor transaction failed, using Local Ledger Fallback: {e}")
+                CHAIN_ERRORS.inc(operation="anchor_batch")
+                for _, entry, on_anchored in items:
+                    self.service._append_to_ledger(entry)
+                    self._notify(entry, on_anchored, {
+                        "anchor_mode": "local_ledger",
+                        "tx_hash": self.service._local_tx_hash(entry["hash"])
+                    })
+                self._dequeue(items)
+                return len(items)
+
+            self._notify_anchored(items, levels, tx_hash)
+            self._dequeue(items)
+            return len(items)
+
+    def _send_batch(self, root: bytes, levels: list, items: list) -> str:
+        if not self.service.contract:
+            raise RuntimeError("No contract attached")
+        try:
+            tx_hash = self.service.anchor.send(
+                self.service.contract.functions.anchorBatch(root, len(items)),
+                f"batch:0x{root.hex()}",
+                on_failure=lambda: self._on_batch_failed(root, levels, items)
+            )
+        except Exception as e:
+            # Items anchored just before a crash are re-batched into the same root, which anchorBatch
+            # rejects: that is a success, the proofs just point at the earlier transaction
+            tx_hash = self._anchored_tx(root) if "Batch already anchored" in str(e) else None
+            if tx_hash is None:
+                raise
+            print(f"Merkle batch 0x{root.hex()} was already anchored in {tx_hash}")
+            return tx_hash
+        print(f"Anchored Merkle batch of {len(items)} items: 0x{root.hex()}")
+        return tx_hash
+
+    def _notify_anchored(self, items: list, levels: list, tx_hash: str):
+        root = levels[-1][0]
+        for index, (_, entry, on_anchored) in enumerate(items):
+            self._notify(entry, on_anchored, {
+                "anchor_mode": "merkle_batch",
+                "tx_hash": tx_hash,
+                "merkle_root": f"0x{root.hex()}",
+                "merkle_leaf_index": index,
+                "merkle_proof": merkle.get_proof(levels, index),
+                "batch_size": len(items)
+            })
+
+    def _anchored_tx(self, root: bytes):
+        """Hash of the transaction that anchored root, from its BatchAnchored log, or None."""
+        for log in self.service._scan_logs(self.service.contract.events.BatchAnchored, [root]):
+            return self.service.w3.to_hex(log["transactionHash"])
+        return None
+
+    def _on_batch_failed(self, root: bytes, levels: list, items: list):
+        """The batch transaction reverted or was dropped after it was sent."""
+        try:
+            tx_hash = self._anchored_tx(root)
+        except Exception as e:
+            print(f"Could not look up Merkle batch 0x{root.hex()}: {e}")
+            tx_hash = None
+        if tx_hash:
+            # Reverted because the same root landed in another transaction: point the records at that one
+            self._notify_anchored(items, levels, tx_hash)
+            return
+        # The records still land in the local ledger
+        for _, entry, _ in items:
+            self.service._append_to_ledger(entry)
+
+    def _dequeue(self, items: list):
+        self._conn().executemany("DELETE FROM batch_queue WHERE seq = ?", [(seq,) for seq, _, _ in items])
+
+    def _notify(self, entry: dict, on_anchored, anchor: dict):
+        try:
+            if on_anchored:
+                on_anchored(anchor)
+            else:
+                record_anchor(entry, anchor)
+        except Exception as e:
+            print(f"Failed to record batch anchor: {e}")
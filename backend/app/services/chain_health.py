@@ -0,0 +1,98 @@
+from app.core.config import settings
+from datetime import datetime
+import threading
+import time
+
+CLOSED = "closed" # Node healthy, requests go to the chain
+OPEN = "open" # Node unhealthy, requests go straight to the fallback ledger
+HALF_OPEN = "half_open" # Probing whether the node is back
+
+class ChainHealth:
+    """
+    Connection health manager and circuit breaker for the blockchain node.
+    Request paths call available(), which is a flag check rather than an is_connected() RPC.
+    A background thread probes the node; failed transactions/calls also count against it.
+    After BLOCKCHAIN_BREAKER_THRESHOLD consecutive failures the breaker opens and all
+    traffic uses the fallback ledger until a probe succeeds, at which point on_recover runs
+    (to reattach the contract) and the breaker closes again.
+    """
+    def __init__(self, w3, on_recover=None):
+        self.w3 = w3
+        self.on_recover = on_recover
+        self.interval = settings.BLOCKCHAIN_HEALTH_INTERVAL_SECONDS
+        self.threshold = max(1, settings.BLOCKCHAIN_BREAKER_THRESHOLD)
+        self.state = OPEN
+        self.consecutive_failures = 0
+        self.last_probe_at = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+
+    def available(self) -> bool:
+        return self.state == CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = str(error) if error else self.last_error
+            if self.state == CLOSED and self.consecutive_failures >= self.threshold:
+                self.state = OPEN
+                print(f"Blockchain circuit breaker OPEN after {self.consecutive_failures} failures: routing to Local Ledger")
+
+    def probe(self) -> bool:
+        """Checks the node once and updates the breaker; runs on_recover when the node comes back."""
+        was_available = self.available()
+        if not was_available:
+            self.state = HALF_OPEN
+        try:
+            healthy = self.w3.is_connected()
+            error = None if healthy else "Node not reachable"
+        except Exception as e:
+            healthy, error = False, str(e)
+        self.last_probe_at = str(datetime.now())
+
+        if healthy and not was_available:
+            try:
+                if self.on_recover:
+                    self.on_recover()
+            except Exception as e:
+                healthy, error = False, f"Reattach failed: {e}"
+
+        with self._lock:
+            if healthy:
+                if not was_available:
+                    print("Blockchain node healthy: circuit breaker CLOSED")
+                self.state = CLOSED
+                self.consecutive_failures = 0
+            else:
+                self.state = OPEN
+                self.last_error = error
+        return healthy
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._probe_loop, name="chain-health", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def _probe_loop(self):
+        while self._running:
+            time.sleep(self.interval)
+            self.probe()
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "last_probe_at": self.last_probe_at,
+            "last_error": self.last_error
+        }
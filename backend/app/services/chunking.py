@@ -0,0 +1,79 @@
+import re
+
+# Rough token estimate; good enough to keep each chunk well inside the model's context window
+CHARS_PER_TOKEN = 4
+
+HEADING_RE = re.compile(r"^#{1,6}\s", re.MULTILINE)
+
+def _split_sections(markdown: str) -> list:
+    """Splits Docling markdown at headings, keeping each heading with its body."""
+    starts = [m.start() for m in HEADING_RE.finditer(markdown)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    sections = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(markdown)
+        section = markdown[start:end].strip()
+        if section:
+            sections.append(section)
+    return sections
+
+def _split_oversized(section: str, max_chars: int) -> list:
+    """Breaks a section that is too large on its own: by paragraph first, then hard by size."""
+    pieces = []
+    current = ""
+    for paragraph in section.split("\n\n"):
+        while len(paragraph) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        pieces.append(current)
+    return pieces
+
+def split_markdown(markdown: str, max_tokens: int) -> list:
+    """
+    Splits markdown into chunks of at most max_tokens (estimated),
+    packing whole sections together and only cutting inside a section when it is too large.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(markdown) <= max_chars:
+        return [markdown]
+
+    chunks = []
+    current = ""
+    for section in _split_sections(markdown):
+        parts = [section] if len(section) <= max_chars else _split_oversized(section, max_chars)
+        for part in parts:
+            if current and len(current) + len(part) + 2 > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{part}" if current else part
+    if current:
+        chunks.append(current)
+    return chunks
+
+def merge_graphs(graphs: list) -> dict:
+    """Merges knowledge graphs, deduplicating nodes by id and identical links."""
+    nodes = {}
+    links = []
+    seen_links = set()
+    for graph in graphs:
+        if not isinstance(graph, dict):
+            continue
+        for node in graph.get("nodes", []):
+            node_id = node.get("id")
+            if node_id and node_id not in nodes:
+                nodes[node_id] = node
+        for link in graph.get("links", []):
+            key = (link.get("source"), link.get("target"), link.get("value"))
+            if key not in seen_links:
+                seen_links.add(key)
+                links.append(link)
+    return {"nodes": list(nodes.values()), "links": links}
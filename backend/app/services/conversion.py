@@ -0,0 +1,214 @@
+from app.core.config import settings
+import asyncio
+import multiprocessing
+import os
+import threading
+
+# One DocumentConverter per worker process, built when the worker starts
+_worker_converter = None
+
+def _init_worker(document_timeout: float, prewarm: bool):
+    global _worker_converter
+    # Imported here so the API process never pays for loading docling's models
+    from docling.datamodel.base_models import InputFormat
+    from docling.datamodel.pipeline_options import PdfPipelineOptions
+    from docling.document_converter import DocumentConverter, PdfFormatOption
+
+    pipeline_options = PdfPipelineOptions(document_timeout=document_timeout)
+    _worker_converter = DocumentConverter(
+        format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
+    )
+    if prewarm:
+        # Load layout/OCR models now instead of on the first document
+        _worker_converter.initialize_pipeline(InputFormat.PDF)
+
+def _convert_in_worker(file_path: str, max_pages: int) -> str:
+    result = _worker_converter.convert(file_path, max_num_pages=max_pages)
+    return result.document.export_to_markdown()
+
+def _worker_main(conn, document_timeout: float, prewarm: bool):
+    """Worker process: reports ("ready", pid) once its converter is built, then converts one document per request."""
+    try:
+        _init_worker(document_timeout, prewarm)
+        conn.send(("ready", os.getpid()))
+    except Exception as e:
+        conn.send(("init_error", f"{type(e).__name__}: {e}"))
+        return
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return # The API process went away
+        if request is None:
+            return
+        try:
+            conn.send(("ok", _convert_in_worker(*request)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class ConversionTimeout(Exception):
+    pass
+
+
+class ConversionError(Exception):
+    pass
+
+
+class WorkerError(ConversionError):
+    """The worker process died or could not start; it has to be replaced."""
+
+
+class _Worker:
+    """One conversion process and the pipe it is driven through."""
+    def __init__(self, context, document_timeout: float, prewarm: bool):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, document_timeout, prewarm),
+            name="docling-worker", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+
+    def _receive(self, timeout: float, what: str):
+        if not self.conn.poll(timeout):
+            raise ConversionTimeout(f"{what} exceeded {timeout:g}s")
+        try:
+            return self.conn.recv()
+        except EOFError:
+            raise WorkerError(f"Conversion worker exited (code {self.process.exitcode})")
+
+    def run(self, file_path: str, max_pages: int, timeout: float) -> str:
+        if not self.ready:
+            # Building the converter (and loading models) is not part of any document's time budget
+            status, payload = self._receive(timeout, "Conversion worker start-up")
+            if status == "init_error":
+                raise WorkerError(payload)
+            self.ready = True
+        self.conn.send((file_path, max_pages))
+        # The clock starts here, when the document reaches a free worker, not when it was submitted
+        status, payload = self._receive(timeout, "Conversion")
+        if status == "error":
+            raise ConversionError(payload)
+        return payload
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class ConversionService:
+    """
+    Process pool for Docling conversions.
+    PDF/DOCX parsing is CPU-bound, so each worker process owns a warm DocumentConverter
+    and documents are converted in parallel across cores without touching the API's threads.
+    Every conversion is bounded by DOCLING_MAX_PAGES and DOCLING_TIMEOUT_SECONDS, timed from the
+    moment a worker picks the document up (waiting for a free worker does not count).
+    A conversion that overruns kills only its own worker; the others keep going and a fresh
+    worker is started for the next document.
+    """
+    def __init__(self):
+        self.workers = settings.DOCLING_WORKERS or os.cpu_count() or 1
+        self.max_pages = settings.DOCLING_MAX_PAGES
+        self.timeout = settings.DOCLING_TIMEOUT_SECONDS
+        # spawn: the API process runs threads (AI workers, web3), which fork does not mix well with
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = [] # Started workers waiting for a document
+        self._busy = set()
+        self._retired = set() # Busy workers to stop once they finish (after shutdown())
+        self._size = 0 # Workers alive or starting, idle or busy
+        self._available = threading.Condition()
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, self.timeout, settings.DOCLING_PREWARM)
+
+    def _acquire(self) -> _Worker:
+        with self._available:
+            while not self._idle and self._size >= self.workers:
+                self._available.wait()
+            if self._idle:
+                worker = self._idle.pop()
+                self._busy.add(worker)
+                return worker
+            self._size += 1
+        try:
+            worker = self._spawn()
+        except Exception:
+            with self._available:
+                self._size -= 1
+                self._available.notify()
+            raise
+        with self._available:
+            self._busy.add(worker)
+        return worker
+
+    def _release(self, worker: _Worker):
+        with self._available:
+            self._busy.discard(worker)
+            if worker not in self._retired:
+                self._idle.append(worker)
+                self._available.notify()
+                return
+            self._retired.discard(worker)
+        worker.stop()
+
+    def _discard(self, worker: _Worker):
+        """Kills a stuck or crashed worker; the next document gets a fresh one."""
+        worker.kill()
+        with self._available:
+            self._busy.discard(worker)
+            if worker in self._retired:
+                self._retired.discard(worker)
+                return
+            self._size -= 1
+            self._available.notify()
+
+    def prewarm(self):
+        """Starts all worker processes (and their converters) without waiting for them."""
+        with self._available:
+            count = self.workers - self._size
+            self._size += count
+        workers = [self._spawn() for _ in range(count)]
+        with self._available:
+            self._idle.extend(workers)
+            self._available.notify_all()
+        print(f"Docling conversion pool warming up: {self.workers} workers")
+
+    def convert(self, file_path: str) -> str:
+        worker = self._acquire()
+        try:
+            # Small grace period on top of docling's own document_timeout
+            markdown = worker.run(file_path, self.max_pages, self.timeout + 5)
+        except (ConversionTimeout, WorkerError, OSError):
+            self._discard(worker)
+            raise
+        except Exception:
+            # The document failed to convert; the worker itself is fine
+            self._release(worker)
+            raise
+        self._release(worker)
+        return markdown
+
+    async def aconvert(self, file_path: str) -> str:
+        return await asyncio.to_thread(self.convert, file_path)
+
+    def shutdown(self):
+        """Stops idle workers now and busy ones as soon as their current document is done."""
+        with self._available:
+            idle, self._idle = self._idle, []
+            self._retired |= self._busy
+            self._size = 0
+            self._available.notify_all()
+        for worker in idle:
+            worker.stop()
+
+conversion_service = ConversionService()
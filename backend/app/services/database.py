@@ -0,0 +1,622 @@
+from app.core.config import settings
+from app.services import geo
+from app.services.registry import registry
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+import asyncio
+import base64
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def evidence_type(content_type: str) -> str:
+    """Maps a MIME type to the evidence type the frontend renders icons for."""
+    content_type = content_type or ""
+    for kind in ("video", "audio", "image"):
+        if content_type.startswith(f"{kind}/"):
+            return kind
+    return "document"
+
+def evidence_ref(metadata: dict) -> dict:
+    """
+    The lightweight evidence entry stored on a case record.
+    Full metadata (AI summary, knowledge graph, anchor proof) lives only in the evidence table,
+    so the case item stays small and does not change when AI results arrive.
+    """
+    return {
+        "id": metadata["evidence_id"],
+        "name": metadata.get("filename"),
+        "type": evidence_type(metadata.get("content_type")),
+        "uploadedAt": metadata.get("uploaded_at")
+    }
+
+def hydrate_case(case: dict, evidence_items: list) -> dict:
+    """Attaches full metadata to each evidence ref, giving the {id, name, type, uploadedAt, metadata} shape the API returns."""
+    by_id = {item["evidence_id"]: item for item in evidence_items}
+    evidence = []
+    for ref in case.get("evidence", []):
+        metadata = by_id.pop(ref.get("id"), None)
+        if metadata is not None:
+            evidence.append({**ref, "metadata": metadata})
+        elif "metadata" in ref:
+            evidence.append(ref) # Not migrated yet, still embedded
+        elif "evidence_id" in ref:
+            evidence.append({**evidence_ref(ref), "metadata": ref}) # Legacy flat entry
+    # Evidence whose ref never made it onto the case
+    evidence.extend({**evidence_ref(item), "metadata": item} for item in by_id.values())
+    case["evidence"] = evidence
+    return case
+
+def encode_cursor(key: dict) -> str:
+    """Opaque pagination cursor for a backend-specific position."""
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode()
+
+def decode_cursor(cursor: str, keys: tuple) -> dict:
+    """
+    Reverses encode_cursor. Cursors come from clients, so anything that is not an object
+    with exactly the given keys raises ValueError (a 400 at the endpoint).
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, dict) or set(key) != set(keys):
+        raise ValueError("Invalid cursor")
+    return key
+
+def project(item: dict, fields: list) -> dict:
+    if not fields:
+        return item
+    return {field: item[field] for field in fields if field in item}
+
+# Case attributes the list endpoint may filter on
+CASE_FILTERS = ("district", "unit", "status")
+
+
+class _AsyncFacade:
+    """
+    db.aio.<method>(...) runs the blocking repository call on a bounded thread pool,
+    so async endpoints can await it without stalling the event loop.
+    """
+    def __init__(self, repository, max_workers: int):
+        self._repository = repository
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+
+    def __getattr__(self, name):
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            # Looked up on the worker thread: a repository still being built never blocks the loop
+            return await loop.run_in_executor(self._executor, lambda: getattr(self._repository, name)(*args, **kwargs))
+        return call
+
+
+class DynamoDBRepository:
+    """
+    Cases and evidence in DynamoDB through ONE shared low-level client.
+    boto3 clients are thread-safe and keep a pool of HTTP connections
+    (DB_MAX_POOL_CONNECTIONS), unlike building a new boto3.resource per call.
+    """
+    def __init__(self):
+        import boto3
+        from botocore.config import Config
+        from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+
+        self.client = boto3.client(
+            'dynamodb',
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION,
+            config=Config(
+                max_pool_connections=settings.DB_MAX_POOL_CONNECTIONS,
+                retries={"max_attempts": 5, "mode": "adaptive"}
+            )
+        )
+        self.cases_table = settings.DYNAMODB_TABLE_CASES
+        self.evidence_table = settings.DYNAMODB_TABLE_EVIDENCE
+        self.evidence_case_index = settings.DYNAMODB_EVIDENCE_CASE_INDEX
+        self.case_number_index = settings.DYNAMODB_CASE_NUMBER_INDEX
+        self.stats_table = settings.DYNAMODB_TABLE_STATS
+        self._serializer = TypeSerializer()
+        self._deserializer = TypeDeserializer()
+
+    # --- Marshalling ---
+
+    def _to_dynamo(self, value):
+        # DynamoDB rejects floats; the seed scripts store Decimals
+        if isinstance(value, float):
+            return Decimal(str(value))
+        if isinstance(value, dict):
+            return {k: self._to_dynamo(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._to_dynamo(v) for v in value]
+        return value
+
+    def _from_dynamo(self, value):
+        if isinstance(value, Decimal):
+            return int(value) if value == value.to_integral_value() else float(value)
+        if isinstance(value, dict):
+            return {k: self._from_dynamo(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._from_dynamo(v) for v in value]
+        return value
+
+    def _serialize(self, item: dict) -> dict:
+        return {k: self._serializer.serialize(self._to_dynamo(v)) for k, v in item.items()}
+
+    def _deserialize(self, item: dict) -> dict:
+        return self._from_dynamo({k: self._deserializer.deserialize(v) for k, v in item.items()})
+
+    def _value(self, value) -> dict:
+        return self._serializer.serialize(self._to_dynamo(value))
+
+    # --- Cases ---
+
+    def list_cases(self) -> list:
+        items = []
+        kwargs = {"TableName": self.cases_table}
+        while True:
+            response = self.client.scan(**kwargs)
+            items.extend(self._deserialize(item) for item in response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
+                return items
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def list_cases_page(self, limit: int, cursor: str = None, fields: list = None, filters: dict = None) -> dict:
+        """
+        One page of cases. Filters and projection are applied by DynamoDB, so only the
+        requested attributes of matching cases leave the table.
+        """
+        kwargs = {"TableName": self.cases_table}
+        names = {}
+        values = {}
+        conditions = []
+        for i, (field, value) in enumerate((filters or {}).items()):
+            names[f"#f{i}"] = field
+            values[f":f{i}"] = {"S": value}
+            conditions.append(f"#f{i} = :f{i}")
+        if conditions:
+            kwargs["FilterExpression"] = " AND ".join(conditions)
+            kwargs["ExpressionAttributeValues"] = values
+        if fields:
+            for i, field in enumerate(fields):
+                names[f"#p{i}"] = field
+            kwargs["ProjectionExpression"] = ", ".join(f"#p{i}" for i in range(len(fields)))
+        if names:
+            kwargs["ExpressionAttributeNames"] = names
+        if cursor:
+            start_key = decode_cursor(cursor, ("id",))
+            # Must be a serialized key of the cases table, or DynamoDB rejects the scan
+            if not isinstance(start_key["id"], dict) or set(start_key["id"]) != {"S"} or not isinstance(start_key["id"]["S"], str):
+                raise ValueError("Invalid cursor")
+            kwargs["ExclusiveStartKey"] = start_key
+
+        items = []
+        while True:
+            # Limit caps items evaluated (before the filter), so a page never overshoots
+            kwargs["Limit"] = limit - len(items)
+            response = self.client.scan(**kwargs)
+            items.extend(self._deserialize(item) for item in response.get("Items", []))
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key or len(items) >= limit:
+                break
+            kwargs["ExclusiveStartKey"] = last_key
+        return {"items": items, "next_cursor": encode_cursor(last_key) if last_key else None}
+
+    def get_case(self, case_id: str):
+        """The case with its evidence refs hydrated from the evidence table."""
+        response = self.client.get_item(TableName=self.cases_table, Key={"id": {"S": case_id}})
+        item = response.get("Item")
+        if not item:
+            return None
+        case = self._deserialize(item)
+        return hydrate_case(case, self.list_case_evidence(case_id) if case.get("evidence") else [])
+
+    def get_case_by_number(self, case_number: str):
+        """Looks the case up through the caseNumber GSI (falls back to a scan until the index exists)."""
+        try:
+            response = self.client.query(
+                TableName=self.cases_table,
+                IndexName=self.case_number_index,
+                KeyConditionExpression="caseNumber = :n",
+                ExpressionAttributeValues={":n": {"S": case_number}},
+                Limit=1
+            )
+            items = [self._deserialize(item) for item in response.get("Items", [])]
+        except self.client.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] not in ("ValidationException", "ResourceNotFoundException"):
+                raise
+            print(f"Index {self.case_number_index} missing, scanning cases (run scripts/create_indexes.py)")
+            items = self._collect(self.client.scan, {
+                "TableName": self.cases_table,
+                "FilterExpression": "caseNumber = :n",
+                "ExpressionAttributeValues": {":n": {"S": case_number}},
+                "ProjectionExpression": "id"
+            })
+        return self.get_case(items[0]["id"]) if items else None
+
+    def create_case(self, case_data: dict) -> dict:
+        """Writes a new case and adds it to its district's geo aggregates in one transaction."""
+        district, increments = geo.case_increments(case_data)
+        names = {f"#k{i}": key for i, key in enumerate(increments)}
+        values = {f":v{i}": self._value(delta) for i, delta in enumerate(increments.values())}
+        try:
+            self.client.transact_write_items(TransactItems=[
+                {"Put": {"TableName": self.cases_table, "Item": self._serialize(case_data)}},
+                {"Update": {
+                    "TableName": self.stats_table,
+                    "Key": {"district": {"S": district}},
+                    "UpdateExpression": "ADD " + ", ".join(f"#k{i} :v{i}" for i in range(len(increments))),
+                    "ExpressionAttributeNames": names,
+                    "ExpressionAttributeValues": values
+                }}
+            ])
+        except self.client.exceptions.ResourceNotFoundException:
+            # The stats table only exists once ensure_schema has run; creating cases must not depend on it
+            logger.warning(
+                "Table %s not found; stored case %s without updating the geo stats. "
+                "Run scripts/rebuild_geo_stats.py to create and fill it.",
+                self.stats_table, case_data.get("id")
+            )
+            self.client.put_item(TableName=self.cases_table, Item=self._serialize(case_data))
+        return case_data
+
+    def save_case(self, case_data: dict):
+        """Overwrites a case record as-is (no aggregate update), e.g. for migrations."""
+        self.client.put_item(TableName=self.cases_table, Item=self._serialize(case_data))
+
+    # --- Aggregates ---
+
+    def get_geo_stats(self) -> list:
+        """Per-district aggregates; one small item per district, independent of case count."""
+        try:
+            items = self._collect(self.client.scan, {"TableName": self.stats_table})
+        except self.client.exceptions.ResourceNotFoundException:
+            logger.warning("Table %s not found; run scripts/rebuild_geo_stats.py", self.stats_table)
+            return []
+        return [geo.summarize(item.pop("district"), item) for item in items]
+
+    def rebuild_geo_stats(self, cases: list):
+        """Recomputes every district's aggregates from the given cases."""
+        totals = {}
+        for case in cases:
+            district, increments = geo.case_increments(case)
+            counters = totals.setdefault(district, {})
+            for key, delta in increments.items():
+                counters[key] = counters.get(key, 0) + delta
+        for item in self._collect(self.client.scan, {"TableName": self.stats_table, "ProjectionExpression": "district"}):
+            self.client.delete_item(TableName=self.stats_table, Key={"district": {"S": item["district"]}})
+        for district, counters in totals.items():
+            self.client.put_item(TableName=self.stats_table, Item=self._serialize({"district": district, **counters}))
+
+    def add_evidence_to_case(self, case_id: str, metadata: dict):
+        # Appended server-side, so concurrent uploads to one case do not overwrite each other
+        self.client.update_item(
+            TableName=self.cases_table,
+            Key={"id": {"S": case_id}},
+            UpdateExpression="SET evidence = list_append(if_not_exists(evidence, :empty), :ev), updatedAt = :now ADD evidenceCount :one",
+            ExpressionAttributeValues={
+                ":empty": {"L": []},
+                ":ev": {"L": [self._value(evidence_ref(metadata))]},
+                ":now": {"S": str(datetime.now())},
+                ":one": {"N": "1"}
+            }
+        )
+
+    def update_evidence_in_case(self, case_id: str, evidence_id: str, metadata: dict):
+        # The metadata itself is in the evidence table; the case only records that it changed
+        try:
+            self.client.update_item(
+                TableName=self.cases_table,
+                Key={"id": {"S": case_id}},
+                UpdateExpression="SET updatedAt = :now",
+                ConditionExpression="attribute_exists(id)",
+                ExpressionAttributeValues={":now": {"S": str(datetime.now())}}
+            )
+        except self.client.exceptions.ConditionalCheckFailedException:
+            pass
+
+    # --- Evidence ---
+
+    def store_evidence_metadata(self, metadata: dict):
+        self.client.put_item(TableName=self.evidence_table, Item=self._serialize(metadata))
+
+    def update_evidence_metadata(self, evidence_id: str, fields: dict) -> bool:
+        """
+        Sets only the given top-level fields, so concurrent writers (the upload request, the batch
+        anchorer, the AI worker) do not overwrite each other's fields. False if the record does not exist.
+        """
+        names = {f"#k{i}": key for i, key in enumerate(fields)}
+        values = {f":v{i}": self._value(value) for i, value in enumerate(fields.values())}
+        try:
+            self.client.update_item(
+                TableName=self.evidence_table,
+                Key={"evidence_id": {"S": evidence_id}},
+                UpdateExpression="SET " + ", ".join(f"#k{i} = :v{i}" for i in range(len(fields))),
+                ConditionExpression="attribute_exists(evidence_id)",
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
+            )
+        except self.client.exceptions.ConditionalCheckFailedException:
+            return False
+        return True
+
+    def get_evidence_metadata(self, evidence_id: str):
+        response = self.client.get_item(TableName=self.evidence_table, Key={"evidence_id": {"S": evidence_id}})
+        item = response.get("Item")
+        return self._deserialize(item) if item else None
+
+    def list_case_evidence(self, case_id: str) -> list:
+        """Evidence for one case via the case_id GSI (falls back to a scan until the index exists)."""
+        kwargs = {
+            "TableName": self.evidence_table,
+            "IndexName": self.evidence_case_index,
+            "KeyConditionExpression": "case_id = :case_id",
+            "ExpressionAttributeValues": {":case_id": {"S": case_id}}
+        }
+        try:
+            return self._collect(self.client.query, kwargs)
+        except self.client.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] not in ("ValidationException", "ResourceNotFoundException"):
+                raise
+            print(f"Index {self.evidence_case_index} missing, scanning evidence (run scripts/create_indexes.py)")
+        kwargs.pop("IndexName")
+        kwargs["FilterExpression"] = kwargs.pop("KeyConditionExpression")
+        return self._collect(self.client.scan, kwargs)
+
+    def _collect(self, operation, kwargs: dict) -> list:
+        """Runs a query/scan through every page."""
+        items = []
+        while True:
+            response = operation(**kwargs)
+            items.extend(self._deserialize(item) for item in response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
+                return items
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    # --- Schema ---
+
+    def ensure_schema(self):
+        """Creates the stats table and any missing GSIs (evidence by case_id, cases by caseNumber), and waits for them."""
+        self._ensure_stats_table()
+        self._ensure_index(self.evidence_table, self.evidence_case_index, "case_id", "ALL")
+        # Lookups only need the key; get_case then fetches and hydrates the case
+        self._ensure_index(self.cases_table, self.case_number_index, "caseNumber", "KEYS_ONLY")
+
+    def _ensure_stats_table(self):
+        try:
+            self.client.describe_table(TableName=self.stats_table)
+            return
+        except self.client.exceptions.ResourceNotFoundException:
+            pass
+        print(f"Creating table {self.stats_table}...")
+        self.client.create_table(
+            TableName=self.stats_table,
+            KeySchema=[{"AttributeName": "district", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "district", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        self.client.get_waiter("table_exists").wait(TableName=self.stats_table)
+
+    def _ensure_index(self, table_name: str, index_name: str, attribute: str, projection: str):
+        table = self.client.describe_table(TableName=table_name)["Table"]
+        if index_name in {index["IndexName"] for index in table.get("GlobalSecondaryIndexes", [])}:
+            return
+        print(f"Creating GSI {index_name} on {table_name}...")
+        index = {
+            "IndexName": index_name,
+            "KeySchema": [{"AttributeName": attribute, "KeyType": "HASH"}],
+            "Projection": {"ProjectionType": projection}
+        }
+        if table.get("BillingModeSummary", {}).get("BillingMode") != "PAY_PER_REQUEST":
+            index["ProvisionedThroughput"] = {"ReadCapacityUnits": 5, "WriteCapacityUnits": 5}
+        self.client.update_table(
+            TableName=table_name,
+            AttributeDefinitions=[{"AttributeName": attribute, "AttributeType": "S"}],
+            GlobalSecondaryIndexUpdates=[{"Create": index}]
+        )
+        # DynamoDB builds one index at a time per table
+        while True:
+            indexes = self.client.describe_table(TableName=table_name)["Table"].get("GlobalSecondaryIndexes", [])
+            if all(i["IndexStatus"] == "ACTIVE" for i in indexes if i["IndexName"] == index_name):
+                return
+            time.sleep(5)
+
+
+class LocalRepository:
+    """
+    In-process SQLite backend with the same interface, for local development and
+    load-testing the API without AWS. Records are stored as JSON documents.
+    """
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.LOCAL_DB_PATH
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cases (
+                id TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS evidence (
+                evidence_id TEXT PRIMARY KEY,
+                case_id TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS evidence_case_id ON evidence (case_id);
+            CREATE TABLE IF NOT EXISTS geo_stats (
+                district TEXT NOT NULL,
+                counter TEXT NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (district, counter)
+            );
+        """)
+        for field in CASE_FILTERS + ("caseNumber",):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS cases_{field} ON cases (json_extract(data, '$.{field}'))")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    # --- Cases ---
+
+    def list_cases(self) -> list:
+        return [json.loads(row[0]) for row in self._conn().execute("SELECT data FROM cases")]
+
+    def list_cases_page(self, limit: int, cursor: str = None, fields: list = None, filters: dict = None) -> dict:
+        """One page of cases in id order; the cursor is the last id returned."""
+        conditions = []
+        params = []
+        if cursor:
+            last_id = decode_cursor(cursor, ("id",))["id"]
+            if not isinstance(last_id, str):
+                raise ValueError("Invalid cursor")
+            conditions.append("id > ?")
+            params.append(last_id)
+        for field, value in (filters or {}).items():
+            conditions.append(f"json_extract(data, '$.{field}') = ?")
+            params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._conn().execute(
+            f"SELECT id, data FROM cases {where} ORDER BY id LIMIT ?", (*params, limit + 1)
+        ).fetchall()
+
+        next_cursor = encode_cursor({"id": rows[limit - 1][0]}) if len(rows) > limit else None
+        items = [project(json.loads(data), fields) for _, data in rows[:limit]]
+        return {"items": items, "next_cursor": next_cursor}
+
+    def get_case(self, case_id: str):
+        row = self._conn().execute("SELECT data FROM cases WHERE id = ?", (case_id,)).fetchone()
+        if not row:
+            return None
+        return hydrate_case(json.loads(row[0]), self.list_case_evidence(case_id))
+
+    def get_case_by_number(self, case_number: str):
+        row = self._conn().execute(
+            "SELECT id FROM cases WHERE json_extract(data, '$.caseNumber') = ? LIMIT 1", (case_number,)
+        ).fetchone()
+        return self.get_case(row[0]) if row else None
+
+    def create_case(self, case_data: dict) -> dict:
+        """Writes a new case and adds it to its district's geo aggregates in one transaction."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO cases (id, data) VALUES (?, ?)", (case_data["id"], json.dumps(case_data)))
+            self._add_geo_increments(conn, *geo.case_increments(case_data))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return case_data
+
+    def save_case(self, case_data: dict):
+        """Overwrites a case record as-is (no aggregate update), e.g. for migrations."""
+        self._conn().execute("INSERT OR REPLACE INTO cases (id, data) VALUES (?, ?)", (case_data["id"], json.dumps(case_data)))
+
+    # --- Aggregates ---
+
+    @staticmethod
+    def _add_geo_increments(conn: sqlite3.Connection, district: str, increments: dict):
+        conn.executemany(
+            "INSERT INTO geo_stats (district, counter, value) VALUES (?, ?, ?) "
+            "ON CONFLICT (district, counter) DO UPDATE SET value = value + excluded.value",
+            [(district, key, delta) for key, delta in increments.items()]
+        )
+
+    def get_geo_stats(self) -> list:
+        counters = {}
+        for district, counter, value in self._conn().execute("SELECT district, counter, value FROM geo_stats"):
+            counters.setdefault(district, {})[counter] = value
+        return [geo.summarize(district, values) for district, values in counters.items()]
+
+    def rebuild_geo_stats(self, cases: list):
+        """Recomputes every district's aggregates from the given cases."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM geo_stats")
+            for case in cases:
+                self._add_geo_increments(conn, *geo.case_increments(case))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _update_case(self, case_id: str, update):
+        """Read-modify-write of one case inside a write transaction."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data FROM cases WHERE id = ?", (case_id,)).fetchone()
+            if row:
+                case = json.loads(row[0])
+                update(case)
+                case["updatedAt"] = str(datetime.now())
+                conn.execute("UPDATE cases SET data = ? WHERE id = ?", (json.dumps(case), case_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def add_evidence_to_case(self, case_id: str, metadata: dict):
+        def update(case):
+            case.setdefault("evidence", []).append(evidence_ref(metadata))
+            case["evidenceCount"] = len(case["evidence"])
+        self._update_case(case_id, update)
+
+    def update_evidence_in_case(self, case_id: str, evidence_id: str, metadata: dict):
+        # The metadata itself is in the evidence table; the case only records that it changed
+        self._conn().execute(
+            "UPDATE cases SET data = json_set(data, '$.updatedAt', ?) WHERE id = ?",
+            (str(datetime.now()), case_id)
+        )
+
+    # --- Evidence ---
+
+    def store_evidence_metadata(self, metadata: dict):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO evidence (evidence_id, case_id, data) VALUES (?, ?, ?)",
+            (metadata["evidence_id"], metadata.get("case_id"), json.dumps(metadata))
+        )
+
+    def update_evidence_metadata(self, evidence_id: str, fields: dict) -> bool:
+        """Sets only the given top-level fields. False if the record does not exist."""
+        paths = ", ".join("?, json(?)" for _ in fields)
+        params = [value for key, field_value in fields.items() for value in (f'$."{key}"', json.dumps(field_value))]
+        cursor = self._conn().execute(
+            f"UPDATE evidence SET data = json_set(data, {paths}) WHERE evidence_id = ?", (*params, evidence_id)
+        )
+        return cursor.rowcount > 0
+
+    def get_evidence_metadata(self, evidence_id: str):
+        row = self._conn().execute("SELECT data FROM evidence WHERE evidence_id = ?", (evidence_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_case_evidence(self, case_id: str) -> list:
+        rows = self._conn().execute("SELECT data FROM evidence WHERE case_id = ?", (case_id,))
+        return [json.loads(row[0]) for row in rows]
+
+    def ensure_schema(self):
+        pass # Created with the tables
+
+
+def _create_repository():
+    backend = settings.DATABASE_BACKEND
+    if backend == "auto":
+        # Same rule as storage: AWS when credentials are configured, local otherwise
+        backend = "dynamodb" if settings.AWS_ACCESS_KEY_ID else "local"
+    repository = DynamoDBRepository() if backend == "dynamodb" else LocalRepository()
+    print(f"Database backend: {backend}")
+    return repository
+
+db = registry.register("database", _create_repository, check=lambda r: {"backend": type(r).__name__})
+registry.attach("database", aio=_AsyncFacade(db, settings.DB_MAX_WORKERS))
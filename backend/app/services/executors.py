@@ -0,0 +1,40 @@
+from app.core.config import settings
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import threading
+
+# Blocking stages of the evidence pipeline each get their own pool, so a slow chain node or a large
+# S3 transfer cannot starve the others (or the default threadpool that serves sync endpoints).
+#   files:   spool writes, SHA-256 hashing, local SQLite state (transfers, jobs)
+#   chain:   Web3 calls (anchoring, verification reads)
+#   storage: S3 / local storage transfers
+_POOL_SIZES = {
+    "files": lambda: settings.FILES_EXECUTOR_WORKERS,
+    "chain": lambda: settings.CHAIN_EXECUTOR_WORKERS,
+    "storage": lambda: settings.STORAGE_EXECUTOR_WORKERS,
+}
+
+_pools = {}
+_lock = threading.Lock()
+
+def executor(name: str) -> ThreadPoolExecutor:
+    pool = _pools.get(name)
+    if pool is None:
+        with _lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=max(1, _POOL_SIZES[name]()), thread_name_prefix=f"{name}-exec")
+                _pools[name] = pool
+    return pool
+
+async def run_in(name: str, fn, *args, **kwargs):
+    """Runs a blocking call on the named pool without blocking the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(executor(name), functools.partial(fn, *args, **kwargs))
+
+def shutdown():
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
@@ -0,0 +1,74 @@
+from app.core.config import settings
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def geohash(lat: float, lng: float, precision: int) -> str:
+    """Standard geohash of a point (precision 5 is a ~5 km cell)."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, bounds = (lng, lng_range) if even else (lat, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            bounds[0] = mid
+        else:
+            bits <<= 1
+            bounds[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+def _coordinate(value, limit: float):
+    # CaseCreate stores coordinates as strings
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if -limit <= number <= limit else None
+
+def case_increments(case: dict):
+    """
+    The (district, {counter: delta}) a new case adds to the per-district aggregates.
+    Counters are flat keys so both backends can add to them atomically:
+    count, located, lat_sum, lng_sum, status:<status>, geohash:<cell>.
+    """
+    district = case.get("district") or "Unknown"
+    increments = {"count": 1, f"status:{case.get('status') or 'Unknown'}": 1}
+    lat = _coordinate(case.get("latitude"), 90)
+    lng = _coordinate(case.get("longitude"), 180)
+    if lat is not None and lng is not None:
+        increments["located"] = 1
+        increments["lat_sum"] = lat
+        increments["lng_sum"] = lng
+        increments[f"geohash:{geohash(lat, lng, settings.GEO_HASH_PRECISION)}"] = 1
+    return district, increments
+
+def summarize(district: str, counters: dict) -> dict:
+    """Turns a district's raw counters into the API shape."""
+    located = counters.get("located", 0)
+    status = {}
+    buckets = {}
+    for key, value in counters.items():
+        if key.startswith("status:"):
+            status[key[len("status:"):]] = int(value)
+        elif key.startswith("geohash:"):
+            buckets[key[len("geohash:"):]] = int(value)
+    return {
+        "district": district,
+        "count": int(counters.get("count", 0)),
+        "centroid": {
+            "lat": counters["lat_sum"] / located,
+            "lng": counters["lng_sum"] / located
+        } if located else None,
+        "status": status,
+        "geohash": buckets
+    }
@@ -0,0 +1,218 @@
+from app.core.config import settings
+import re
+import sqlite3
+import threading
+import unicodedata
+
+# Punctuation that should not make two mentions different entities ("J. Smith" / "J Smith")
+_PUNCTUATION = re.compile(r"[\"'`‘’“”.,;:()\[\]{}]")
+
+# SQLite caps the number of bound parameters per statement
+_MAX_PARAMS = 500
+
+def entity_key(label) -> str:
+    """Entity resolution: mentions that normalise to the same key are the same entity across evidence and cases."""
+    key = unicodedata.normalize("NFKC", str(label)).casefold()
+    return " ".join(_PUNCTUATION.sub(" ", key).split())
+
+class GraphIndex:
+    """
+    Cross-case entity graph built from every evidence item's knowledge_graph.
+    - entities: one row per resolved entity (display label and group of its first mention)
+    - mentions: which evidence/case mentions each entity
+    - edges: adjacency list, one row per relation per evidence, indexed on both endpoints
+    Re-indexing an evidence item replaces its rows, so updates are incremental and idempotent.
+    """
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.GRAPH_INDEX_DB
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entities (
+                entity TEXT PRIMARY KEY,
+                label TEXT NOT NULL,
+                grp TEXT
+            );
+            CREATE TABLE IF NOT EXISTS mentions (
+                entity TEXT NOT NULL,
+                evidence_id TEXT NOT NULL,
+                case_id TEXT NOT NULL,
+                PRIMARY KEY (entity, evidence_id)
+            );
+            CREATE INDEX IF NOT EXISTS mentions_evidence ON mentions (evidence_id);
+            CREATE TABLE IF NOT EXISTS edges (
+                src TEXT NOT NULL,
+                dst TEXT NOT NULL,
+                relation TEXT NOT NULL,
+                evidence_id TEXT NOT NULL,
+                case_id TEXT NOT NULL,
+                PRIMARY KEY (src, dst, relation, evidence_id)
+            );
+            CREATE INDEX IF NOT EXISTS edges_dst ON edges (dst);
+            CREATE INDEX IF NOT EXISTS edges_evidence ON edges (evidence_id);
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    # --- Updates ---
+
+    def index_evidence(self, case_id: str, evidence_id: str, graph: dict):
+        """Replaces the evidence item's contribution to the index with its current knowledge graph."""
+        graph = graph if isinstance(graph, dict) else {}
+        entities = {}
+        for node in graph.get("nodes", []):
+            if node.get("id") is None:
+                continue
+            key = entity_key(node["id"])
+            if key:
+                entities.setdefault(key, (str(node["id"]), node.get("group")))
+        edges = set()
+        for link in graph.get("links", []):
+            source, target = link.get("source"), link.get("target")
+            if source is None or target is None:
+                continue
+            src, dst = entity_key(source), entity_key(target)
+            if not src or not dst or src == dst:
+                continue
+            entities.setdefault(src, (str(source), None))
+            entities.setdefault(dst, (str(target), None))
+            edges.add((src, dst, str(link.get("value") or "related_to")))
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM mentions WHERE evidence_id = ?", (evidence_id,))
+            conn.execute("DELETE FROM edges WHERE evidence_id = ?", (evidence_id,))
+            conn.executemany(
+                "INSERT INTO entities (entity, label, grp) VALUES (?, ?, ?) "
+                "ON CONFLICT (entity) DO UPDATE SET grp = COALESCE(entities.grp, excluded.grp)",
+                [(key, label, group) for key, (label, group) in entities.items()]
+            )
+            conn.executemany(
+                "INSERT INTO mentions (entity, evidence_id, case_id) VALUES (?, ?, ?)",
+                [(key, evidence_id, case_id) for key in entities]
+            )
+            conn.executemany(
+                "INSERT INTO edges (src, dst, relation, evidence_id, case_id) VALUES (?, ?, ?, ?, ?)",
+                [(src, dst, relation, evidence_id, case_id) for src, dst, relation in edges]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # --- Queries ---
+
+    def _entities(self, keys) -> dict:
+        nodes = {}
+        keys = list(keys)
+        for i in range(0, len(keys), _MAX_PARAMS):
+            chunk = keys[i:i + _MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            for key, label, group in self._conn().execute(
+                f"SELECT entity, label, grp FROM entities WHERE entity IN ({placeholders})", chunk
+            ):
+                nodes[key] = {"id": key, "label": label, "group": group}
+        return nodes
+
+    def get_entity(self, label: str):
+        return self._entities([entity_key(label)]).get(entity_key(label))
+
+    def search_entities(self, query: str, limit: int = 20) -> list:
+        """Entities whose resolved key starts with the query, most mentioned first."""
+        prefix = entity_key(query)
+        rows = self._conn().execute(
+            "SELECT e.entity, e.label, e.grp, COUNT(m.evidence_id) AS mentions "
+            "FROM entities e JOIN mentions m ON m.entity = e.entity "
+            "WHERE e.entity >= ? AND e.entity < ? GROUP BY e.entity ORDER BY mentions DESC LIMIT ?",
+            (prefix, prefix + "￿", limit)
+        )
+        return [{"id": key, "label": label, "group": group, "mentions": mentions} for key, label, group, mentions in rows]
+
+    def _edges_touching(self, keys: list) -> list:
+        """Aggregated edges incident to any of the keys: (src, dst, relation, evidence count)."""
+        edges = []
+        for i in range(0, len(keys), _MAX_PARAMS):
+            chunk = keys[i:i + _MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            edges.extend(self._conn().execute(
+                "SELECT src, dst, relation, COUNT(*) FROM edges "
+                f"WHERE src IN ({placeholders}) GROUP BY src, dst, relation "
+                "UNION "
+                "SELECT src, dst, relation, COUNT(*) FROM edges "
+                f"WHERE dst IN ({placeholders}) GROUP BY src, dst, relation",
+                chunk + chunk
+            ).fetchall())
+        return edges
+
+    def neighbours(self, label: str, limit: int = 100) -> list:
+        key = entity_key(label)
+        neighbours = {}
+        for src, dst, relation, weight in self._edges_touching([key]):
+            other = dst if src == key else src
+            entry = neighbours.setdefault(other, {"relations": [], "weight": 0})
+            entry["relations"].append({"relation": relation, "direction": "out" if src == key else "in"})
+            entry["weight"] += weight
+        ranked = sorted(neighbours.items(), key=lambda item: item[1]["weight"], reverse=True)[:limit]
+        nodes = self._entities(other for other, _ in ranked)
+        return [{**nodes.get(other, {"id": other}), **entry} for other, entry in ranked]
+
+    def subgraph(self, label: str, hops: int = 2, max_nodes: int = None) -> dict:
+        """Breadth-first k-hop neighbourhood, one indexed query per hop, capped at max_nodes."""
+        max_nodes = max_nodes or settings.GRAPH_MAX_NODES
+        hops = max(0, min(hops, settings.GRAPH_MAX_HOPS))
+        start = entity_key(label)
+        depth = {start: 0}
+        links = {}
+        frontier = [start]
+        truncated = False
+        for hop in range(1, hops + 1):
+            if not frontier:
+                break
+            next_frontier = []
+            for src, dst, relation, weight in self._edges_touching(frontier):
+                for node in (src, dst):
+                    if node not in depth:
+                        if len(depth) >= max_nodes:
+                            truncated = True
+                            continue
+                        depth[node] = hop
+                        next_frontier.append(node)
+                if src in depth and dst in depth:
+                    links[(src, dst, relation)] = weight
+            frontier = next_frontier
+
+        nodes = self._entities(depth)
+        if start not in nodes:
+            return {"nodes": [], "links": [], "truncated": False}
+        return {
+            "nodes": [{**nodes.get(key, {"id": key}), "depth": d} for key, d in depth.items()],
+            "links": [{"source": s, "target": t, "value": r, "weight": w} for (s, t, r), w in links.items()],
+            "truncated": truncated
+        }
+
+    def cases_sharing(self, label: str) -> list:
+        """Cases mentioning the entity, with the evidence that mentions it."""
+        cases = {}
+        for case_id, evidence_id in self._conn().execute(
+            "SELECT case_id, evidence_id FROM mentions WHERE entity = ? ORDER BY case_id", (entity_key(label),)
+        ):
+            cases.setdefault(case_id, []).append(evidence_id)
+        return [{"case_id": case_id, "evidence_ids": evidence_ids} for case_id, evidence_ids in cases.items()]
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        return {
+            "entities": conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0],
+            "edges": conn.execute("SELECT COUNT(*) FROM edges").fetchone()[0],
+            "evidence_indexed": conn.execute("SELECT COUNT(DISTINCT evidence_id) FROM mentions").fetchone()[0]
+        }
+
+graph_index = GraphIndex()
@@ -0,0 +1,60 @@
+import hashlib
+import os
+from fastapi import UploadFile
+from app.core.config import settings
+from app.services.transfers import transfers
+from app.services.database import db
+from app.services.jobs import ai_jobs
+from app.services.executors import run_in
+from app.services.metrics import BYTES_HASHED
+
+async def ingest_upload(file: UploadFile, spool_path: str, transfer_id: str = None) -> dict:
+    """
+    Reads the upload exactly once, in UPLOAD_CHUNK_SIZE chunks, and feeds every chunk to:
+      - the SHA-256 digest (for the blockchain anchor)
+      - the spool file, from which storage upload and AI analysis both read
+    Peak memory is bounded by the chunk size, not by the file size.
+    Hashing and the spool write run on the "files" executor, never on the event loop.
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    def consume(spool, chunk: bytes):
+        digest.update(chunk) # Releases the GIL for large buffers
+        spool.write(chunk)
+
+    spool = await run_in("files", open, spool_path, "wb")
+    try:
+        while True:
+            chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            await run_in("files", consume, spool, chunk)
+            size += len(chunk)
+            if transfer_id:
+                transfers.record_received(transfer_id, len(chunk))
+        await run_in("files", spool.close)
+        BYTES_HASHED.inc(size, source="upload")
+    except Exception:
+        await run_in("files", spool.close)
+        await run_in("files", remove_spool, spool_path)
+        raise
+
+    return {
+        "hash": digest.hexdigest(),
+        "size": size,
+        "spool_path": spool_path
+    }
+
+def remove_spool(spool_path: str):
+    if os.path.exists(spool_path):
+        os.remove(spool_path)
+
+def _on_transfer_resumed(transfer: dict, url: str):
+    """An upload interrupted by a restart reached storage: finish what the request would have done."""
+    if not db.update_evidence_metadata(transfer["evidence_id"], {"url": url, "storage_status": "stored"}):
+        return
+    ai_jobs.enqueue(transfer["evidence_id"], transfer["case_id"], transfer["spool_path"])
+
+def resume_interrupted_uploads():
+    transfers.resume_pending(on_complete=_on_transfer_resumed)
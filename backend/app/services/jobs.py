@@ -0,0 +1,248 @@
+from app.core.config import settings
+from app.services.ai import ai_service
+from app.services.database import db
+from app.services.graph_index import graph_index
+from app.services.metrics import stage, AI_ERRORS, IN_FLIGHT
+from datetime import datetime
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+class AIJobQueue:
+    """
+    Persisted queue of AI analysis jobs.
+    Jobs live in a small SQLite file so queued work survives a restart;
+    a pool of worker threads drains the queue and writes results back to the evidence record.
+    A failed attempt is re-queued with exponential backoff (next_attempt_at) up to AI_JOB_MAX_ATTEMPTS.
+    """
+    def __init__(self):
+        self.db_path = settings.AI_JOBS_DB
+        self.concurrency = max(1, settings.AI_WORKER_CONCURRENCY)
+        self.max_attempts = max(1, settings.AI_JOB_MAX_ATTEMPTS)
+        self.backoff = settings.AI_JOB_RETRY_BACKOFF_SECONDS
+        self.backoff_max = settings.AI_JOB_RETRY_BACKOFF_MAX_SECONDS
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._workers = []
+        self._running = False
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                evidence_id TEXT NOT NULL,
+                case_id TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                next_attempt_at REAL NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_evidence ON jobs (evidence_id)")
+        self._conn.commit()
+
+    # --- Queue API ---
+
+    def enqueue(self, evidence_id: str, case_id: str, file_path: str) -> dict:
+        now = str(datetime.now())
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "evidence_id": evidence_id,
+            "case_id": case_id,
+            "file_path": file_path,
+            "status": "queued",
+            "attempts": 0,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "next_attempt_at": 0
+        }
+        with self._wakeup:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, evidence_id, case_id, file_path, status, attempts, error, created_at, updated_at, next_attempt_at) "
+                "VALUES (:job_id, :evidence_id, :case_id, :file_path, :status, :attempts, :error, :created_at, :updated_at, :next_attempt_at)",
+                job
+            )
+            self._conn.commit()
+            self._wakeup.notify()
+        return job
+
+    def get_job(self, job_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_jobs(self, status: str = None, evidence_id: str = None, limit: int = 100) -> list:
+        query = "SELECT * FROM jobs WHERE 1=1"
+        params = []
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        if evidence_id:
+            query += " AND evidence_id = ?"
+            params.append(evidence_id)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def retry(self, job_id: str):
+        """Re-queues a failed job. Returns the job, or None if it is not retryable."""
+        with self._wakeup:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if not row or row["status"] != "failed" or not os.path.exists(row["file_path"]):
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = 0, error = NULL, next_attempt_at = 0, updated_at = ? WHERE job_id = ?",
+                (str(datetime.now()), job_id)
+            )
+            self._conn.commit()
+            self._wakeup.notify()
+        return self.get_job(job_id)
+
+    # --- Worker Pool ---
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        # Jobs that were mid-flight when the process died go back on the queue
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+            self._conn.commit()
+        for i in range(self.concurrency):
+            worker = threading.Thread(target=self._worker_loop, name=f"ai-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        logger.info("AI job workers started: %d", self.concurrency)
+
+    def stop(self):
+        with self._wakeup:
+            self._running = False
+            self._wakeup.notify_all()
+        for worker in self._workers:
+            worker.join(timeout=5)
+        self._workers = []
+
+    def _claim_next(self):
+        """Blocks until a queued job is due and marks it as running."""
+        with self._wakeup:
+            while self._running:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' AND next_attempt_at <= ? ORDER BY created_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                        (str(datetime.now()), row["job_id"])
+                    )
+                    self._conn.commit()
+                    job = dict(row)
+                    job["attempts"] += 1
+                    return job
+                # Sleep until the next delayed retry is due (or a new job is enqueued)
+                due = self._conn.execute(
+                    "SELECT MIN(next_attempt_at) FROM jobs WHERE status = 'queued'"
+                ).fetchone()[0]
+                self._wakeup.wait(timeout=min(5, max(0.05, due - now)) if due else 5)
+        return None
+
+    def _finish(self, job_id: str, status: str, error: str = None, delay: float = 0):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, next_attempt_at = ?, updated_at = ? WHERE job_id = ?",
+                (status, error, time.time() + delay if delay else 0, str(datetime.now()), job_id)
+            )
+            self._conn.commit()
+
+    def _retry_delay(self, attempts: int) -> float:
+        return min(self.backoff * 2 ** (attempts - 1), self.backoff_max)
+
+    def _worker_loop(self):
+        while True:
+            job = None
+            try:
+                job = self._claim_next()
+                if job is None:
+                    return
+                self._run_job(job)
+            except Exception as e:
+                # e.g. "database is locked": one bad iteration must not take the worker down
+                logger.exception("AI worker error%s", f" in job {job['job_id']}" if job else "")
+                if job is None:
+                    time.sleep(1)
+                    continue
+                try:
+                    self._fail_attempt(job, str(e))
+                except Exception:
+                    # Still marked running; start() re-queues it on the next restart
+                    logger.exception("Could not release AI job %s", job["job_id"])
+                    time.sleep(1)
+
+    def _fail_attempt(self, job: dict, error: str):
+        """Re-queues the job after a backoff delay, or marks it failed once AI_JOB_MAX_ATTEMPTS are used."""
+        if job["attempts"] < self.max_attempts:
+            AI_ERRORS.inc(outcome="retry")
+            self._finish(job["job_id"], "queued", error, delay=self._retry_delay(job["attempts"]))
+            return
+        AI_ERRORS.inc(outcome="failed")
+        self._finish(job["job_id"], "failed", error)
+        # Keep the spool file so the job can be retried
+        self._update_evidence(job, {"ai_status": "failed"})
+
+    def _update_evidence(self, job: dict, fields: dict):
+        # Only the AI fields: the upload request and the batch anchorer write the same record concurrently
+        if not db.update_evidence_metadata(job["evidence_id"], fields):
+            logger.warning("AI job %s has no evidence record %s to update", job["job_id"], job["evidence_id"])
+            return
+        db.update_evidence_in_case(job["case_id"], job["evidence_id"], fields)
+
+    def _run_job(self, job: dict):
+        evidence_id = job["evidence_id"]
+        case_id = job["case_id"]
+        metadata = db.get_evidence_metadata(evidence_id) or {}
+
+        try:
+            self._update_evidence(job, {"ai_status": "processing"})
+
+            with IN_FLIGHT.track_inprogress(operation="ai_analysis"), stage("ai", "analysis"):
+                ai_result = ai_service.generate_summary(job["file_path"], file_hash=metadata.get("hash"))
+            if ai_result.get("error"):
+                raise RuntimeError(ai_result["error"])
+        except Exception as e:
+            logger.warning("AI job %s failed (attempt %d): %s", job["job_id"], job["attempts"], e)
+            self._fail_attempt(job, str(e))
+            return
+
+        # Update Metadata with AI results
+        knowledge_graph = ai_result.get("graph", {})
+        self._update_evidence(job, {
+            "ai_summary": ai_result.get("summary", ""),
+            "knowledge_graph": knowledge_graph,
+            "ai_status": "completed"
+        })
+
+        # Merge the evidence graph into the cross-case entity index
+        try:
+            graph_index.index_evidence(case_id, evidence_id, knowledge_graph)
+        except Exception as e:
+            logger.warning("Graph index update failed for %s: %s", evidence_id, e)
+
+        self._finish(job["job_id"], "completed")
+        if os.path.exists(job["file_path"]):
+            os.remove(job["file_path"])
+
+ai_jobs = AIJobQueue()
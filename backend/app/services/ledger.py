@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+GENESIS_HASH = "0" * 64
+
+class LocalLedger:
+    """
+    Append-only, hash-chained fallback ledger stored in SQLite.
+    - Every entry records the hash of the previous entry, so any rewrite breaks the chain.
+    - evidence_id is indexed, so appends and lookups stay O(log n) as the ledger grows.
+    - WAL + synchronous=FULL: a committed append is fsynced and survives a crash.
+    - BEGIN IMMEDIATE takes SQLite's file lock, so concurrent writers (threads or processes)
+      append one at a time and never fork the chain.
+    """
+    def __init__(self, db_path: str, legacy_json_path: str = None):
+        self.db_path = db_path
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                evidence_id TEXT NOT NULL,
+                data TEXT NOT NULL,
+                prev_entry_hash TEXT NOT NULL,
+                entry_hash TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_evidence_id ON entries (evidence_id);
+            CREATE TRIGGER IF NOT EXISTS entries_no_update BEFORE UPDATE ON entries
+                BEGIN SELECT RAISE(ABORT, 'ledger is append-only'); END;
+            CREATE TRIGGER IF NOT EXISTS entries_no_delete BEFORE DELETE ON entries
+                BEGIN SELECT RAISE(ABORT, 'ledger is append-only'); END;
+        """)
+
+        if legacy_json_path:
+            self._import_legacy(legacy_json_path)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; SQLite handles the locking between them
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _entry_hash(prev_entry_hash: str, data: str) -> str:
+        return hashlib.sha256(f"{prev_entry_hash}{data}".encode()).hexdigest()
+
+    def _insert(self, conn: sqlite3.Connection, entry: dict) -> str:
+        data = json.dumps(entry, sort_keys=True, separators=(",", ":"))
+        row = conn.execute("SELECT entry_hash FROM entries ORDER BY seq DESC LIMIT 1").fetchone()
+        prev_entry_hash = row[0] if row else GENESIS_HASH
+        entry_hash = self._entry_hash(prev_entry_hash, data)
+        conn.execute(
+            "INSERT INTO entries (evidence_id, data, prev_entry_hash, entry_hash) VALUES (?, ?, ?, ?)",
+            (entry.get("evidence_id", ""), data, prev_entry_hash, entry_hash)
+        )
+        return entry_hash
+
+    def append(self, entry: dict) -> str:
+        """Appends an entry and returns its chained hash."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            entry_hash = self._insert(conn, entry)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return entry_hash
+
+    def get(self, evidence_id: str):
+        """Returns the first record anchored for evidence_id, or None."""
+        row = self._conn().execute(
+            "SELECT data FROM entries WHERE evidence_id = ? ORDER BY seq LIMIT 1", (evidence_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def verify_chain(self) -> dict:
+        """Walks the whole ledger and recomputes every link of the hash chain."""
+        prev_entry_hash = GENESIS_HASH
+        checked = 0
+        for seq, data, stored_prev, stored_hash in self._conn().execute(
+            "SELECT seq, data, prev_entry_hash, entry_hash FROM entries ORDER BY seq"
+        ):
+            if stored_prev != prev_entry_hash or self._entry_hash(stored_prev, data) != stored_hash:
+                return {"valid": False, "entries_checked": checked, "broken_at_seq": seq}
+            prev_entry_hash = stored_hash
+            checked += 1
+        return {"valid": True, "entries_checked": checked, "head": prev_entry_hash}
+
+    def _import_legacy(self, legacy_json_path: str):
+        """One-time import of the old JSON-array ledger file, preserving order."""
+        if not os.path.exists(legacy_json_path) or self.count() > 0:
+            return
+        try:
+            with open(legacy_json_path, "r") as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Could not import legacy ledger {legacy_json_path}: {e}")
+            return
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Checked inside the write lock so two workers starting together import only once
+            if conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] > 0:
+                conn.execute("ROLLBACK")
+                return
+            for entry in entries:
+                self._insert(conn, entry)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        print(f"Imported {len(entries)} entries from legacy ledger {legacy_json_path}")
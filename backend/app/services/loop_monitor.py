@@ -0,0 +1,97 @@
+from app.core.config import settings
+from app.services.metrics import metrics
+from collections import deque
+from datetime import datetime
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+class LoopLagMonitor:
+    """
+    Watches the event loop for stalls.
+    - A heartbeat task sleeps LOOP_MONITOR_INTERVAL_SECONDS and records how late it wakes up (loop lag).
+    - A watchdog thread notices when the heartbeat has been silent for LOOP_STALL_THRESHOLD_SECONDS and
+      captures the loop thread's stack at that moment, i.e. the code that is blocking the loop.
+    Stalls are printed and the most recent ones are kept for /health/loop.
+    """
+    def __init__(self):
+        self.interval = settings.LOOP_MONITOR_INTERVAL_SECONDS
+        self.threshold = settings.LOOP_STALL_THRESHOLD_SECONDS
+        self.stalls = deque(maxlen=settings.LOOP_STALL_HISTORY)
+        self._task = None
+        self._watchdog = None
+        self._running = False
+        self._loop_thread_id = None
+        self._last_beat = time.monotonic()
+        self._current_stall = None
+        self._lock = threading.Lock()
+        self.lag_max = 0.0
+        self.lag_last = 0.0
+        self.stall_count = 0
+
+    def start(self):
+        """Call from the running event loop (the app's lifespan handler)."""
+        if self._running or not self.threshold:
+            return
+        self._running = True
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self):
+        while self._running:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            with self._lock:
+                self._last_beat = now
+                self.lag_last = lag
+                self.lag_max = max(self.lag_max, lag)
+                stall, self._current_stall = self._current_stall, None
+            if stall:
+                stall["duration_seconds"] = round(lag, 3)
+                print(f"Event loop stalled for {stall['duration_seconds']}s in:\n{stall['stack']}")
+
+    def _watch(self):
+        while self._running:
+            time.sleep(self.threshold / 2)
+            with self._lock:
+                silent = time.monotonic() - self._last_beat - self.interval
+                if silent < self.threshold or self._current_stall is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stall = {
+                    "detected_at": str(datetime.now()),
+                    "duration_seconds": None, # Filled in once the loop recovers
+                    "stack": "".join(traceback.format_stack(frame)) if frame else "<unavailable>"
+                }
+                self._current_stall = stall
+                self.stall_count += 1
+                self.stalls.append(stall)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._running,
+            "lag_last_seconds": round(self.lag_last, 4),
+            "lag_max_seconds": round(self.lag_max, 4),
+            "stall_threshold_seconds": self.threshold,
+            "stalls": self.stall_count,
+            "recent_stalls": list(self.stalls)
+        }
+
+loop_monitor = LoopLagMonitor()
+
+metrics.gauge("divel_event_loop_lag_seconds", "How late the last loop heartbeat woke up", collect=lambda: loop_monitor.lag_last)
+metrics.gauge("divel_event_loop_lag_max_seconds", "Worst loop heartbeat lag since start", collect=lambda: loop_monitor.lag_max)
+metrics.gauge("divel_event_loop_stalls", "Loop stalls detected since start", collect=lambda: loop_monitor.stall_count)
@@ -0,0 +1,54 @@
+import hashlib
+
+# Domain separation so a leaf can never be passed off as an inner node
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+def leaf_hash(evidence_id: str, file_hash: str) -> bytes:
+    """A leaf binds the evidence id to its file hash."""
+    return hashlib.sha256(LEAF_PREFIX + f"{evidence_id}:{file_hash}".encode()).digest()
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+def build_tree(leaves: list) -> list:
+    """
+    Returns every level of the tree, leaves first and the root level last.
+    An odd node at the end of a level is carried up unchanged.
+    """
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = []
+        for i in range(0, len(level), 2):
+            if i + 1 < len(level):
+                parents.append(_node_hash(level[i], level[i + 1]))
+            else:
+                parents.append(level[i])
+        levels.append(parents)
+    return levels
+
+def get_proof(levels: list, index: int) -> list:
+    """Sibling hashes from the leaf up to the root, each tagged with its side."""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({
+                "position": "left" if sibling < index else "right",
+                "hash": level[sibling].hex()
+            })
+        index //= 2
+    return proof
+
+def verify_proof(leaf: bytes, proof: list, root: bytes) -> bool:
+    node = leaf
+    for step in proof:
+        sibling = bytes.fromhex(step["hash"])
+        if step["position"] == "left":
+            node = _node_hash(sibling, node)
+        else:
+            node = _node_hash(node, sibling)
+    return node == root
@@ -0,0 +1,181 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+import functools
+import threading
+import time
+
+# Seconds; spans a fast DB write up to a multi-minute upload or AI analysis
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {} # label values tuple -> value/state
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        lines.extend(self._render_values(items))
+        return lines
+
+    def _render_values(self, items: list) -> list:
+        return [f"{self.name}{_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), collect=None):
+        super().__init__(name, help_text, labelnames)
+        self._collect = collect # Optional callable returning the current value at scrape time
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def render(self) -> list:
+        if self._collect:
+            self.set(self._collect())
+        return super().render()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (non-cumulative, +Inf last), sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_values(self, items: list) -> list:
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                labels = _labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text format (scraped from /metrics).
+    Recording is a dict update under a per-metric lock, so instrumenting hot paths costs a few microseconds.
+    """
+    def __init__(self):
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: tuple = ()) -> Counter:
+        return self._add(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: tuple = (), collect=None) -> Gauge:
+        return self._add(Gauge(name, help_text, labelnames, collect))
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+# --- Evidence pipeline ---
+
+STAGE_SECONDS = metrics.histogram(
+    "divel_pipeline_stage_seconds", "Time spent in each evidence pipeline stage", ("pipeline", "stage")
+)
+BYTES_HASHED = metrics.counter("divel_hashed_bytes_total", "Bytes run through SHA-256", ("source",))
+BYTES_STORED = metrics.counter("divel_storage_bytes_total", "Bytes moved to or from evidence storage", ("direction",))
+IN_FLIGHT = metrics.gauge("divel_in_flight", "Operations currently in progress", ("operation",))
+LEDGER_FALLBACKS = metrics.counter(
+    "divel_ledger_fallback_total", "Anchors or verifications served by the local ledger instead of the chain", ("operation",)
+)
+CHAIN_ERRORS = metrics.counter("divel_chain_errors_total", "Failed blockchain calls", ("operation",))
+AI_ERRORS = metrics.counter("divel_ai_errors_total", "Failed AI analysis attempts", ("outcome",))
+STORAGE_ERRORS = metrics.counter("divel_storage_errors_total", "Failed storage transfers")
+
+def stage(pipeline: str, name: str):
+    """with stage("upload", "anchor"): ... records the block's duration."""
+    return STAGE_SECONDS.time(pipeline=pipeline, stage=name)
+
+def tracked(pipeline: str):
+    """Decorates an async endpoint: counts it in flight and records its total duration."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with IN_FLIGHT.track_inprogress(operation=pipeline), stage(pipeline, "total"):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+class LazyService:
+    """
+    Module-level stand-in for a service singleton (`storage`, `blockchain`, ...).
+    The real object is built by the registry on first attribute access; importing the module costs nothing.
+    """
+    __slots__ = ("_registry", "_name")
+
+    def __init__(self, registry, name: str):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attr):
+        attached = self._registry._services[self._name]["attached"]
+        if attr in attached:
+            return attached[attr]
+        return getattr(self._registry.get(self._name), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._registry.get(self._name), attr, value)
+
+    def __repr__(self):
+        return f"<LazyService {self._name}: {self._registry.state(self._name)['status']}>"
+
+
+class ServiceRegistry:
+    """
+    Builds expensive clients (boto3, Web3, Gemini, bcrypt-seeded users) on first use instead of at import.
+    - warm(names) builds several services in parallel threads, e.g. from the app's lifespan handler.
+    - readiness() reports each service's state, build time and, once built, its own health check.
+    A factory that raises leaves the service "failed"; the next access tries again.
+    Async code must not touch a service that may not be built yet on the event loop: resolve it on an
+    executor (e.g. `run_in("chain", lambda: blockchain.x(...))`) or use an attached async facade.
+    """
+    def __init__(self):
+        self._services = {} # name -> {"factory", "check", "critical", "instance", "lock", ...}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory, check=None, critical: bool = True) -> LazyService:
+        """check(instance) -> dict of health details; a "ready": False entry marks the service not ready."""
+        with self._lock:
+            self._services[name] = {
+                "factory": factory, "check": check, "critical": critical,
+                "instance": None, "lock": threading.Lock(), "attached": {},
+                "status": "not_started", "init_seconds": None, "error": None
+            }
+        return LazyService(self, name)
+
+    def attach(self, name: str, **attributes):
+        """Attributes served by the stand-in itself, without building the service (e.g. db.aio)."""
+        self._services[name]["attached"].update(attributes)
+
+    def get(self, name: str):
+        service = self._services[name]
+        instance = service["instance"]
+        if instance is not None:
+            return instance
+        with service["lock"]:
+            if service["instance"] is None:
+                service["status"] = "starting"
+                started = time.perf_counter()
+                try:
+                    instance = service["factory"]()
+                except Exception as e:
+                    service.update(status="failed", error=str(e), init_seconds=round(time.perf_counter() - started, 3))
+                    raise
+                service.update(status="ready", error=None, init_seconds=round(time.perf_counter() - started, 3))
+                service["instance"] = instance
+            return service["instance"]
+
+    def started(self, name: str) -> bool:
+        return self._services[name]["instance"] is not None
+
+    def state(self, name: str) -> dict:
+        service = self._services[name]
+        return {key: service[key] for key in ("status", "init_seconds", "error", "critical")}
+
+    def warm(self, names: list = None, wait: bool = True):
+        """Builds the named (default: all) services in parallel. With wait=False, returns immediately."""
+        names = [name for name in (names or list(self._services)) if name in self._services]
+        if not names:
+            return
+
+        def build(name):
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Service {name} failed to start: {e}")
+
+        pool = ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="service-init")
+        for name in names:
+            pool.submit(build, name)
+        pool.shutdown(wait=wait)
+
+    def readiness(self) -> dict:
+        """{"ready": bool, "services": {name: state}}; ready means every critical service is built and healthy."""
+        services = {}
+        ready = True
+        for name, service in list(self._services.items()):
+            state = self.state(name)
+            if service["instance"] is not None and service["check"]:
+                try:
+                    state.update(service["check"](service["instance"]))
+                except Exception as e:
+                    state.update(ready=False, error=str(e))
+            healthy = state["status"] == "ready" and state.get("ready", True)
+            if service["critical"] and not healthy:
+                ready = False
+            services[name] = state
+        return {"ready": ready, "services": services}
+
+registry = ServiceRegistry()
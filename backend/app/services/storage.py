@@ -1,49 +1,117 @@
 import boto3
+import mmap
 import os
-from typing import BinaryIO
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from contextlib import contextmanager
+from typing import Iterator
 from app.core.config import settings
+from app.services.registry import registry
 
 class StorageService:
     def __init__(self):
         # We initialize the client but check env vars before using
         self.s3_client = None
         self.bucket_name = settings.S3_BUCKET_NAME
-        
+        self.endpoint_url = settings.S3_ENDPOINT_URL or None # e.g. a local MinIO for testing
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_SIZE,
+            max_concurrency=settings.S3_MAX_CONCURRENCY,
+            max_bandwidth=settings.S3_MAX_BANDWIDTH or None
+        )
+
         if settings.AWS_ACCESS_KEY_ID:
             self.s3_client = boto3.client(
                 's3',
                 aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
                 aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_REGION
+                region_name=settings.AWS_REGION,
+                endpoint_url=self.endpoint_url,
+                # Enough pooled connections for every part in flight
+                config=Config(max_pool_connections=max(10, settings.S3_MAX_CONCURRENCY * 2))
             )
 
-    def upload_file(self, file_obj: BinaryIO, filename: str, content_type: str) -> str:
+    def object_url(self, filename: str) -> str:
+        if not self.s3_client:
+            return self.local_path(filename)
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket_name}/{filename}"
+        return f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{filename}"
+
+    def local_path(self, filename: str) -> str:
+        return f"uploads/{filename}"
+
+    def stat(self, filename: str):
+        """Size, ETag/mtime and content type of a stored object, or None if it does not exist."""
         if self.s3_client:
             try:
-                self.s3_client.upload_fileobj(
-                    file_obj,
-                    self.bucket_name,
-                    filename,
-                    ExtraArgs={'ContentType': content_type}
-                )
-                return f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{filename}"
-            except Exception as e:
-                print(f"Error uploading to S3: {e}")
-                # Fallback to local? For now, re-raise or return None
-                raise e
-        else:
-            # Local Storage Mock
-            local_path = f"uploads/{filename}"
-            os.makedirs(os.path.dirname(local_path), exist_ok=True)
-            with open(local_path, "wb") as f:
-                f.write(file_obj.read())
-            return local_path
-
-    def get_file(self, filename: str):
+                head = self.s3_client.head_object(Bucket=self.bucket_name, Key=filename)
+            except self.s3_client.exceptions.ClientError as e:
+                if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                    return None
+                raise
+            return {
+                "size": head["ContentLength"],
+                "etag": head["ETag"].strip('"'),
+                "mtime": head["LastModified"].timestamp(),
+                "content_type": head.get("ContentType")
+            }
+        try:
+            st = os.stat(self.local_path(filename))
+        except FileNotFoundError:
+            return None
+        return {
+            "size": st.st_size,
+            "etag": f"{st.st_size:x}-{st.st_mtime_ns:x}", # Changes whenever the file is rewritten
+            "mtime": st.st_mtime,
+            "content_type": None
+        }
+
+    @contextmanager
+    def mmap_local(self, filename: str):
+        """Read-only memory map of a local object (None for an empty file); pages are shared with the OS cache."""
+        with open(self.local_path(filename), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield None
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield mm
+
+    def get_file(self, filename: str, start: int = 0, end: int = None, chunk_size: int = None) -> Iterator[bytes]:
+        """
+        Streams bytes start..end (inclusive; end=None means to the end of the object) in chunks,
+        so callers never hold the whole object in memory.
+        """
+        chunk_size = chunk_size or settings.DOWNLOAD_CHUNK_SIZE
         if self.s3_client:
-            # returns a presigned url or the object
-            pass 
-        else:
-            pass
+            byte_range = f"bytes={start}-{'' if end is None else end}"
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=filename, Range=byte_range)
+            body = response["Body"]
+            try:
+                yield from body.iter_chunks(chunk_size)
+            finally:
+                body.close()
+            return
+
+        with self.mmap_local(filename) as mm:
+            if mm is None:
+                return
+            stop = len(mm) if end is None else min(end + 1, len(mm))
+            for offset in range(start, stop, chunk_size):
+                yield mm[offset:min(offset + chunk_size, stop)]
+
+    def presigned_url(self, filename: str, expires_in: int = None, download_name: str = None):
+        """Time-limited direct S3 link, so large downloads bypass the API server. None for local storage."""
+        if not self.s3_client:
+            return None
+        params = {"Bucket": self.bucket_name, "Key": filename}
+        if download_name:
+            params["ResponseContentDisposition"] = f'attachment; filename="{download_name}"'
+        return self.s3_client.generate_presigned_url(
+            "get_object",
+            Params=params,
+            ExpiresIn=expires_in or settings.S3_PRESIGNED_URL_TTL
+        )
 
-storage = StorageService()
+storage = registry.register("storage", StorageService, check=lambda s: {"backend": "s3" if s.s3_client else "local"})
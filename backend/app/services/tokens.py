@@ -0,0 +1,197 @@
+from app.core.config import settings
+from app.services.executors import run_in
+from collections import OrderedDict
+from jose import jwt
+import hashlib
+import logging
+import math
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """Fixed-size set membership with no false negatives; false positives are confirmed against the store."""
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenService:
+    """
+    Validates bearer tokens with almost no per-request work:
+    - Validated tokens are kept in an expiry-aware LRU (TOKEN_CACHE_SIZE), so repeat requests skip jwt.decode.
+    - Revoked token ids (jti) live in SQLite, shared by all workers, and are mirrored into an in-memory
+      Bloom filter; only a filter hit costs a store lookup. A background thread picks up other workers'
+      revocations every TOKEN_REVOCATION_SYNC_SECONDS, so requests never wait on the sync.
+    """
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.TOKEN_REVOCATION_DB
+        self.cache_size = settings.TOKEN_CACHE_SIZE
+        self._cache = OrderedDict() # token -> (claims, expires_at)
+        self._lock = threading.Lock() # Guards the cache and the filter state (_bloom, _bloom_count, _synced_at, _rebuilt_at)
+        self._local = threading.local()
+        self._thread = None
+        self._running = False
+        self._conn().execute("""
+            CREATE TABLE IF NOT EXISTS revoked_tokens (
+                jti TEXT PRIMARY KEY,
+                expires_at REAL NOT NULL,
+                revoked_at REAL NOT NULL
+            )
+        """)
+        self._conn().execute("CREATE INDEX IF NOT EXISTS revoked_tokens_revoked_at ON revoked_tokens (revoked_at)")
+        self._rebuild_filter()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    # --- Revocation ---
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._sync_loop, name="token-revocation-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def _sync_loop(self):
+        while self._running:
+            time.sleep(settings.TOKEN_REVOCATION_SYNC_SECONDS)
+            try:
+                self._sync()
+            except Exception:
+                logger.exception("Token revocation sync failed")
+
+    def _rebuild_filter(self):
+        """Reloads unexpired revocations (expired ones are dropped, which is how the filter sheds old entries)."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("DELETE FROM revoked_tokens WHERE expires_at < ?", (now,))
+        jtis = [row[0] for row in conn.execute("SELECT jti FROM revoked_tokens")]
+        bloom = BloomFilter(max(settings.TOKEN_REVOCATION_CAPACITY, len(jtis) * 2))
+        for jti in jtis:
+            bloom.add(jti)
+        # A revocation that lands during the rebuild has revoked_at >= now, so the next sync adds it
+        with self._lock:
+            self._bloom = bloom
+            self._bloom_count = len(jtis)
+            self._synced_at = now
+            self._rebuilt_at = now
+
+    def _sync(self):
+        """Adds revocations made since the last sync (by any worker); runs on the sync thread."""
+        now = time.time()
+        with self._lock:
+            synced_at = self._synced_at
+            rebuild = self._bloom_count > settings.TOKEN_REVOCATION_CAPACITY or now - self._rebuilt_at > 3600
+        if rebuild:
+            self._rebuild_filter()
+            return
+        jtis = [row[0] for row in self._conn().execute(
+            "SELECT jti FROM revoked_tokens WHERE revoked_at >= ?", (synced_at - 1,)
+        )]
+        with self._lock:
+            for jti in jtis:
+                self._bloom.add(jti)
+            self._bloom_count += len(jtis)
+            self._synced_at = now
+
+    def _maybe_revoked(self, jti: str) -> bool:
+        """In-memory filter check: False means not revoked, True needs confirming against the store."""
+        self.start()
+        with self._lock:
+            return jti in self._bloom
+
+    def _revoked_in_store(self, jti: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM revoked_tokens WHERE jti = ?", (jti,)).fetchone() is not None
+
+    def is_revoked(self, jti: str) -> bool:
+        return self._maybe_revoked(jti) and self._revoked_in_store(jti)
+
+    def revoke(self, claims: dict):
+        """Revokes a token by its claims until it would have expired anyway."""
+        jti = claims.get("jti")
+        if not jti:
+            return
+        self._conn().execute(
+            "INSERT OR IGNORE INTO revoked_tokens (jti, expires_at, revoked_at) VALUES (?, ?, ?)",
+            (jti, float(claims.get("exp", time.time())), time.time())
+        )
+        with self._lock:
+            self._bloom.add(jti)
+            self._bloom_count += 1
+            for token in [token for token, (cached, _) in self._cache.items() if cached.get("jti") == jti]:
+                del self._cache[token]
+
+    # --- Validation ---
+
+    def _claims(self, token: str, token_type: str) -> dict:
+        """Signature, expiry and type checks, answered from the cache when possible; no I/O."""
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(token)
+            if entry and entry[1] > now:
+                self._cache.move_to_end(token)
+                claims = entry[0]
+            else:
+                claims = None
+                if entry:
+                    del self._cache[token]
+
+        if claims is None:
+            claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            if claims.get("type", "access") != token_type:
+                raise ValueError(f"Expected a {token_type} token")
+            if token_type == "access":
+                with self._lock:
+                    self._cache[token] = (claims, float(claims.get("exp", now)))
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        elif claims.get("type", "access") != token_type:
+            raise ValueError(f"Expected a {token_type} token")
+        return claims
+
+    def decode(self, token: str, token_type: str = "access") -> dict:
+        """
+        Claims of a valid, unexpired, unrevoked token of the given type.
+        Raises jose.JWTError (or ValueError for a wrong type/revoked token) otherwise.
+        """
+        claims = self._claims(token, token_type)
+        if claims.get("jti") and self.is_revoked(claims["jti"]):
+            raise ValueError("Token has been revoked")
+        return claims
+
+    async def decode_async(self, token: str, token_type: str = "access") -> dict:
+        """decode for async callers: only a Bloom filter hit reaches SQLite, and that runs on the files pool."""
+        claims = self._claims(token, token_type)
+        jti = claims.get("jti")
+        if jti and self._maybe_revoked(jti) and await run_in("files", self._revoked_in_store, jti):
+            raise ValueError("Token has been revoked")
+        return claims
+
+tokens = TokenService()
@@ -0,0 +1,269 @@
+from app.core.config import settings
+from app.services.storage import storage
+from app.services.metrics import BYTES_STORED, STORAGE_ERRORS
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+S3_MAX_PARTS = 10000
+
+class BandwidthLimiter:
+    """Shared token bucket: callers reserve bytes and sleep until the configured rate allows them."""
+    def __init__(self, bytes_per_second: int):
+        self.rate = bytes_per_second
+        self._available_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, size: int):
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._available_at)
+            self._available_at = start + size / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+
+class TransferManager:
+    """
+    Moves spooled uploads into storage.
+    - S3: parallel multipart upload (S3_MAX_CONCURRENCY parts in flight, S3_MULTIPART_CHUNK_SIZE each),
+      throttled by S3_MAX_BANDWIDTH.
+    - Transfer state (including the S3 UploadId and part size) is kept in SQLite, so after a worker
+      restart resume_pending() asks S3 which parts already landed and uploads only the rest from the spool file.
+    - Progress (bytes received from the client, bytes written to storage) is exposed per transfer.
+    """
+    def __init__(self):
+        self.db_path = settings.UPLOAD_STATE_DB
+        self.part_size = settings.S3_MULTIPART_CHUNK_SIZE
+        self.concurrency = max(1, settings.S3_MAX_CONCURRENCY)
+        self.limiter = BandwidthLimiter(settings.S3_MAX_BANDWIDTH)
+        self._lock = threading.Lock()
+        self._live = {} # transfer_id -> in-flight byte counters
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS transfers (
+                transfer_id TEXT PRIMARY KEY,
+                evidence_id TEXT NOT NULL,
+                case_id TEXT NOT NULL,
+                storage_key TEXT NOT NULL,
+                content_type TEXT NOT NULL,
+                spool_path TEXT NOT NULL,
+                size INTEGER,
+                part_size INTEGER,
+                s3_upload_id TEXT,
+                bytes_uploaded INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL,
+                url TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS transfers_status ON transfers (status)")
+        self._conn.commit()
+
+    # --- State ---
+
+    def _update(self, transfer_id: str, **fields):
+        fields["updated_at"] = str(datetime.now())
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE transfers SET {assignments} WHERE transfer_id = ?",
+                (*fields.values(), transfer_id)
+            )
+            self._conn.commit()
+
+    def get(self, transfer_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM transfers WHERE transfer_id = ?", (transfer_id,)).fetchone()
+        return dict(row) if row else None
+
+    def create(self, transfer_id: str, evidence_id: str, case_id: str, storage_key: str, content_type: str, spool_path: str):
+        now = str(datetime.now())
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO transfers (transfer_id, evidence_id, case_id, storage_key, content_type, spool_path, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, 'receiving', ?, ?)",
+                (transfer_id, evidence_id, case_id, storage_key, content_type, spool_path, now, now)
+            )
+            self._conn.commit()
+            self._live[transfer_id] = {"bytes_received": 0, "bytes_uploaded": 0}
+
+    def record_received(self, transfer_id: str, size: int):
+        live = self._live.get(transfer_id)
+        if live is not None:
+            live["bytes_received"] += size
+
+    def mark_received(self, transfer_id: str, size: int):
+        self._update(transfer_id, size=size, status="uploading")
+
+    def fail(self, transfer_id: str, error: str):
+        live = self._live.pop(transfer_id, {})
+        self._update(transfer_id, status="failed", error=error, bytes_uploaded=live.get("bytes_uploaded", 0))
+
+    def progress(self, transfer_id: str):
+        transfer = self.get(transfer_id)
+        if not transfer:
+            return None
+        live = self._live.get(transfer_id, {})
+        size = transfer["size"]
+        uploaded = live.get("bytes_uploaded", transfer["bytes_uploaded"])
+        if transfer["status"] == "completed":
+            uploaded = size
+        return {
+            "upload_id": transfer_id,
+            "evidence_id": transfer["evidence_id"],
+            "status": transfer["status"],
+            "bytes_received": live.get("bytes_received", size or 0),
+            "bytes_uploaded": uploaded,
+            "size": size,
+            "percent": round(100 * uploaded / size, 1) if size else None,
+            "error": transfer["error"]
+        }
+
+    # --- Transfer ---
+
+    def run(self, transfer_id: str) -> str:
+        """Uploads the spooled file (resuming if a previous attempt was interrupted) and returns its URL."""
+        transfer = self.get(transfer_id)
+        self._live.setdefault(transfer_id, {"bytes_received": transfer["size"], "bytes_uploaded": 0})
+        try:
+            if storage.s3_client:
+                self._upload_s3(transfer)
+            else:
+                self._copy_local(transfer)
+        except Exception as e:
+            STORAGE_ERRORS.inc()
+            self.fail(transfer_id, str(e))
+            raise
+        url = storage.object_url(transfer["storage_key"])
+        self._update(transfer_id, status="completed", url=url, bytes_uploaded=transfer["size"], error=None)
+        self._live.pop(transfer_id, None)
+        return url
+
+    def _add_uploaded(self, transfer_id: str, size: int):
+        BYTES_STORED.inc(size, direction="upload")
+        with self._lock:
+            live = self._live[transfer_id]
+            live["bytes_uploaded"] += size
+
+    def _copy_local(self, transfer: dict):
+        local_path = storage.local_path(transfer["storage_key"])
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        with open(transfer["spool_path"], "rb") as src, open(local_path, "wb") as dst:
+            while True:
+                chunk = src.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                self._add_uploaded(transfer["transfer_id"], len(chunk))
+
+    def _upload_s3(self, transfer: dict):
+        transfer_id = transfer["transfer_id"]
+        size = transfer["size"]
+        # Never exceed S3's 10,000 part limit; stays fixed for the life of the transfer
+        part_size = transfer["part_size"] or max(self.part_size, math.ceil(size / S3_MAX_PARTS))
+
+        if size <= part_size:
+            # Small file: single request (TransferConfig still applies the bandwidth cap)
+            storage.s3_client.upload_file(
+                transfer["spool_path"], storage.bucket_name, transfer["storage_key"],
+                ExtraArgs={"ContentType": transfer["content_type"]},
+                Config=storage.transfer_config,
+                Callback=lambda n: self._add_uploaded(transfer_id, n)
+            )
+            return
+
+        s3 = storage.s3_client
+        done = self._completed_parts(transfer) if transfer["s3_upload_id"] else None
+        if done is None:
+            upload = s3.create_multipart_upload(
+                Bucket=storage.bucket_name, Key=transfer["storage_key"], ContentType=transfer["content_type"]
+            )
+            transfer["s3_upload_id"] = upload["UploadId"]
+            done = {}
+            self._update(transfer_id, s3_upload_id=transfer["s3_upload_id"], part_size=part_size)
+        else:
+            logger.info("Resuming transfer %s: %d parts already uploaded", transfer_id, len(done))
+
+        part_count = math.ceil(size / part_size)
+        self._add_uploaded(transfer_id, sum(
+            min(part_size, size - (number - 1) * part_size) for number in done
+        ))
+
+        def upload_part(number: int) -> dict:
+            offset = (number - 1) * part_size
+            with open(transfer["spool_path"], "rb") as f:
+                f.seek(offset)
+                body = f.read(min(part_size, size - offset))
+            self.limiter.consume(len(body))
+            response = s3.upload_part(
+                Bucket=storage.bucket_name, Key=transfer["storage_key"],
+                UploadId=transfer["s3_upload_id"], PartNumber=number, Body=body
+            )
+            self._add_uploaded(transfer_id, len(body))
+            return {"PartNumber": number, "ETag": response["ETag"]}
+
+        missing = [number for number in range(1, part_count + 1) if number not in done]
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="s3-part") as pool:
+            parts = list(pool.map(upload_part, missing))
+        self._update(transfer_id, bytes_uploaded=size)
+
+        parts.extend({"PartNumber": number, "ETag": etag} for number, etag in done.items())
+        s3.complete_multipart_upload(
+            Bucket=storage.bucket_name, Key=transfer["storage_key"],
+            UploadId=transfer["s3_upload_id"],
+            MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])}
+        )
+
+    def _completed_parts(self, transfer: dict):
+        """{part number: ETag} already stored for the transfer's multipart upload, or None if it no longer exists."""
+        done = {}
+        kwargs = {"Bucket": storage.bucket_name, "Key": transfer["storage_key"], "UploadId": transfer["s3_upload_id"]}
+        try:
+            while True:
+                response = storage.s3_client.list_parts(**kwargs)
+                for part in response.get("Parts", []):
+                    done[part["PartNumber"]] = part["ETag"]
+                if not response.get("IsTruncated"):
+                    return done
+                kwargs["PartNumberMarker"] = response["NextPartNumberMarker"]
+        except storage.s3_client.exceptions.NoSuchUpload:
+            return None
+
+    def resume_pending(self, on_complete=None):
+        """Restarts transfers interrupted by a shutdown or crash, in a background thread."""
+        with self._lock:
+            rows = [dict(row) for row in self._conn.execute("SELECT * FROM transfers WHERE status = 'uploading'")]
+        if not rows:
+            return
+
+        def resume():
+            for transfer in rows:
+                if not os.path.exists(transfer["spool_path"]):
+                    self.fail(transfer["transfer_id"], "Spool file missing, cannot resume")
+                    continue
+                try:
+                    url = self.run(transfer["transfer_id"])
+                except Exception:
+                    logger.exception("Resuming transfer %s failed", transfer["transfer_id"])
+                    continue
+                if on_complete:
+                    on_complete(transfer, url)
+
+        logger.info("Resuming %d interrupted uploads", len(rows))
+        threading.Thread(target=resume, name="transfer-resume", daemon=True).start()
+
+transfers = TransferManager()
@@ -0,0 +1,100 @@
+from app.core.config import settings
+from app.core import security
+from app.services.registry import registry
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+import sqlite3
+import threading
+
+# Demo accounts, created once when the store is first initialised (SEED_DEMO_USERS)
+DEMO_USERS = [
+    ("polaris", "polaris123", "Polaris"),
+    ("forensics", "forensics123", "Forensics"),
+    ("judge", "judge123", "Judge"),
+]
+
+class UserStore(ABC):
+    """Interface for user accounts: {"username", "password_hash", "role"}."""
+    @abstractmethod
+    def get(self, username: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def upsert(self, username: str, password_hash: str, role: str):
+        ...
+
+    @abstractmethod
+    def set_password_hash(self, username: str, password_hash: str):
+        ...
+
+    @abstractmethod
+    def list_users(self) -> list:
+        ...
+
+    def seed(self, accounts: list):
+        """Creates any missing accounts; existing ones (and their passwords) are left alone."""
+        for username, password, role in accounts:
+            if not self.get(username):
+                self.upsert(username, security.get_password_hash(password), role)
+
+
+class SQLiteUserStore(UserStore):
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.USER_STORE_DB
+        self._local = threading.local()
+        self._conn().execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                username TEXT PRIMARY KEY,
+                password_hash TEXT NOT NULL,
+                role TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, username: str) -> Optional[dict]:
+        row = self._conn().execute(
+            "SELECT username, password_hash, role FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return {"username": row[0], "password_hash": row[1], "role": row[2]} if row else None
+
+    def upsert(self, username: str, password_hash: str, role: str):
+        self._conn().execute(
+            "INSERT INTO users (username, password_hash, role, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (username) DO UPDATE SET password_hash = excluded.password_hash, "
+            "role = excluded.role, updated_at = excluded.updated_at",
+            (username, password_hash, role, str(datetime.now()))
+        )
+
+    def set_password_hash(self, username: str, password_hash: str):
+        self._conn().execute(
+            "UPDATE users SET password_hash = ?, updated_at = ? WHERE username = ?",
+            (password_hash, str(datetime.now()), username)
+        )
+
+    def list_users(self) -> list:
+        return [
+            {"username": username, "role": role}
+            for username, role in self._conn().execute("SELECT username, role FROM users ORDER BY username")
+        ]
+
+
+def _create_user_store() -> UserStore:
+    backend = settings.USER_STORE_BACKEND
+    if backend == "sqlite":
+        store = SQLiteUserStore()
+    else:
+        raise ValueError(f"Unknown USER_STORE_BACKEND: {backend}")
+    if settings.SEED_DEMO_USERS:
+        store.seed(DEMO_USERS)
+    return store
+
+users = registry.register("users", _create_user_store)
@@ -0,0 +1,206 @@
+from app.core.config import settings
+from app.services.storage import storage
+from app.services.blockchain import blockchain
+from app.services.metrics import stage, BYTES_HASHED
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+class VerificationService:
+    """
+    Re-hashes stored evidence for integrity checks.
+    - Local storage: SHA-256 over a read-only mmap in one call (no per-chunk copies, GIL released).
+    - S3: the object is streamed through SHA-256 in VERIFY_CHUNK_SIZE chunks.
+    The computed hash is cached per object version (S3 ETag / local size+mtime); an unchanged
+    object is not re-read until VERIFY_CACHE_TTL_SECONDS have passed or force=True is passed.
+    """
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.VERIFY_CACHE_DB
+        self.chunk_size = settings.VERIFY_CHUNK_SIZE
+        self.ttl = settings.VERIFY_CACHE_TTL_SECONDS
+        self._local = threading.local()
+        self._conn().execute("""
+            CREATE TABLE IF NOT EXISTS verified (
+                storage_key TEXT PRIMARY KEY,
+                etag TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                verified_at TEXT NOT NULL,
+                verified_ts REAL NOT NULL
+            )
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread (audits hash from a pool)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _hash_object(self, storage_key: str) -> tuple:
+        digest = hashlib.sha256()
+        size = 0
+        if storage.s3_client:
+            for chunk in storage.get_file(storage_key, chunk_size=self.chunk_size):
+                digest.update(chunk)
+                size += len(chunk)
+        else:
+            with storage.mmap_local(storage_key) as mm:
+                if mm is not None:
+                    digest.update(mm)
+                    size = len(mm)
+        return digest.hexdigest(), size
+
+    def compute_hash(self, storage_key: str, force: bool = False) -> dict:
+        """
+        SHA-256 of the stored object plus a report:
+        {hash, size, etag, cached, verified_at, seconds, throughput_mb_s}. Returns None if the object is missing.
+        """
+        info = storage.stat(storage_key)
+        if not info:
+            return None
+
+        if not force:
+            row = self._conn().execute(
+                "SELECT hash, size, verified_at, verified_ts FROM verified WHERE storage_key = ? AND etag = ?",
+                (storage_key, info["etag"])
+            ).fetchone()
+            if row and (not self.ttl or time.time() - row[3] < self.ttl):
+                return {
+                    "hash": row[0], "size": row[1], "etag": info["etag"], "cached": True,
+                    "verified_at": row[2], "seconds": 0.0, "throughput_mb_s": None
+                }
+
+        started = time.perf_counter()
+        file_hash, size = self._hash_object(storage_key)
+        seconds = time.perf_counter() - started
+        BYTES_HASHED.inc(size, source="verify")
+        verified_at = str(datetime.now())
+        self._conn().execute(
+            "INSERT OR REPLACE INTO verified (storage_key, etag, hash, size, verified_at, verified_ts) VALUES (?, ?, ?, ?, ?, ?)",
+            (storage_key, info["etag"], file_hash, size, verified_at, time.time())
+        )
+        return {
+            "hash": file_hash, "size": size, "etag": info["etag"], "cached": False,
+            "verified_at": verified_at, "seconds": round(seconds, 4),
+            "throughput_mb_s": round(size / (1024 * 1024) / seconds, 1) if seconds > 0 else None
+        }
+
+    # --- Audits ---
+
+    def _hash_item(self, metadata: dict, force: bool) -> dict:
+        storage_key = metadata.get("storage_key")
+        try:
+            return self.compute_hash(storage_key, force) if storage_key else None
+        except Exception as e:
+            return {"error": str(e)}
+
+    def audit(self, evidence_items: list, scope: dict, force: bool = False, workers: int = None) -> dict:
+        """
+        Verifies many evidence items: files are hashed in parallel (AUDIT_WORKERS threads) and
+        checked against one batched read of the chain, then the report is signed.
+        """
+        started_at = str(datetime.now())
+        started = time.perf_counter()
+        with stage("audit", "rehash"), \
+                ThreadPoolExecutor(max_workers=workers or settings.AUDIT_WORKERS, thread_name_prefix="audit-hash") as pool:
+            reports = list(pool.map(lambda metadata: self._hash_item(metadata, force), evidence_items))
+
+        hashed = [
+            {
+                "evidence_id": metadata["evidence_id"],
+                "computed_hash": report["hash"],
+                "merkle_anchor": metadata if metadata.get("anchor_mode") == "merkle_batch" else None
+            }
+            for metadata, report in zip(evidence_items, reports) if report and "hash" in report
+        ]
+        with stage("audit", "chain"):
+            chain_results = blockchain.verify_many(hashed, case_id=scope.get("case_id"))
+
+        items = []
+        bytes_hashed = 0
+        for metadata, report in zip(evidence_items, reports):
+            item = {
+                "evidence_id": metadata["evidence_id"],
+                "case_id": metadata.get("case_id"),
+                "filename": metadata.get("filename"),
+                "upload_hash": metadata.get("hash")
+            }
+            if not report:
+                item["status"] = "FILE_MISSING"
+            elif "error" in report:
+                item.update(status="ERROR", error=report["error"])
+            else:
+                result = chain_results[metadata["evidence_id"]]
+                item.update(
+                    status=result["status"],
+                    computed_hash=report["hash"],
+                    matches_upload_hash=report["hash"] == metadata.get("hash"),
+                    size=report["size"],
+                    cached=report["cached"],
+                    provider=result.get("provider"),
+                    details=result.get("details")
+                )
+                if not report["cached"]:
+                    bytes_hashed += report["size"]
+            items.append(item)
+
+        seconds = time.perf_counter() - started
+        counts = {}
+        for item in items:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        report = {
+            "audit_id": str(uuid.uuid4()),
+            "scope": scope,
+            "started_at": started_at,
+            "finished_at": str(datetime.now()),
+            "summary": {
+                "evidence": len(items),
+                "passed": all(item["status"] == "VERIFIED" for item in items),
+                "statuses": counts,
+                "bytes_hashed": bytes_hashed,
+                "seconds": round(seconds, 3),
+                "throughput_mb_s": round(bytes_hashed / (1024 * 1024) / seconds, 1) if seconds > 0 else None
+            },
+            "items": items
+        }
+        return sign_report(report)
+
+def _canonical(report: dict) -> bytes:
+    unsigned = {key: value for key, value in report.items() if key != "signature"}
+    return json.dumps(unsigned, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+def sign_report(report: dict) -> dict:
+    """Signs the report's canonical JSON (EIP-191) with the anchoring account's key."""
+    from eth_account import Account
+    from eth_account.messages import encode_defunct
+    body = _canonical(report)
+    signed = Account.sign_message(encode_defunct(primitive=body), private_key=blockchain.private_key)
+    report["signature"] = {
+        "signer": Account.from_key(blockchain.private_key).address,
+        "report_sha256": hashlib.sha256(body).hexdigest(),
+        "signature": signed.signature.hex()
+    }
+    return report
+
+def verify_report_signature(report: dict) -> bool:
+    """True if the report is unmodified and was signed by the address it names."""
+    from eth_account import Account
+    from eth_account.messages import encode_defunct
+    signature = report.get("signature") or {}
+    try:
+        signer = Account.recover_message(
+            encode_defunct(primitive=_canonical(report)),
+            signature=bytes.fromhex(signature["signature"].removeprefix("0x"))
+        )
+    except Exception:
+        return False
+    return signer == signature.get("signer")
+
+verification = VerificationService()
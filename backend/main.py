@@ -1,9 +1,44 @@
+from contextlib import asynccontextmanager
+import logging
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api.v1.endpoints import cases, evidence, auth
+from app.api.v1.endpoints import cases, evidence, auth, jobs, graph, health
+from app.services.jobs import ai_jobs
+from app.services.conversion import conversion_service
+from app.services.blockchain import blockchain
+from app.services.ingest import resume_interrupted_uploads
+from app.services.registry import registry
+from app.services.loop_monitor import loop_monitor
+from app.services import executors
+from app.services.metrics import metrics
+from app.services.tokens import tokens
 
-app = FastAPI(title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json")
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(name)s - %(message)s")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the external clients in parallel; unless STARTUP_WAIT_FOR_SERVICES is set the app starts
+    # serving straight away and /health/ready reports when each dependency is up.
+    warm = [name.strip() for name in settings.STARTUP_WARM_SERVICES.split(",") if name.strip()]
+    registry.warm(warm, wait=settings.STARTUP_WAIT_FOR_SERVICES)
+    if settings.DOCLING_PREWARM:
+        conversion_service.prewarm()
+    ai_jobs.start()
+    resume_interrupted_uploads()
+    loop_monitor.start()
+    yield
+    loop_monitor.stop()
+    tokens.stop()
+    ai_jobs.stop()
+    conversion_service.shutdown()
+    # Anchor any evidence still waiting for a Merkle batch
+    if registry.started("blockchain"):
+        blockchain.batcher.stop()
+    executors.shutdown()
+
+app = FastAPI(title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json", lifespan=lifespan)
 
 # CORS
 origins = [
@@ -24,7 +59,15 @@ app.add_middleware(
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(evidence.router, prefix=f"{settings.API_V1_STR}/evidence", tags=["evidence"])
 app.include_router(cases.router, prefix=f"{settings.API_V1_STR}/cases", tags=["cases"])
+app.include_router(jobs.router, prefix=f"{settings.API_V1_STR}/jobs", tags=["jobs"])
+app.include_router(graph.router, prefix=f"{settings.API_V1_STR}/graph", tags=["graph"])
+app.include_router(health.router, prefix=f"{settings.API_V1_STR}/health", tags=["health"])
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Digital Evidence Locker API"}
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Prometheus scrape target: per-stage timings, throughput, fallbacks and in-flight work."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
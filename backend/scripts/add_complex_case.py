@@ -176,8 +176,7 @@ def run():
             "id": evidence_id,
             "name": ev["filename"],
             "type": ev["type"],
-            "uploadedAt": uploaded_at_str,
-            "metadata": ev_meta
+            "uploadedAt": uploaded_at_str
         }
         
         evidence_list_wrapped.append(ev_wrapper)
@@ -203,7 +202,8 @@ def run():
         "status": "Charge Sheet Filed",
         "createdAt": datetime.now().isoformat(),
         "updatedAt": datetime.now().isoformat(),
-        "evidence": evidence_list_wrapped,
+        "evidence": evidence_list_wrapped, # Refs only; full metadata is in the evidence table
+        "evidenceCount": len(evidence_list_wrapped),
         "publicAlertEnabled": True,
         "publicAlertMessage": "Red Corner Notice issued for 'The Kingpin'.",
         "contrabandType": "Illegal Arms & Crypto",
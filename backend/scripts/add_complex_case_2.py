@@ -182,8 +182,7 @@ def run():
             "id": evidence_id,
             "name": ev["filename"],
             "type": ev["type"],
-            "uploadedAt": uploaded_at_str,
-            "metadata": ev_meta
+            "uploadedAt": uploaded_at_str
         }
         
         evidence_list_wrapped.append(ev_wrapper)
@@ -209,7 +208,8 @@ def run():
         "status": "Under Investigation",
         "createdAt": datetime.now().isoformat(),
         "updatedAt": datetime.now().isoformat(),
-        "evidence": evidence_list_wrapped,
+        "evidence": evidence_list_wrapped, # Refs only; full metadata is in the evidence table
+        "evidenceCount": len(evidence_list_wrapped),
         "publicAlertEnabled": False,
         "contrabandType": "Source Code & Algorithms",
         "contrabandQuantity": "50 GB"
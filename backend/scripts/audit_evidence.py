@@ -0,0 +1,75 @@
+import sys
+import os
+import json
+import argparse
+from datetime import datetime
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.services.database import db
+from app.services.verification import verification, verify_report_signature
+
+# Integrity audit of one case or the whole locker: every file is re-hashed (in parallel) and
+# checked against one scan of the chain's anchor events, and a signed report is written.
+# Exits non-zero if any evidence fails, so it can run nightly from cron, e.g.:
+#   0 2 * * * cd /srv/divel/backend && python scripts/audit_evidence.py --force
+
+def run_audit(case_ids: list, force: bool, workers: int, output: str) -> bool:
+    if not case_ids:
+        case_ids = [case["id"] for case in db.list_cases()]
+        scope = {"locker": True, "cases": len(case_ids)}
+    elif len(case_ids) == 1:
+        scope = {"case_id": case_ids[0]}
+    else:
+        scope = {"case_ids": case_ids}
+    scope["requested_by"] = "audit_evidence.py"
+
+    evidence_items = []
+    for case_id in case_ids:
+        evidence_items.extend(db.list_case_evidence(case_id))
+    print(f"Auditing {len(evidence_items)} evidence items across {len(case_ids)} cases...")
+
+    report = verification.audit(evidence_items, scope, force=force, workers=workers)
+    summary = report["summary"]
+
+    for item in report["items"]:
+        if item["status"] != "VERIFIED":
+            print(f"❌ {item['evidence_id']} ({item.get('filename')}, case {item.get('case_id')}): {item['status']}")
+
+    output = output or os.path.join(settings.AUDIT_REPORT_DIR, f"audit-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+
+    print(f"Statuses: {summary['statuses']}")
+    print(f"Hashed {summary['bytes_hashed'] / (1024 * 1024):.1f} MB in {summary['seconds']}s ({summary['throughput_mb_s']} MB/s)")
+    print(f"Report signed by {report['signature']['signer']}: {output}")
+    if summary["passed"]:
+        print("✅ All evidence verified")
+    return summary["passed"]
+
+def check_report(path: str) -> bool:
+    with open(path, "r") as f:
+        report = json.load(f)
+    if verify_report_signature(report):
+        print(f"✅ Signature valid, signed by {report['signature']['signer']}")
+        return True
+    print("❌ Signature invalid: report was modified or not signed by the stated address")
+    return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify evidence integrity against the chain and write a signed audit report.")
+    parser.add_argument("--case", action="append", dest="cases", default=[], help="Case id to audit (repeatable); default is the whole locker")
+    parser.add_argument("--force", action="store_true", help="Re-hash every file, ignoring cached hashes of unchanged files")
+    parser.add_argument("--workers", type=int, default=None, help=f"Parallel hashing threads (default {settings.AUDIT_WORKERS})")
+    parser.add_argument("--output", help=f"Report path (default {settings.AUDIT_REPORT_DIR}/audit-<timestamp>.json)")
+    parser.add_argument("--check", metavar="REPORT", help="Only verify the signature of an existing report")
+    args = parser.parse_args()
+
+    if args.check:
+        ok = check_report(args.check)
+    else:
+        ok = run_audit(args.cases, args.force, args.workers, args.output)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,62 @@
+import sys
+import os
+import time
+import asyncio
+from types import SimpleNamespace
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.ai import AIService
+
+# Simulated model latency per generate_content call (seconds)
+STUB_LATENCY = float(os.getenv("STUB_LATENCY", "0.5"))
+ITEMS = int(os.getenv("BENCH_ITEMS", "5"))
+
+class StubModels:
+    """Local stand-in for client.models / client.aio.models that just sleeps."""
+    def generate_content(self, model, contents, config=None):
+        time.sleep(STUB_LATENCY)
+        return self._response(config)
+
+    async def agenerate_content(self, model, contents, config=None):
+        await asyncio.sleep(STUB_LATENCY)
+        return self._response(config)
+
+    def _response(self, config):
+        if config is not None:
+            return SimpleNamespace(text='{"nodes": [{"id": "Stub", "group": "Evidence"}], "links": []}')
+        return SimpleNamespace(text="Relevant. Stub summary.")
+
+def build_stub_client():
+    models = StubModels()
+    return SimpleNamespace(
+        models=models,
+        aio=SimpleNamespace(models=SimpleNamespace(generate_content=models.agenerate_content))
+    )
+
+def run():
+    print(f"⏱️  Benchmarking AI agents against a stub model ({STUB_LATENCY}s per call, {ITEMS} items)")
+    service = AIService(client=build_stub_client())
+    markdown = "# Evidence\nStub content for benchmarking."
+
+    start = time.perf_counter()
+    for _ in range(ITEMS):
+        service._run_detective_agent(markdown)
+        service._run_analyst_agent(markdown)
+    sequential = time.perf_counter() - start
+
+    async def concurrent_run():
+        for _ in range(ITEMS):
+            await service._arun_document_agents(markdown)
+
+    start = time.perf_counter()
+    asyncio.run(concurrent_run())
+    concurrent = time.perf_counter() - start
+
+    print(f"Sequential: {sequential:.2f}s ({sequential / ITEMS:.2f}s per item)")
+    print(f"Concurrent: {concurrent:.2f}s ({concurrent / ITEMS:.2f}s per item)")
+    print(f"Speedup:    {sequential / concurrent:.2f}x")
+
+if __name__ == "__main__":
+    run()
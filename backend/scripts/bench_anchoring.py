@@ -0,0 +1,59 @@
+import sys
+import os
+import time
+import uuid
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.blockchain import blockchain
+
+# Run against a local Hardhat node with the contract deployed:
+#   cd blockchain && npx hardhat node
+#   npx hardhat run scripts/deploy.js --network localhost
+ITEMS = int(os.getenv("BENCH_ITEMS", "50"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "8"))
+
+def anchor_one(i):
+    evidence_id = str(uuid.uuid4())
+    file_hash = hashlib.sha256(f"bench-{i}-{evidence_id}".encode()).hexdigest()
+    tx_hash = blockchain.store_hash_on_chain(
+        case_id="BENCH-CASE",
+        evidence_id=evidence_id,
+        file_hash=file_hash,
+        file_type="application/octet-stream",
+        uploader_role="Polaris"
+    )
+    return evidence_id, tx_hash
+
+def run():
+    if not blockchain.contract:
+        print("❌ No contract attached. Start a Hardhat node and deploy the contract first.")
+        return
+
+    print(f"⛓️  Anchoring {ITEMS} items with {CONCURRENCY} concurrent senders...")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        results = list(pool.map(anchor_one, range(ITEMS)))
+    sent = time.perf_counter() - start
+
+    local = [tx for _, tx in results if tx.startswith("0xLOCAL")]
+    print(f"Sent:      {ITEMS} txs in {sent:.2f}s ({ITEMS / sent:.1f} tx/s), {len(local)} fell back to the local ledger")
+
+    # Wait for the background tracker to see every receipt
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        statuses = [blockchain.get_anchor_status(evidence_id) for evidence_id, _ in results]
+        done = [s for s in statuses if s and s["status"] in ("CONFIRMED", "FAILED")]
+        if len(done) == len(statuses) - len(local):
+            break
+        time.sleep(0.5)
+    confirmed = time.perf_counter() - start
+
+    failed = [s for s in statuses if s and s["status"] == "FAILED"]
+    print(f"Confirmed: {len(done) - len(failed)} in {confirmed:.2f}s ({ITEMS / confirmed:.1f} tx/s), {len(failed)} failed")
+
+if __name__ == "__main__":
+    run()
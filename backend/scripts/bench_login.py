@@ -0,0 +1,67 @@
+import sys
+import os
+import time
+import asyncio
+import statistics
+import httpx
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# Fires a burst of concurrent logins (a shift change) while probing a cheap endpoint,
+# to show login throughput and that other requests keep being served meanwhile.
+# Against a running server:  BENCH_URL=http://localhost:8000 python scripts/bench_login.py
+# Without BENCH_URL the app is benchmarked in-process.
+BENCH_URL = os.getenv("BENCH_URL")
+LOGINS = int(os.getenv("BENCH_LOGINS", "50"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "25"))
+USERNAME = os.getenv("BENCH_USERNAME", "forensics")
+PASSWORD = os.getenv("BENCH_PASSWORD", "forensics123")
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+async def run():
+    if BENCH_URL:
+        client = httpx.AsyncClient(base_url=BENCH_URL, timeout=120)
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+
+    from app.core.config import settings
+    login_url = f"{settings.API_V1_STR}/auth/login"
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    login_times, probe_times = [], []
+    done = asyncio.Event()
+
+    async def login():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(login_url, data={"username": USERNAME, "password": PASSWORD})
+            response.raise_for_status()
+            login_times.append(time.perf_counter() - start)
+
+    async def probe():
+        # Stands in for uploads and case reads arriving during the burst
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/")
+            probe_times.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    async with client:
+        await client.post(login_url, data={"username": USERNAME, "password": PASSWORD}) # Warm-up
+        print(f"🔐 {LOGINS} logins, {CONCURRENCY} concurrent, bcrypt rounds {settings.BCRYPT_ROUNDS}...")
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(LOGINS)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+
+    print(f"Logins:  {LOGINS / elapsed:.1f}/s, p50 {statistics.median(login_times) * 1000:.0f} ms, p95 {percentile(login_times, 0.95) * 1000:.0f} ms")
+    print(f"Probes during burst: {len(probe_times)}, p50 {statistics.median(probe_times) * 1000:.1f} ms, max {max(probe_times) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    asyncio.run(run())
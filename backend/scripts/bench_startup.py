@@ -0,0 +1,55 @@
+import sys
+import os
+import json
+import subprocess
+import statistics
+
+# Cold-start benchmark: each run is a fresh interpreter, as for a new autoscaled worker.
+# Measures importing the app, the lifespan startup, the first served request, and the time
+# until /health/ready passes, plus how long each service took to build.
+RUNS = int(os.getenv("BENCH_RUNS", "5"))
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+PROBE = r"""
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.services.registry import registry
+with TestClient(main.app) as client:
+    started = time.perf_counter()
+    client.get("/api/v1/health/live")
+    first_request = time.perf_counter()
+    while client.get("/api/v1/health/ready").status_code != 200 and time.perf_counter() - start < 120:
+        time.sleep(0.01)
+    ready = time.perf_counter()
+    services = {name: state["init_seconds"] for name, state in registry.readiness()["services"].items()}
+print("BENCH " + json.dumps({
+    "import": imported - start, "startup": started - imported,
+    "first_request": first_request - start, "ready": ready - start, "services": services
+}))
+"""
+
+def run_once() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=300
+    ).stdout
+    for line in output.splitlines():
+        if line.startswith("BENCH "):
+            return json.loads(line[len("BENCH "):])
+    raise RuntimeError(f"Benchmark run failed:\n{output}")
+
+def run():
+    print(f"🚀 Measuring {RUNS} cold starts...")
+    results = [run_once() for _ in range(RUNS)]
+    for key, label in (("import", "Import app"), ("startup", "Lifespan startup"), ("first_request", "First request"), ("ready", "Ready (all critical)")):
+        values = [r[key] * 1000 for r in results]
+        print(f"{label:22} median {statistics.median(values):8.1f} ms   max {max(values):8.1f} ms")
+    print("Service build times (median):")
+    for name in results[0]["services"]:
+        times = [r["services"][name] for r in results if r["services"].get(name) is not None]
+        print(f"  {name:12} {statistics.median(times) * 1000:8.1f} ms" if times else f"  {name:12}   (lazy, not built)")
+
+if __name__ == "__main__":
+    run()
@@ -162,13 +162,15 @@ def run():
     # 2. Restore Proper Case
     print("♻️ Restoring CR-CYBER-2025-001...")
     seed_case = json.loads(SEED_CASE_JSON)
-    cases_table.put_item(Item=seed_case)
     
-    # Restore evidence metadata to evidence table as well
+    # Evidence metadata goes to the evidence table; the case keeps only refs
     for ev in seed_case['evidence']:
-        meta = ev['metadata']
+        meta = ev.pop('metadata')
+        ev.setdefault('id', meta['evidence_id'])
         # Ensure Types are compatible
         evidence_table.put_item(Item=meta)
+    seed_case['evidenceCount'] = len(seed_case['evidence'])
+    cases_table.put_item(Item=seed_case)
 
     # 3. Create New Rich Cases
     print("✨ Creating New Rich Cases...")
@@ -272,8 +274,7 @@ def run():
                     "id": evidence_id,
                     "name": ev_def["filename"],
                     "type": ev_def["type"],
-                    "uploadedAt": uploaded_at_str,
-                    "metadata": ev_meta
+                    "uploadedAt": uploaded_at_str
                 }
                 
                 evidence_list_wrapped.append(ev_wrapper)
@@ -298,7 +299,8 @@ def run():
                 "status": case_def["status"],
                 "createdAt": datetime.now().isoformat(),
                 "updatedAt": datetime.now().isoformat(),
-                "evidence": evidence_list_wrapped,  # USING WRAPPED LIST
+                "evidence": evidence_list_wrapped,  # Refs only; full metadata is in the evidence table
+                "evidenceCount": len(evidence_list_wrapped),
                 "publicAlertEnabled": True,
                 "publicAlertMessage": f"Alert regarding {case_def['description'][:50]}..."
             }
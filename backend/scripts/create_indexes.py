@@ -0,0 +1,12 @@
+import sys
+import os
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.database import db
+
+if __name__ == "__main__":
+    print("Creating missing tables and secondary indexes...")
+    db.ensure_schema()
+    print("✅ Schema ready.")
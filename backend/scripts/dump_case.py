@@ -1,6 +1,5 @@
 import sys
 import os
-import boto3
 import json
 from decimal import Decimal
 
@@ -11,22 +10,13 @@ class DecimalEncoder(json.JSONEncoder):
         return super(DecimalEncoder, self).default(obj)
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from app.core.config import settings
+from app.services.database import db
 
 def dump_case(case_number):
-    dynamodb = boto3.resource(
-        'dynamodb',
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_REGION
-    )
-    table = dynamodb.Table(settings.DYNAMODB_TABLE_CASES)
-    response = table.scan(
-        FilterExpression=boto3.dynamodb.conditions.Attr('caseNumber').eq(case_number)
-    )
-    items = response['Items']
-    if items:
-        print(json.dumps(items[0], cls=DecimalEncoder, indent=2))
+    # caseNumber index lookup, no table scan
+    case = db.get_case_by_number(case_number)
+    if case:
+        print(json.dumps(case, cls=DecimalEncoder, indent=2))
     else:
         print("Case not found")
 
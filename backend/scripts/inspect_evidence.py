@@ -1,6 +1,5 @@
 import sys
 import os
-import boto3
 import json
 from decimal import Decimal
 
@@ -14,32 +13,18 @@ class DecimalEncoder(json.JSONEncoder):
 # Add backend directory to sys.path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from app.core.config import settings
+from app.services.database import db
 
 def inspect_evidence(case_number=None):
     print(f"Inspecting evidence for Case Number: {case_number}")
     
     try:
-        dynamodb = boto3.resource(
-            'dynamodb',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
-        
-        cases_table = dynamodb.Table(settings.DYNAMODB_TABLE_CASES)
-        
-        # 1. Find the case by CaseNumber
-        scan_response = cases_table.scan(
-            FilterExpression=boto3.dynamodb.conditions.Attr('caseNumber').eq(case_number)
-        )
-        
-        items = scan_response['Items']
-        if not items:
+        # 1. Find the case by CaseNumber (caseNumber index, evidence hydrated from the evidence table)
+        case = db.get_case_by_number(case_number)
+        if not case:
             print(f"❌ Case {case_number} not found.")
             return
 
-        case = items[0]
         print(f"✅ Found Case ID: {case['id']}")
         
         evidence_list = case.get('evidence', [])
@@ -0,0 +1,36 @@
+import sys
+import os
+import argparse
+import getpass
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core import security
+from app.services.users import users
+
+ROLES = ["Polaris", "Forensics", "Judge"]
+
+def add_user(username: str, role: str, password: str = None):
+    password = password or getpass.getpass(f"Password for {username}: ")
+    users.upsert(username, security.get_password_hash(password), role)
+    print(f"✅ Saved {username} ({role})")
+
+def list_users():
+    for user in users.list_users():
+        print(f"- {user['username']}: {user['role']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage locker user accounts.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="Create a user or reset their password/role")
+    add.add_argument("username")
+    add.add_argument("role", choices=ROLES)
+    add.add_argument("--password", help="Prompted for if omitted")
+    sub.add_parser("list", help="List users and roles")
+    args = parser.parse_args()
+
+    if args.command == "add":
+        add_user(args.username, args.role, args.password)
+    else:
+        list_users()
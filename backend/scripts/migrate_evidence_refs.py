@@ -0,0 +1,67 @@
+import sys
+import os
+import argparse
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.database import db, evidence_ref
+
+def split_case_evidence(case: dict):
+    """
+    Returns (full evidence records, lightweight refs) for a case.
+    Handles both the wrapper shape ({id, name, type, uploadedAt, metadata})
+    and flat metadata entries written by older seed scripts.
+    """
+    records = []
+    refs = []
+    for ev in case.get("evidence", []):
+        metadata = ev.get("metadata") if "metadata" in ev else (ev if "evidence_id" in ev else None)
+        if metadata is None:
+            refs.append(ev) # Already a ref
+            continue
+        metadata = {**metadata, "case_id": case["id"]}
+        metadata.setdefault("evidence_id", ev.get("id"))
+        records.append(metadata)
+        ref = evidence_ref(metadata)
+        # Keep the names the case was displayed with
+        for key in ("name", "type", "uploadedAt"):
+            if ev.get(key):
+                ref[key] = ev[key]
+        refs.append(ref)
+    return records, refs
+
+def migrate(dry_run: bool = False):
+    print("🚚 Migrating embedded case evidence to the evidence table...")
+    if not dry_run:
+        db.ensure_schema()
+
+    migrated = 0
+    moved = 0
+    for case in db.list_cases():
+        records, refs = split_case_evidence(case)
+        if not records:
+            continue
+        print(f"  -> {case.get('caseNumber', case['id'])}: {len(records)} evidence records")
+        if dry_run:
+            continue
+        # Evidence first, so the case never points at refs without records
+        for metadata in records:
+            existing = db.get_evidence_metadata(metadata["evidence_id"]) or {}
+            db.store_evidence_metadata({**metadata, **existing})
+        case["evidence"] = refs
+        case["evidenceCount"] = len(refs)
+        db.save_case(case)
+        migrated += 1
+        moved += len(records)
+
+    if dry_run:
+        print("Dry run, nothing written.")
+    else:
+        print(f"✅ Migrated {migrated} cases ({moved} evidence records).")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replace embedded case evidence with refs; full records move to the evidence table.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    args = parser.parse_args()
+    migrate(dry_run=args.dry_run)
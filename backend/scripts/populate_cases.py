@@ -191,8 +191,14 @@ def populate_cases_with_evidence():
                         "knowledge_graph": generate_knowledge_graph(case_def['meta']['type'], ev_def['graph_entities'])
                     }
                     
-                    # Add to Case's specific evidence list
-                    case_item["evidence"].append(ev_meta)
+                    # Add a lightweight ref to the case; full metadata lives in the evidence table
+                    case_item["evidence"].append({
+                        "id": evidence_id,
+                        "name": ev_def["filename"],
+                        "type": "document" if ev_def["filename"].endswith("pdf") else "image",
+                        "uploadedAt": ev_meta["uploaded_at"]
+                    })
+                    case_item["evidenceCount"] = len(case_item["evidence"])
                     
                     # Insert into independent Evidence Table
                     evidence_table.put_item(Item=ev_meta)
@@ -0,0 +1,15 @@
+import sys
+import os
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.database import db
+
+if __name__ == "__main__":
+    # Needed once for cases written before the aggregates existed (e.g. by the seed scripts)
+    print("Rebuilding per-district geo aggregates...")
+    db.ensure_schema()
+    cases = db.list_cases()
+    db.rebuild_geo_stats(cases)
+    print(f"✅ Aggregated {len(cases)} cases into {len(db.get_geo_stats())} districts.")
@@ -0,0 +1,19 @@
+import sys
+import os
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.database import db
+from app.services.graph_index import graph_index
+
+if __name__ == "__main__":
+    # New AI results are indexed by the job workers; this backfills evidence analysed before that
+    print("🕸️ Rebuilding cross-case knowledge graph index...")
+    indexed = 0
+    for case in db.list_cases():
+        for metadata in db.list_case_evidence(case["id"]):
+            if metadata.get("knowledge_graph"):
+                graph_index.index_evidence(case["id"], metadata["evidence_id"], metadata["knowledge_graph"])
+                indexed += 1
+    print(f"✅ Indexed {indexed} evidence graphs: {graph_index.stats()}")
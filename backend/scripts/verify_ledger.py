@@ -0,0 +1,20 @@
+import sys
+import os
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.services.ledger import LocalLedger
+
+def verify_ledger():
+    print(f"Verifying local ledger hash chain: {settings.LOCAL_LEDGER_DB}")
+    ledger = LocalLedger(settings.LOCAL_LEDGER_DB)
+    result = ledger.verify_chain()
+    if result["valid"]:
+        print(f"✅ Chain intact: {result['entries_checked']} entries, head {result['head']}")
+    else:
+        print(f"❌ Chain broken at entry #{result['broken_at_seq']} (after {result['entries_checked']} valid entries)")
+
+if __name__ == "__main__":
+    verify_ledger()
@@ -0,0 +1,136 @@
+import json
+import os
+import sys
+import tempfile
+
+# Every database, spool and cache the app writes goes to a throwaway directory.
+# This has to happen before app.core.config is imported, since settings are read once.
+STATE_DIR = tempfile.mkdtemp(prefix="evidence-locker-tests-")
+os.environ.update({
+    "DATABASE_BACKEND": "local",
+    "AWS_ACCESS_KEY_ID": "",
+    "LOCAL_DB_PATH": os.path.join(STATE_DIR, "local_db.sqlite3"),
+    "UPLOAD_STATE_DB": os.path.join(STATE_DIR, "uploads.sqlite3"),
+    "UPLOAD_SPOOL_DIR": os.path.join(STATE_DIR, "spool"),
+    "VERIFY_CACHE_DB": os.path.join(STATE_DIR, "verification_cache.sqlite3"),
+    "LOCAL_LEDGER_DB": os.path.join(STATE_DIR, "local_ledger.sqlite3"),
+    "AI_JOBS_DB": os.path.join(STATE_DIR, "ai_jobs.sqlite3"),
+    "AI_CACHE_DIR": os.path.join(STATE_DIR, "ai_cache"),
+    "GRAPH_INDEX_DB": os.path.join(STATE_DIR, "graph_index.sqlite3"),
+    "AUDIT_REPORT_DIR": os.path.join(STATE_DIR, "audit_reports"),
+    "TOKEN_REVOCATION_DB": os.path.join(STATE_DIR, "revoked_tokens.sqlite3"),
+    "USER_STORE_DB": os.path.join(STATE_DIR, "users.sqlite3"),
+    "BCRYPT_ROUNDS": "4",
+    "BLOCKCHAIN_RECEIPT_POLL_SECONDS": "0.1",
+})
+os.makedirs(os.environ["UPLOAD_SPOOL_DIR"], exist_ok=True)
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Local storage and the legacy ledger use paths relative to the working directory
+os.chdir(STATE_DIR)
+
+import pytest
+
+ARTIFACT_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "../../blockchain/artifacts/contracts/EvidenceRegistry.sol/EvidenceRegistry.json"
+))
+
+# The compiled artifact predates anchorBatch, and solc is not available to rebuild it here.
+# _batch_emitter_bytecode builds a minimal contract that only emits BatchAnchored(root, itemCount, msg.sender)
+# for any call, laid out like EvidenceRegistry.anchorBatch(bytes32,uint256).
+BATCH_ABI = [
+    {
+        "type": "event",
+        "name": "BatchAnchored",
+        "anonymous": False,
+        "inputs": [
+            {"name": "merkleRoot", "type": "bytes32", "indexed": True},
+            {"name": "itemCount", "type": "uint256", "indexed": False},
+            {"name": "anchoredBy", "type": "address", "indexed": True},
+        ],
+    },
+    {
+        "type": "function",
+        "name": "anchorBatch",
+        "stateMutability": "nonpayable",
+        "inputs": [{"name": "merkleRoot", "type": "bytes32"}, {"name": "itemCount", "type": "uint256"}],
+        "outputs": [],
+    },
+]
+
+def _batch_emitter_bytecode(w3) -> str:
+    topic = w3.keccak(text="BatchAnchored(bytes32,uint256,address)").hex().removeprefix("0x")
+    runtime = (
+        "602435" "600052" # mstore(0, calldataload(36)): itemCount is the log data
+        "33" "600435" # topics: msg.sender, calldataload(4) (merkleRoot)
+        "7f" + topic + # event signature
+        "60206000" "a3" "00" # log3(0, 32, ...); stop
+    )
+    length = len(runtime) // 2
+    # Constructor: copy the runtime code to memory and return it
+    init = f"60{length:02x}600c60003960{length:02x}6000f3"
+    return "0x" + init + runtime
+
+def _deploy(w3, abi, bytecode):
+    contract = w3.eth.contract(abi=abi, bytecode=bytecode)
+    receipt = w3.eth.wait_for_transaction_receipt(contract.constructor().transact({"from": w3.eth.accounts[0]}))
+    return w3.eth.contract(address=receipt.contractAddress, abi=abi), receipt.blockNumber
+
+@pytest.fixture
+def w3():
+    from web3 import Web3, EthereumTesterProvider
+    return Web3(EthereumTesterProvider())
+
+def _attach(service, w3, contract, deploy_block):
+    """Points a BlockchainService at the in-memory test chain instead of the Hardhat node."""
+    service.health.stop()
+    service.health.available = lambda: True
+    service.w3 = w3
+    service.contract = contract
+    service.contract_address = contract.address
+    service.deploy_block = deploy_block
+    service.anchor.w3 = w3
+    service.anchor.chain_id = w3.eth.chain_id
+    # The service signs as Hardhat account #0; fund it on the test chain
+    w3.eth.send_transaction({"from": w3.eth.accounts[0], "to": service.account_address, "value": w3.to_wei(10, "ether")})
+    return service
+
+@pytest.fixture
+def chain(w3, tmp_path, monkeypatch):
+    """A BlockchainService anchoring to the deployed EvidenceRegistry artifact (single mode)."""
+    from app.core.config import settings
+    from app.services.blockchain import BlockchainService
+
+    monkeypatch.setattr(settings, "LOCAL_LEDGER_DB", str(tmp_path / "ledger.sqlite3"))
+    with open(ARTIFACT_PATH) as f:
+        artifact = json.load(f)
+    contract, deploy_block = _deploy(w3, artifact["abi"], artifact["bytecode"])
+    service = _attach(BlockchainService(), w3, contract, deploy_block)
+    yield service
+    service.anchor.stop()
+
+@pytest.fixture
+def batch_chain(w3, tmp_path, monkeypatch):
+    """A BlockchainService in batch mode, anchoring Merkle roots to the BatchAnchored emitter."""
+    from app.core.config import settings
+    from app.services.blockchain import BlockchainService
+
+    monkeypatch.setattr(settings, "LOCAL_LEDGER_DB", str(tmp_path / "ledger.sqlite3"))
+    monkeypatch.setattr(settings, "BLOCKCHAIN_ANCHOR_MODE", "batch")
+    monkeypatch.setattr(settings, "BLOCKCHAIN_BATCH_INTERVAL_SECONDS", 3600.0)
+    with open(ARTIFACT_PATH) as f:
+        artifact = json.load(f)
+    # Bound with the full ABI so the EvidenceAnchored scans of verify_many work too (they find nothing)
+    contract, deploy_block = _deploy(w3, artifact["abi"] + BATCH_ABI, _batch_emitter_bytecode(w3))
+    service = _attach(BlockchainService(), w3, contract, deploy_block)
+    yield service
+    service.batcher._running = False
+    service.batcher._wakeup.set()
+    service.anchor.stop()
+
+@pytest.fixture
+def client():
+    """Test client for the API; the lifespan warm-up (AI workers, transfer resume) is not run."""
+    from fastapi.testclient import TestClient
+    from main import app
+    return TestClient(app)
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from app.core import security
+from app.core.config import settings
+from app.services import jobs
+from app.services.database import db
+
+class FlakyAI:
+    """Fails the first `failures` calls, then returns a summary."""
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    def generate_summary(self, file_path: str, file_hash: str = None) -> dict:
+        self.calls += 1
+        if self.calls <= self.failures:
+            return {"error": f"model unavailable ({self.calls})"}
+        return {"summary": "A short summary.", "graph": {"nodes": [], "edges": []}}
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "AI_JOBS_DB", str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(settings, "AI_WORKER_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "AI_JOB_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "AI_JOB_RETRY_BACKOFF_SECONDS", 0.1)
+    queue = jobs.AIJobQueue()
+    yield queue
+    queue.stop()
+
+def _job(queue, tmp_path, evidence_id: str) -> dict:
+    spool_path = tmp_path / f"{evidence_id}.txt"
+    spool_path.write_text("evidence text")
+    db.store_evidence_metadata({"evidence_id": evidence_id, "case_id": "case-jobs", "hash": "00", "ai_status": "pending"})
+    return queue.enqueue(evidence_id, "case-jobs", str(spool_path))
+
+def _wait_for(queue, job_id: str, status: str) -> dict:
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        job = queue.get_job(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.05)
+    pytest.fail(f"job {job_id} is {queue.get_job(job_id)['status']}, expected {status}")
+
+def test_failed_attempts_are_retried_with_backoff(queue, tmp_path, monkeypatch):
+    ai = FlakyAI(failures=2)
+    monkeypatch.setattr(jobs, "ai_service", ai)
+    job = _job(queue, tmp_path, "ev-job-retry")
+
+    started = time.time()
+    queue.start()
+    job = _wait_for(queue, job["job_id"], "completed")
+
+    assert job["attempts"] == 3
+    assert ai.calls == 3
+    # Delays of 0.1s and 0.2s between the attempts
+    assert time.time() - started >= 0.3
+    assert db.get_evidence_metadata("ev-job-retry")["ai_status"] == "completed"
+
+def test_job_fails_after_max_attempts_and_can_be_retried(queue, tmp_path, monkeypatch):
+    ai = FlakyAI(failures=3)
+    monkeypatch.setattr(jobs, "ai_service", ai)
+    job = _job(queue, tmp_path, "ev-job-failed")
+
+    queue.start()
+    failed = _wait_for(queue, job["job_id"], "failed")
+    assert failed["attempts"] == 3
+    assert "model unavailable (3)" in failed["error"]
+    assert db.get_evidence_metadata("ev-job-failed")["ai_status"] == "failed"
+
+    assert queue.retry(job["job_id"])["status"] == "queued"
+    _wait_for(queue, job["job_id"], "completed")
+    assert db.get_evidence_metadata("ev-job-failed")["ai_status"] == "completed"
+    # Only failed jobs can be retried
+    assert queue.retry(job["job_id"]) is None
+
+def test_batch_proof_survives_the_ai_update(queue, batch_chain, tmp_path, monkeypatch):
+    class BatchLandsAfterEveryRead:
+        """The worker's database, with the batch anchored right after each record the worker reads."""
+        def __getattr__(self, name):
+            return getattr(db, name)
+
+        def get_evidence_metadata(self, evidence_id):
+            record = db.get_evidence_metadata(evidence_id)
+            batch_chain.batcher.flush()
+            return record
+    monkeypatch.setattr(jobs, "db", BatchLandsAfterEveryRead())
+    monkeypatch.setattr(jobs, "ai_service", FlakyAI(failures=0))
+    job = _job(queue, tmp_path, "ev-job-batch")
+    batch_chain.store_hash_on_chain("case-jobs", "ev-job-batch", "00", "text/plain", "Forensics")
+
+    queue.start()
+    _wait_for(queue, job["job_id"], "completed")
+
+    record = db.get_evidence_metadata("ev-job-batch")
+    assert record["anchor_mode"] == "merkle_batch"
+    assert record["merkle_proof"] is not None
+    assert record["ai_status"] == "completed"
+    assert record["ai_summary"] == "A short summary."
+
+@pytest.mark.parametrize("path", ["/api/v1/jobs/", "/api/v1/jobs/cache/stats", "/api/v1/jobs/some-job"])
+def test_job_endpoints_require_a_token(client, path):
+    assert client.get(path).status_code == 401
+    token = security.create_access_token("forensics", "Forensics")
+    assert client.get(path, headers={"Authorization": f"Bearer {token}"}).status_code in (200, 404)
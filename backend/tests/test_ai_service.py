@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services.ai import AIService
+
+class LoopBoundClient:
+    """
+    Stub genai.Client whose client.aio, like google-genai's shared AsyncHttpxClient,
+    only works on the event loop that first used it.
+    """
+    def __init__(self):
+        self.loop = None
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.aio = SimpleNamespace(
+            files=SimpleNamespace(upload=self._upload),
+            models=SimpleNamespace(generate_content=self._generate_content)
+        )
+
+    def _check_loop(self):
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            self.loop = self.loop or loop
+            self.calls += 1
+        if self.loop.is_closed():
+            raise RuntimeError("Event loop is closed")
+        if loop is not self.loop:
+            raise RuntimeError("bound to a different event loop")
+
+    async def _upload(self, path):
+        self._check_loop()
+        return SimpleNamespace(name=path)
+
+    async def _generate_content(self, model, contents, config=None):
+        self._check_loop()
+        await asyncio.sleep(0.05)
+        if config is not None:
+            return SimpleNamespace(text='{"nodes": [{"id": "Stub", "group": "Evidence"}], "links": []}')
+        return SimpleNamespace(text="Relevant. Stub summary.")
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "AI_CONCURRENT_AGENTS", True)
+    monkeypatch.setattr(settings, "AI_CACHE_ENABLED", False)
+    client = LoopBoundClient()
+    image = tmp_path / "photo.png"
+    image.write_bytes(b"not really a png")
+    return AIService(client=client), client, str(image)
+
+def test_sequential_jobs_share_the_agent_loop(service):
+    ai, client, image = service
+    for _ in range(2):
+        result = ai.generate_summary(image)
+        assert "error" not in result
+        assert result["summary"] == "Relevant. Stub summary."
+    assert client.calls == 6
+
+def test_concurrent_jobs_share_the_agent_loop(service):
+    ai, client, image = service
+    results = [None, None]
+    def job(index):
+        results[index] = ai.generate_summary(image)
+    workers = [threading.Thread(target=job, args=(i,)) for i in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=10)
+
+    assert all(result and "error" not in result for result in results)
+    assert results[0]["graph"]["nodes"] == [{"id": "Stub", "group": "Evidence"}]
+    assert client.calls == 6
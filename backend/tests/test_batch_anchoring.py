@@ -0,0 +1,149 @@
+from app.services import merkle
+from app.services.batching import BatchAnchorer
+from app.services.database import db
+
+def _evidence(service, evidence_id: str, file_hash: str, case_id: str = "case-batch"):
+    db.store_evidence_metadata({
+        "evidence_id": evidence_id,
+        "case_id": case_id,
+        "hash": file_hash,
+        "tx_hash": "BATCH_PENDING"
+    })
+    return service.store_hash_on_chain(case_id, evidence_id, file_hash, "pdf", "Forensics")
+
+def test_batch_proof_is_written_to_the_evidence_record(batch_chain):
+    items = {f"ev-batch-{i}": f"{i:064x}" for i in range(5)}
+    for evidence_id, file_hash in items.items():
+        assert _evidence(batch_chain, evidence_id, file_hash) == "BATCH_PENDING"
+
+    assert batch_chain.batcher.flush() == 5
+
+    roots = set()
+    for evidence_id, file_hash in items.items():
+        record = db.get_evidence_metadata(evidence_id)
+        assert record["anchor_mode"] == "merkle_batch"
+        assert record["tx_hash"].startswith("0x")
+        assert record["batch_size"] == 5
+        leaf = merkle.leaf_hash(evidence_id, file_hash)
+        assert merkle.verify_proof(leaf, record["merkle_proof"], bytes.fromhex(record["merkle_root"][2:]))
+        roots.add(record["merkle_root"])
+    assert len(roots) == 1
+
+def test_pending_items_survive_a_restart(batch_chain):
+    _evidence(batch_chain, "ev-restart", "ab" * 32)
+
+    # A new anchorer (as after a crash) reloads the queued item from the ledger database
+    restarted = BatchAnchorer(batch_chain)
+    restarted._running = False
+    restarted._wakeup.set()
+    assert [entry["evidence_id"] for _, entry, _ in restarted._pending] == ["ev-restart"]
+
+    assert restarted.flush() == 1
+    assert db.get_evidence_metadata("ev-restart")["anchor_mode"] == "merkle_batch"
+    assert BatchAnchorer(batch_chain)._pending == []
+
+def test_stop_drains_every_batch(batch_chain):
+    batch_chain.batcher.batch_size = 2
+    for i in range(5):
+        _evidence(batch_chain, f"ev-drain-{i}", f"{i + 100:064x}")
+
+    batch_chain.batcher.stop()
+
+    assert batch_chain.batcher._pending == []
+    for i in range(5):
+        assert db.get_evidence_metadata(f"ev-drain-{i}")["anchor_mode"] == "merkle_batch"
+
+def test_failed_batch_falls_back_to_the_ledger(batch_chain):
+    _evidence(batch_chain, "ev-no-contract", "cd" * 32)
+    # The contract is swapped for one without anchorBatch: the batch transaction cannot even be built
+    batch_chain.contract = batch_chain.w3.eth.contract(address=batch_chain.contract_address, abi=[])
+
+    batch_chain.batcher.flush()
+
+    record = db.get_evidence_metadata("ev-no-contract")
+    assert record["anchor_mode"] == "local_ledger"
+    assert batch_chain.ledger.get("ev-no-contract")["hash"] == "cd" * 32
+
+def _rebatch_after_crash(batch_chain, evidence_id: str, file_hash: str):
+    """Anchors an item, then queues it again as if the process died before dequeuing it."""
+    _evidence(batch_chain, evidence_id, file_hash)
+    batch_chain.batcher.flush()
+    first_tx = db.get_evidence_metadata(evidence_id)["tx_hash"]
+    batch_chain.batcher.add(batch_chain._ledger_entry("case-batch", evidence_id, file_hash, "pdf", "Forensics", ""))
+    return first_tx
+
+def test_already_anchored_batch_revert_is_a_success(batch_chain, monkeypatch):
+    first_tx = _rebatch_after_crash(batch_chain, "ev-rebatched", "ab" * 32)
+    def send(contract_call, evidence_id, on_failure=None):
+        # What the node returns for EvidenceRegistry.anchorBatch with a known root
+        raise ValueError("execution reverted: Batch already anchored")
+    monkeypatch.setattr(batch_chain.anchor, "send", send)
+
+    assert batch_chain.batcher.flush() == 1
+
+    record = db.get_evidence_metadata("ev-rebatched")
+    assert record["anchor_mode"] == "merkle_batch"
+    assert record["tx_hash"] == first_tx
+    assert batch_chain.ledger.get("ev-rebatched") is None
+
+def test_reverted_batch_points_at_the_earlier_anchor(batch_chain, monkeypatch):
+    first_tx = _rebatch_after_crash(batch_chain, "ev-reverted", "ba" * 32)
+    failure_handlers = []
+    def send(contract_call, evidence_id, on_failure=None):
+        # Accepted by the node, reverted once mined
+        failure_handlers.append(on_failure)
+        return "0x" + "00" * 32
+    monkeypatch.setattr(batch_chain.anchor, "send", send)
+    batch_chain.batcher.flush()
+
+    [on_failure] = failure_handlers
+    on_failure()
+
+    assert db.get_evidence_metadata("ev-reverted")["tx_hash"] == first_tx
+    assert batch_chain.ledger.get("ev-reverted") is None
+
+def test_contract_without_anchor_batch_anchors_single_items(chain, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "BLOCKCHAIN_ANCHOR_MODE", "batch")
+    # The chain fixture's contract is the shipped artifact, which predates anchorBatch
+    chain.anchor_mode = "batch"
+    assert not chain._batch_supported()
+
+    tx_hash = chain.store_hash_on_chain("case-batch", "ev-single-fallback", "ee" * 32, "pdf", "Forensics")
+
+    assert tx_hash.startswith("0x") and tx_hash != "BATCH_PENDING"
+    assert chain.batcher._pending == []
+    assert chain.ledger.get("ev-single-fallback") is None
+
+def test_verify_many_checks_batch_roots_from_the_logs(batch_chain, monkeypatch):
+    from app.core.config import settings
+    # Several eth_getLogs windows
+    monkeypatch.setattr(settings, "BLOCKCHAIN_LOG_BLOCK_RANGE", 1)
+    items = {f"ev-verify-{i}": f"{i + 200:064x}" for i in range(3)}
+    for evidence_id, file_hash in items.items():
+        _evidence(batch_chain, evidence_id, file_hash)
+    batch_chain.batcher.flush()
+    # Anchored after the batch: another root in a later block
+    _evidence(batch_chain, "ev-verify-later", "ef" * 32)
+    batch_chain.batcher.flush()
+
+    records = {evidence_id: db.get_evidence_metadata(evidence_id) for evidence_id in [*items, "ev-verify-later"]}
+    assert batch_chain._scan_batch_roots() == {record["merkle_root"] for record in records.values()}
+
+    def request(evidence_id, computed_hash, record):
+        return {"evidence_id": evidence_id, "computed_hash": computed_hash, "merkle_anchor": {
+            "merkle_root": record["merkle_root"], "merkle_proof": record["merkle_proof"]
+        }}
+    results = batch_chain.verify_many([
+        request("ev-verify-0", items["ev-verify-0"], records["ev-verify-0"]),
+        request("ev-verify-1", "00" * 32, records["ev-verify-1"]),
+        request("ev-verify-later", "ef" * 32, records["ev-verify-later"]),
+        # A root that was never anchored, and nothing in the ledger either
+        request("ev-verify-2", items["ev-verify-2"], {"merkle_root": "0x" + "11" * 32, "merkle_proof": []}),
+    ])
+    assert {evidence_id: result["status"] for evidence_id, result in results.items()} == {
+        "ev-verify-0": "VERIFIED",
+        "ev-verify-1": "TAMPERED",
+        "ev-verify-later": "VERIFIED",
+        "ev-verify-2": "NOT_FOUND_ON_CHAIN",
+    }
@@ -0,0 +1,51 @@
+import base64
+import json
+
+import pytest
+
+from app.services.database import db, encode_cursor
+
+CASES_URL = "/api/v1/cases/"
+
+@pytest.fixture(scope="module", autouse=True)
+def cases():
+    for i in range(7):
+        db.create_case({
+            "id": f"page-case-{i}",
+            "caseNumber": f"PAGE/{i}",
+            "district": "Paging" if i % 2 else "Other",
+            "status": "Open"
+        })
+
+def _page_cases(client, **params):
+    ids, cursor = [], None
+    while True:
+        response = client.get(CASES_URL, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        page = response.json()
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+
+def test_pages_cover_every_case_once(client):
+    ids = [case_id for case_id in _page_cases(client, limit=2) if case_id.startswith("page-case-")]
+    assert ids == [f"page-case-{i}" for i in range(7)]
+
+def test_filters_and_projection_apply_across_pages(client):
+    response = client.get(CASES_URL, params={"limit": 1, "district": "Paging", "fields": "caseNumber"})
+    page = response.json()
+    assert page["items"] == [{"id": "page-case-1", "caseNumber": "PAGE/1"}]
+    assert _page_cases(client, limit=1, district="Paging") == ["page-case-1", "page-case-3", "page-case-5"]
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"[1, 2]").decode(),
+    base64.urlsafe_b64encode(json.dumps({"id": 5}).encode()).decode(),
+    encode_cursor({"key": "page-case-1"}),
+    encode_cursor({"id": "page-case-1", "extra": True}),
+])
+def test_malformed_cursor_is_rejected(client, cursor):
+    response = client.get(CASES_URL, params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,36 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.core.config import settings
+from app.services.database import DynamoDBRepository
+
+@pytest.fixture
+def dynamo(monkeypatch):
+    monkeypatch.setattr(settings, "AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setattr(settings, "AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setattr(settings, "AWS_REGION", "us-east-1")
+    with mock_aws():
+        boto3.client("dynamodb", region_name="us-east-1").create_table(
+            TableName=settings.DYNAMODB_TABLE_CASES,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        yield DynamoDBRepository()
+
+CASE = {"id": "dyn-case-1", "caseNumber": "DYN/1", "district": "Kollam", "status": "Open"}
+
+def test_create_case_without_stats_table(dynamo, caplog):
+    assert dynamo.create_case(dict(CASE)) == CASE
+    assert dynamo.get_case("dyn-case-1")["caseNumber"] == "DYN/1"
+    assert "not found" in caplog.text
+    assert dynamo.get_geo_stats() == []
+
+def test_create_case_updates_stats(dynamo):
+    dynamo._ensure_stats_table()
+    dynamo.create_case(dict(CASE))
+    dynamo.create_case({**CASE, "id": "dyn-case-2"})
+    [district] = dynamo.get_geo_stats()
+    assert district["district"] == "Kollam"
+    assert district["count"] == 2
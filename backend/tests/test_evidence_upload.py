@@ -0,0 +1,48 @@
+import pytest
+
+from app.services.database import db
+from app.services.registry import registry
+from app.services.transfers import transfers
+
+UPLOAD_URL = "/api/v1/evidence/upload"
+
+@pytest.fixture
+def uploads_to(monkeypatch):
+    """Routes the upload endpoint's blockchain service to the given test service."""
+    def use(service):
+        monkeypatch.setitem(registry._services["blockchain"], "instance", service)
+        return service
+    return use
+
+def _upload(client, name: str, body: bytes, case_id: str = "case-upload"):
+    response = client.post(UPLOAD_URL, data={"case_id": case_id}, files={"file": (name, body, "text/plain")})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_single_mode_records_tx_and_storage(client, chain, uploads_to):
+    uploads_to(chain)
+    result = _upload(client, "single.txt", b"single mode evidence")
+
+    record = db.get_evidence_metadata(result["evidence_id"])
+    assert record["tx_hash"] == result["tx_hash"] != "BATCH_PENDING"
+    assert record["storage_status"] == "stored"
+    assert transfers.get(result["upload_id"])["status"] == "completed"
+
+def test_batch_proof_survives_the_storage_update(client, batch_chain, uploads_to, monkeypatch):
+    uploads_to(batch_chain)
+    run = transfers.run
+
+    def batch_lands_during_storage(upload_id):
+        # The batch is anchored while the file is still being transferred
+        batch_chain.batcher.flush()
+        return run(upload_id)
+    monkeypatch.setattr(transfers, "run", batch_lands_during_storage)
+
+    result = _upload(client, "batched.txt", b"batch mode evidence")
+
+    assert result["tx_hash"] == "BATCH_PENDING"
+    record = db.get_evidence_metadata(result["evidence_id"])
+    assert record["anchor_mode"] == "merkle_batch"
+    assert record["tx_hash"].startswith("0x")
+    assert record["merkle_proof"] is not None
+    assert record["storage_status"] == "stored"
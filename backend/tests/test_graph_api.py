@@ -0,0 +1,29 @@
+import pytest
+
+from app.core import security
+from app.services.graph_index import graph_index
+
+GRAPH_URL = "/api/v1/graph"
+
+@pytest.fixture(scope="module", autouse=True)
+def indexed_evidence():
+    graph_index.index_evidence("case-graph", "ev-graph", {
+        "nodes": [{"id": "Graph Suspect", "group": "Person"}, {"id": "Graph Harbour", "group": "Location"}],
+        "links": [{"source": "Graph Suspect", "target": "Graph Harbour", "value": "seen at"}]
+    })
+
+QUERIES = [
+    ("/entities", {"q": "Graph"}),
+    ("/neighbours", {"entity": "Graph Suspect"}),
+    ("/subgraph", {"entity": "Graph Suspect"}),
+    ("/cases", {"entity": "Graph Suspect"}),
+    ("/stats", {}),
+]
+
+@pytest.mark.parametrize("path,params", QUERIES)
+def test_graph_queries_require_a_token(client, path, params):
+    assert client.get(GRAPH_URL + path, params=params).status_code == 401
+
+    token = security.create_access_token("forensics", "Forensics")
+    response = client.get(GRAPH_URL + path, params=params, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core import security
+from app.core.config import settings
+from app.services.tokens import TokenService
+
+@pytest.fixture
+def token_db(tmp_path):
+    return str(tmp_path / "revoked.sqlite3")
+
+def test_revoked_token_is_rejected(token_db):
+    service = TokenService(token_db)
+    token = security.create_access_token("forensics", "Forensics")
+    claims = service.decode(token)
+    assert asyncio.run(service.decode_async(token))["sub"] == "forensics"
+
+    service.revoke(claims)
+
+    with pytest.raises(ValueError, match="revoked"):
+        service.decode(token)
+    with pytest.raises(ValueError, match="revoked"):
+        asyncio.run(service.decode_async(token))
+    service.stop()
+
+def test_wrong_token_type_is_rejected(token_db):
+    service = TokenService(token_db)
+    with pytest.raises(ValueError, match="access"):
+        service.decode(security.create_refresh_token("judge", "Judge"))
+
+def test_other_workers_see_revocations_after_a_sync(token_db, monkeypatch):
+    monkeypatch.setattr(settings, "TOKEN_REVOCATION_SYNC_SECONDS", 0.05)
+    worker_a, worker_b = TokenService(token_db), TokenService(token_db)
+    token = security.create_access_token("polaris", "Polaris")
+    claims = worker_b.decode(token) # Starts worker_b's sync thread
+
+    worker_a.revoke(claims)
+
+    deadline = time.time() + 5
+    while not worker_b._maybe_revoked(claims["jti"]):
+        assert time.time() < deadline, "revocation never synced"
+        time.sleep(0.05)
+    with pytest.raises(ValueError, match="revoked"):
+        worker_b.decode(token)
+    worker_a.stop()
+    worker_b.stop()
+
+def test_rebuild_drops_expired_revocations(token_db):
+    service = TokenService(token_db)
+    service.revoke({"jti": "expired", "exp": time.time() - 10})
+    service.revoke({"jti": "current", "exp": time.time() + 600})
+
+    service._rebuild_filter()
+
+    assert service._bloom_count == 1
+    assert not service.is_revoked("expired")
+    assert service.is_revoked("current")
+
+def test_logout_revokes_access_and_refresh_tokens(client):
+    access = security.create_access_token("forensics", "Forensics")
+    refresh = security.create_refresh_token("forensics", "Forensics")
+    headers = {"Authorization": f"Bearer {access}"}
+    assert client.post("/api/v1/jobs/no-such-job/retry", headers=headers).status_code == 404
+
+    response = client.post("/api/v1/auth/logout", headers=headers, json={"refresh_token": refresh})
+    assert response.status_code == 204
+
+    assert client.post("/api/v1/jobs/no-such-job/retry", headers=headers).status_code == 401
+    assert client.post("/api/v1/auth/refresh", json={"refresh_token": refresh}).status_code == 401
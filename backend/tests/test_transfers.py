@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from app.core.config import settings
+from app.services.registry import registry
+from app.services.storage import StorageService
+from app.services.transfers import TransferManager
+
+PART_SIZE = 5 * 1024 * 1024 # S3's minimum part size
+
+@pytest.fixture
+def s3_storage(monkeypatch):
+    monkeypatch.setattr(settings, "AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setattr(settings, "AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setattr(settings, "AWS_REGION", "us-east-1")
+    monkeypatch.setattr(settings, "S3_BUCKET_NAME", "transfer-tests")
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="transfer-tests")
+        storage = StorageService()
+        monkeypatch.setitem(registry._services["storage"], "instance", storage)
+        yield storage
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_STATE_DB", str(tmp_path / "uploads.sqlite3"))
+    monkeypatch.setattr(settings, "S3_MULTIPART_CHUNK_SIZE", PART_SIZE)
+    return TransferManager()
+
+def _spooled_transfer(manager, tmp_path, transfer_id: str, size: int) -> bytes:
+    body = os.urandom(size)
+    spool_path = str(tmp_path / f"{transfer_id}.bin")
+    with open(spool_path, "wb") as f:
+        f.write(body)
+    manager.create(transfer_id, f"ev-{transfer_id}", "case-transfers", f"case-transfers/{transfer_id}.bin", "application/octet-stream", spool_path)
+    manager.mark_received(transfer_id, size)
+    return body
+
+def test_multipart_transfer(manager, s3_storage, tmp_path):
+    body = _spooled_transfer(manager, tmp_path, "whole", 2 * PART_SIZE + 123)
+
+    url = manager.run("whole")
+
+    assert url.endswith("/case-transfers/whole.bin")
+    stored = s3_storage.s3_client.get_object(Bucket="transfer-tests", Key="case-transfers/whole.bin")["Body"].read()
+    assert stored == body
+    assert manager.progress("whole")["percent"] == 100.0
+    assert manager.get("whole")["status"] == "completed"
+
+def test_interrupted_transfer_resumes_with_the_missing_parts(manager, s3_storage, tmp_path, monkeypatch):
+    body = _spooled_transfer(manager, tmp_path, "resumed", 2 * PART_SIZE + 123)
+    s3 = s3_storage.s3_client
+    # A previous worker started the multipart upload and stored part 1, then died
+    upload_id = s3.create_multipart_upload(Bucket="transfer-tests", Key="case-transfers/resumed.bin")["UploadId"]
+    s3.upload_part(Bucket="transfer-tests", Key="case-transfers/resumed.bin", UploadId=upload_id, PartNumber=1, Body=body[:PART_SIZE])
+    manager._update("resumed", s3_upload_id=upload_id, part_size=PART_SIZE)
+
+    uploaded_parts = []
+    upload_part = s3.upload_part
+    def recording_upload_part(**kwargs):
+        uploaded_parts.append(kwargs["PartNumber"])
+        return upload_part(**kwargs)
+    monkeypatch.setattr(s3, "upload_part", recording_upload_part)
+
+    completed = {}
+    done = threading.Event()
+    def on_complete(transfer, url):
+        completed[transfer["transfer_id"]] = url
+        done.set()
+    manager.resume_pending(on_complete=on_complete)
+
+    assert done.wait(timeout=30)
+    assert sorted(uploaded_parts) == [2, 3]
+    assert completed["resumed"].endswith("/case-transfers/resumed.bin")
+    assert s3.get_object(Bucket="transfer-tests", Key="case-transfers/resumed.bin")["Body"].read() == body
+    assert manager.get("resumed")["status"] == "completed"
+
+def test_resume_fails_transfers_without_a_spool_file(manager, tmp_path):
+    _spooled_transfer(manager, tmp_path, "lost", 10)
+    os.remove(tmp_path / "lost.bin")
+
+    manager.resume_pending()
+
+    # Resuming runs in the background
+    deadline = time.time() + 10
+    while manager.get("lost")["status"] != "failed":
+        assert time.time() < deadline, "transfer never failed"
+        time.sleep(0.05)
+    transfer = manager.get("lost")
+    assert "Spool file missing" in transfer["error"]
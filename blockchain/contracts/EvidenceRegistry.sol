@@ -13,9 +13,21 @@ contract EvidenceRegistry {
         address uploaderAddress;
     }
 
+    // Batch mode: only the Merkle root over many evidence hashes is stored.
+    // Inclusion proofs are kept off-chain with the evidence metadata.
+    struct Batch {
+        bytes32 merkleRoot;
+        uint256 itemCount;
+        uint256 timestamp;
+        address anchoredBy;
+    }
+
     mapping(string => Evidence) public evidences;
     string[] public evidenceIds;
 
+    mapping(bytes32 => Batch) public batches;
+    bytes32[] public batchRoots;
+
     event EvidenceAnchored(
         string indexed evidenceId,
         string indexed caseId,
@@ -23,6 +35,12 @@ contract EvidenceRegistry {
         address indexed uploader
     );
 
+    event BatchAnchored(
+        bytes32 indexed merkleRoot,
+        uint256 itemCount,
+        address indexed anchoredBy
+    );
+
     function anchorEvidence(
         string memory _evidenceId,
         string memory _fileHash,
@@ -51,6 +69,25 @@ contract EvidenceRegistry {
         emit EvidenceAnchored(_evidenceId, _caseId, _fileHash, msg.sender);
     }
 
+    function anchorBatch(bytes32 _merkleRoot, uint256 _itemCount) public {
+        require(_itemCount > 0, "Empty batch");
+        require(batches[_merkleRoot].timestamp == 0, "Batch already anchored");
+
+        batches[_merkleRoot] = Batch({
+            merkleRoot: _merkleRoot,
+            itemCount: _itemCount,
+            timestamp: block.timestamp,
+            anchoredBy: msg.sender
+        });
+        batchRoots.push(_merkleRoot);
+
+        emit BatchAnchored(_merkleRoot, _itemCount, msg.sender);
+    }
+
+    function getBatch(bytes32 _merkleRoot) public view returns (Batch memory) {
+        return batches[_merkleRoot];
+    }
+
     function getEvidence(string memory _evidenceId) public view returns (Evidence memory) {
         return evidences[_evidenceId];
     }
@@ -11,6 +11,7 @@ async function main() {
     await evidenceRegistry.waitForDeployment();
 
     const address = await evidenceRegistry.getAddress();
+    const receipt = await evidenceRegistry.deploymentTransaction().wait();
 
     console.log(`EvidenceRegistry deployed to: ${address}`);
 
@@ -18,6 +19,7 @@ async function main() {
     const deployData = {
         address: address,
         network: hre.network.name,
+        deployBlock: receipt.blockNumber, // Audits scan anchor events from here
         abi: JSON.parse(fs.readFileSync(path.resolve(__dirname, "../artifacts/contracts/EvidenceRegistry.sol/EvidenceRegistry.json"), "utf8")).abi
     };
 
@@ -0,0 +1,95 @@
+const { loadFixture } = require("@nomicfoundation/hardhat-toolbox/network-helpers");
+const { anyValue } = require("@nomicfoundation/hardhat-chai-matchers/withArgs");
+const { expect } = require("chai");
+const { ethers } = require("hardhat");
+
+describe("EvidenceRegistry", function () {
+    async function deployFixture() {
+        const [owner, other] = await ethers.getSigners();
+        const EvidenceRegistry = await ethers.getContractFactory("EvidenceRegistry");
+        const registry = await EvidenceRegistry.deploy();
+        return { registry, owner, other };
+    }
+
+    const root = ethers.keccak256(ethers.toUtf8Bytes("merkle root"));
+
+    describe("anchorEvidence", function () {
+        it("stores the record and emits EvidenceAnchored", async function () {
+            const { registry, owner } = await loadFixture(deployFixture);
+
+            await expect(registry.anchorEvidence("ev-1", "hash-1", "pdf", "case-1", "Forensics", ""))
+                .to.emit(registry, "EvidenceAnchored")
+                .withArgs("ev-1", "case-1", "hash-1", owner.address);
+
+            const evidence = await registry.getEvidence("ev-1");
+            expect(evidence.fileHash).to.equal("hash-1");
+            expect(await registry.verifyHash("ev-1", "hash-1")).to.equal(true);
+            expect(await registry.verifyHash("ev-1", "other")).to.equal(false);
+        });
+
+        it("rejects a duplicate evidence id", async function () {
+            const { registry } = await loadFixture(deployFixture);
+            await registry.anchorEvidence("ev-1", "hash-1", "pdf", "case-1", "Forensics", "");
+
+            await expect(registry.anchorEvidence("ev-1", "hash-2", "pdf", "case-1", "Forensics", ""))
+                .to.be.revertedWith("Evidence already exists");
+        });
+    });
+
+    describe("anchorBatch", function () {
+        it("stores the root and emits BatchAnchored", async function () {
+            const { registry, other } = await loadFixture(deployFixture);
+
+            await expect(registry.connect(other).anchorBatch(root, 3))
+                .to.emit(registry, "BatchAnchored")
+                .withArgs(root, 3, other.address);
+
+            const batch = await registry.getBatch(root);
+            expect(batch.merkleRoot).to.equal(root);
+            expect(batch.itemCount).to.equal(3n);
+            expect(batch.timestamp).to.be.greaterThan(0n);
+            expect(batch.anchoredBy).to.equal(other.address);
+            expect(await registry.batchRoots(0)).to.equal(root);
+        });
+
+        it("rejects an empty batch", async function () {
+            const { registry } = await loadFixture(deployFixture);
+
+            await expect(registry.anchorBatch(root, 0)).to.be.revertedWith("Empty batch");
+        });
+
+        it("rejects a root that is already anchored and keeps the first batch", async function () {
+            // The backend treats this revert as success when it re-batches items after a crash
+            const { registry, owner, other } = await loadFixture(deployFixture);
+            await registry.anchorBatch(root, 3);
+
+            await expect(registry.connect(other).anchorBatch(root, 5)).to.be.revertedWith("Batch already anchored");
+
+            const batch = await registry.getBatch(root);
+            expect(batch.itemCount).to.equal(3n);
+            expect(batch.anchoredBy).to.equal(owner.address);
+        });
+
+        it("returns an empty batch for an unknown root", async function () {
+            const { registry } = await loadFixture(deployFixture);
+
+            const batch = await registry.getBatch(root);
+            expect(batch.timestamp).to.equal(0n);
+            expect(batch.itemCount).to.equal(0n);
+        });
+
+        it("logs every batch so audits can scan them", async function () {
+            const { registry } = await loadFixture(deployFixture);
+            const otherRoot = ethers.keccak256(ethers.toUtf8Bytes("another root"));
+            await registry.anchorBatch(root, 2);
+            await registry.anchorBatch(otherRoot, 1);
+
+            const logs = await registry.queryFilter(registry.filters.BatchAnchored(root));
+            expect(logs).to.have.length(1);
+            expect(logs[0].args.itemCount).to.equal(2n);
+            await expect(registry.anchorBatch(ethers.ZeroHash, 1))
+                .to.emit(registry, "BatchAnchored")
+                .withArgs(ethers.ZeroHash, 1, anyValue);
+        });
+    });
+});
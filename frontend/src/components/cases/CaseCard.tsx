@@ -63,7 +63,7 @@ export const CaseCard: React.FC<CaseCardProps> = ({ caseData }) => {
               </div>
               <div className="flex items-center gap-2 text-muted-foreground">
                 <FileText className="h-4 w-4 shrink-0" />
-                <span>{caseData.evidence.length} Evidence Items</span>
+                <span>{caseData.evidenceCount ?? caseData.evidence?.length ?? 0} Evidence Items</span>
               </div>
             </div>
 
@@ -36,6 +36,7 @@ export interface Case {
   vehicleDetails?: string;
   accused: Accused[];
   evidence: Evidence[];
+  evidenceCount?: number; // Sent by list views instead of the evidence array
   aiSummary?: string;
   createdAt: string;
   updatedAt: string;
@@ -27,7 +27,9 @@ const Dashboard: React.FC = () => {
   React.useEffect(() => {
     const fetchCases = async () => {
       try {
-        const data = await cases.list();
+        const data = await cases.list({
+          fields: ['id', 'caseNumber', 'district', 'status', 'dateOfOffence', 'sceneOfCrime', 'lawSections', 'accused', 'evidenceCount'],
+        });
         setCaseList(data);
       } catch (error) {
         console.error("Failed to fetch cases", error);
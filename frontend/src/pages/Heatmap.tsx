@@ -9,7 +9,7 @@ import {
   SelectTrigger,
   SelectValue,
 } from '@/components/ui/select';
-import { mockCases, districts } from '@/data/mockCases';
+import { mockCases } from '@/data/mockCases';
 import { Map, Filter, TrendingUp, AlertTriangle } from 'lucide-react';
 
 /* ================= MAP IMPORTS ================= */
@@ -73,52 +73,35 @@ interface HeatmapCell {
 const Heatmap: React.FC = () => {
   const [selectedDistrict, setSelectedDistrict] = useState('');
   const [timeFilter, setTimeFilter] = useState('all');
-  const [casesData, setCasesData] = useState<any[]>([]); // Using any[] for now or import Case type
+  const [geoStats, setGeoStats] = useState<any[]>([]);
+  const [totalCases, setTotalCases] = useState(0);
   const [loading, setLoading] = useState(true);
 
-  // Fetch real cases
+  // Fetch per-district aggregates (computed server-side)
   useEffect(() => {
-    const fetchCases = async () => {
+    const fetchStats = async () => {
       try {
-        const data = await import('@/services/api').then(m => m.cases.list());
-        setCasesData(data);
+        const data = await import('@/services/api').then(m => m.cases.geoStats());
+        setGeoStats(data.districts);
+        setTotalCases(data.total);
       } catch (error) {
-        console.error("Failed to fetch cases:", error);
+        console.error("Failed to fetch heatmap stats:", error);
       } finally {
         setLoading(false);
       }
     };
-    fetchCases();
+    fetchStats();
   }, []);
 
   /* ================= DATA LOGIC ================= */
-  // Get unique districts from actual data + predefined districts to ensure we cover all
-  const availableDistricts = Array.from(new Set([...districts, ...casesData.map((c: any) => c.district)]));
-
-  const districtCounts: HeatmapCell[] = availableDistricts
-    .map((district) => {
-      // Filter cases for this district
-      const districtCases = casesData.filter((c: any) => c.district === district);
-
-      // Calculate avg lat/lng
-      const avgLat =
-        districtCases.length > 0
-          ? districtCases.reduce((s: number, c: any) => s + parseFloat(c.latitude), 0) / districtCases.length
-          : 28.6139; // Default to center if no cases (or maybe handle differently)
-
-      const avgLng =
-        districtCases.length > 0
-          ? districtCases.reduce((s: number, c: any) => s + parseFloat(c.longitude), 0) / districtCases.length
-          : 77.209;
-
-      return {
-        district,
-        count: districtCases.length,
-        lat: avgLat,
-        lng: avgLng,
-      };
-    })
-    .filter((d) => d.count > 0); // Only show districts with cases
+  const districtCounts: HeatmapCell[] = geoStats
+    .filter((d: any) => d.count > 0 && d.centroid) // Only show districts with located cases
+    .map((d: any) => ({
+      district: d.district,
+      count: d.count,
+      lat: d.centroid.lat,
+      lng: d.centroid.lng,
+    }));
 
   const maxCount = Math.max(...districtCounts.map((d) => d.count), 1); // Avoid div by zero
   const selectedDistrictData = districtCounts.find(
@@ -305,7 +288,7 @@ const Heatmap: React.FC = () => {
                   <Filter className="h-5 w-5 text-warning" />
                 </div>
                 <div>
-                  <p className="text-2xl font-bold">{casesData.length}</p>
+                  <p className="text-2xl font-bold">{totalCases}</p>
                   <p className="text-sm text-muted-foreground">Total Cases</p>
                 </div>
               </div>
@@ -319,7 +302,7 @@ const Heatmap: React.FC = () => {
                 </div>
                 <div>
                   <p className="text-2xl font-bold">
-                    {(casesData.length / Math.max(districtCounts.length, 1)).toFixed(1)}
+                    {(totalCases / Math.max(districtCounts.length, 1)).toFixed(1)}
                   </p>
                   <p className="text-sm text-muted-foreground">Avg per District</p>
                 </div>
@@ -19,6 +19,7 @@ const Login: React.FC = () => {
         try {
             const data = await auth.login(username, password);
             localStorage.setItem('token', data.access_token);
+            localStorage.setItem('refresh_token', data.refresh_token);
 
             // Map backend roles to frontend types
             const roleMap: Record<string, 'police' | 'forensics' | 'judge'> = {
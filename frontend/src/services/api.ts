@@ -24,6 +24,39 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// On a 401, swap the refresh token for a new pair once and retry the request
+let refreshing: Promise<string> | null = null;
+
+api.interceptors.response.use(undefined, async (error) => {
+  const original = error.config;
+  const refreshToken = localStorage.getItem('refresh_token');
+  if (error.response?.status !== 401 || !refreshToken || original._retried || original.url?.startsWith('/auth/')) {
+    return Promise.reject(error);
+  }
+  original._retried = true;
+  // Sent before a refresh that has since finished: the stored token is already the new one
+  const current = localStorage.getItem('token');
+  if (!refreshing && current && original.headers.Authorization !== `Bearer ${current}`) {
+    return api(original);
+  }
+  try {
+    // Every request that gets a 401 meanwhile waits on the same refresh; it is cleared once,
+    // when the refresh settles, so no caller starts a second one with the rotated token
+    refreshing = refreshing ?? auth.refresh(refreshToken)
+      .then((data) => data.access_token)
+      .finally(() => {
+        refreshing = null;
+      });
+    const token = await refreshing;
+    original.headers.Authorization = `Bearer ${token}`;
+    return api(original);
+  } catch {
+    localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
+    return Promise.reject(error);
+  }
+});
+
 export const auth = {
   login: async (username: string, password: string) => {
     const formData = new FormData();
@@ -32,12 +65,25 @@ export const auth = {
     const response = await api.post('/auth/login', formData);
     return response.data;
   },
+  refresh: async (refreshToken: string) => {
+    const response = await api.post('/auth/refresh', { refresh_token: refreshToken });
+    localStorage.setItem('token', response.data.access_token);
+    localStorage.setItem('refresh_token', response.data.refresh_token);
+    return response.data;
+  },
+  logout: async () => {
+    await api.post('/auth/logout', { refresh_token: localStorage.getItem('refresh_token') });
+    localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
+  },
 };
 
 export const evidence = {
-  upload: async (caseId: string, file: File) => {
+  // Pass an uploadId to poll uploadProgress(uploadId) while the request is running
+  upload: async (caseId: string, file: File, uploadId?: string) => {
     const formData = new FormData();
     formData.append('case_id', caseId);
+    if (uploadId) formData.append('upload_id', uploadId);
     formData.append('file', file);
     const response = await api.post('/evidence/upload', formData, {
       headers: {
@@ -46,25 +92,92 @@ export const evidence = {
     });
     return response.data;
   },
+  uploadProgress: async (uploadId: string) => {
+    const response = await api.get(`/evidence/uploads/${uploadId}`);
+    return response.data;
+  },
+  // Streams the file as a Blob (Forensics/Judge only)
+  download: async (evidenceId: string) => {
+    const response = await api.get(`/evidence/${evidenceId}/download`, { responseType: 'blob' });
+    return response.data as Blob;
+  },
   verify: async (evidenceId: string) => {
     const response = await api.get(`/evidence/${evidenceId}/verify`);
     return response.data;
   },
 };
 
+export interface CaseListParams {
+  fields?: string[];
+  district?: string;
+  unit?: string;
+  status?: string;
+  limit?: number;
+}
+
 export const cases = {
-  list: async () => {
-    const response = await api.get('/cases');
-    return response.data;
+  // One page of cases: { items, next_cursor }
+  listPage: async (params: CaseListParams = {}, cursor?: string) => {
+    const response = await api.get('/cases/', {
+      params: {
+        limit: params.limit,
+        fields: params.fields?.join(','),
+        district: params.district,
+        unit: params.unit,
+        status: params.status,
+        cursor,
+      },
+    });
+    return response.data as { items: any[]; next_cursor: string | null };
+  },
+  // Follows next_cursor until every matching case is loaded
+  list: async (params: CaseListParams = {}) => {
+    const items: any[] = [];
+    let cursor: string | undefined;
+    do {
+      const page = await cases.listPage(params, cursor);
+      items.push(...page.items);
+      cursor = page.next_cursor ?? undefined;
+    } while (cursor);
+    return items;
+  },
+  // Per-district counts, centroids, status breakdowns and geohash buckets
+  geoStats: async () => {
+    const response = await api.get('/cases/stats/geo');
+    return response.data as { total: number; districts: any[] };
   },
   get: async (id: string) => {
     const response = await api.get(`/cases/${id}`);
     return response.data;
   },
+  verify: async (id: string, force = false) => {
+    const response = await api.get(`/cases/${id}/verify`, { params: force ? { force } : undefined });
+    return response.data;
+  },
   create: async (data: any) => {
     const response = await api.post('/cases/', data);
     return response.data;
   },
 };
 
+// Cross-case entity graph built from every evidence knowledge graph
+export const graph = {
+  searchEntities: async (q: string) => {
+    const response = await api.get('/graph/entities', { params: { q } });
+    return response.data;
+  },
+  neighbours: async (entity: string) => {
+    const response = await api.get('/graph/neighbours', { params: { entity } });
+    return response.data;
+  },
+  subgraph: async (entity: string, hops = 2) => {
+    const response = await api.get('/graph/subgraph', { params: { entity, hops } });
+    return response.data;
+  },
+  casesSharing: async (entity: string) => {
+    const response = await api.get('/graph/cases', { params: { entity } });
+    return response.data;
+  },
+};
+
 export default api;